@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""The script benchmarks the size, save and reload rates of the binary
+store format against the JSON one.
+
+Usage: python3 -m benchmarks.binary [count]
+"""
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from benchmarks.codec import time_reload, time_save
+from benchmarks.reload import make_store
+
+
+def main(count):
+    """Prints the size, save and reload rates of a store of count objects
+    in each format."""
+    FileStorage._FileStorage__lazy_mode = False
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            make_store(count)
+            print("{} objects:".format(count))
+            print("  {:<8}{:>12}{:>14}{:>14}".format(
+                "format", "bytes", "save/s", "reload/s"))
+            for name, fpath in (("json", "file.json"),
+                                ("binary", "file.hbnb")):
+                with patch.object(FileStorage, "_FileStorage__binary_mode",
+                                  name == "binary"):
+                    save = time_save()
+                    reload = time_reload()
+                print("  {:<8}{:>12}{:>14.0f}{:>14.0f}".format(
+                    name, os.path.getsize(fpath), count / save,
+                    count / reload))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""The script benchmarks the JSON codecs installed, on their own and
+through FileStorage.save() and reload().
+
+Usage: python3 -m benchmarks.codec [count]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+from unittest.mock import patch
+import models
+from models.engine.codec import codecs
+from models.engine.file_storage import FileStorage
+from benchmarks.reload import make_store
+
+
+def best(func, repeat=3):
+    """Returns the shortest time, in seconds, of repeat calls of func."""
+    times = []
+    for i in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def time_save():
+    """Returns the time of a full save of every object."""
+    def save():
+        FileStorage._FileStorage__fragments.clear()
+        models.storage.save()
+    return best(save)
+
+
+def time_reload():
+    """Returns the time of a reload of file.json."""
+    def reload():
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+    return best(reload)
+
+
+def main(count):
+    """Prints the encoding, decoding, save and reload rates of each codec
+    on a store of count objects."""
+    FileStorage._FileStorage__lazy_mode = False
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            make_store(count)
+            objs = list(models.storage.all().values())
+            print("{} objects, objects/s:".format(count))
+            print("  {:<8}{:>12}{:>12}{:>12}{:>12}".format(
+                "codec", "dumps", "loads", "save", "reload"))
+            for name, codec in codecs.items():
+                texts = []
+                encode = best(lambda: texts.__init__(
+                    codec.dumps(obj.to_dict(native=codec.native))
+                    for obj in objs))
+                decode = best(lambda: [codec.loads(text) for text in texts])
+                with patch.object(FileStorage, "_FileStorage__codec", codec):
+                    save = time_save()
+                    reload = time_reload()
+                print("  {:<8}{:>12.0f}{:>12.0f}{:>12.0f}{:>12.0f}".format(
+                    name, count / encode, count / decode, count / save,
+                    count / reload))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""The script benchmarks the size, save and reload rates of the store
+with each compression available, in the JSON and binary formats.
+
+Usage: python3 -m benchmarks.compression [count]
+"""
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+from models.engine.compression import available, suffix
+from models.engine.file_storage import FileStorage
+from benchmarks.codec import time_reload, time_save
+from benchmarks.reload import make_store
+
+
+def main(count):
+    """Prints the size, save and reload rates of a store of count objects
+    with each compression and format."""
+    FileStorage._FileStorage__lazy_mode = False
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            make_store(count)
+            print("{} objects:".format(count))
+            print("  {:<8}{:<8}{:>12}{:>12}{:>12}".format(
+                "format", "codec", "bytes", "save/s", "reload/s"))
+            for binary, fpath in ((False, "file.json"), (True, "file.hbnb")):
+                for name in [None] + available():
+                    with patch.multiple(FileStorage,
+                                        _FileStorage__binary_mode=binary,
+                                        _FileStorage__compression=name):
+                        save = time_save()
+                        reload = time_reload()
+                    size = os.path.getsize(fpath + suffix(name))
+                    print("  {:<8}{:<8}{:>12}{:>12.0f}{:>12.0f}".format(
+                        "binary" if binary else "json", name or "none",
+                        size, count / save, count / reload))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
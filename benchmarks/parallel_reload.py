@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""The script benchmarks the cold start of a program using the models,
+i.e. import models and the reload it makes, with the store split between
+1, 2, 4 and 8 worker processes.
+
+Usage: python3 -m benchmarks.parallel_reload [count ...]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from models.engine.file_storage import FileStorage
+from benchmarks.reload import make_store
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_cold_start(workers, repeat=3):
+    """Returns the best time, in seconds, of repeat runs of a new Python
+    process importing models, with HBNB_STORAGE_WORKERS set to workers,
+    in the current directory."""
+    env = dict(os.environ, HBNB_STORAGE_WORKERS=str(workers),
+               PYTHONPATH=ROOT)
+    for name in ("HBNB_TYPE_STORAGE", "HBNB_STORAGE_LAZY",
+                 "HBNB_STORAGE_SHARDS", "HBNB_STORAGE_FORMAT",
+                 "HBNB_STORAGE_SNAPSHOT"):
+        env.pop(name, None)
+    best = None
+    for i in range(repeat):
+        start = perf_counter()
+        subprocess.run([sys.executable, "-c", "import models"], env=env,
+                       check=True)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(counts, workers=(1, 2, 4, 8)):
+    """Prints the cold start time and reload throughput of stores of each
+    of counts objects with each number of workers."""
+    FileStorage._FileStorage__lazy_mode = False
+    cwd = os.getcwd()
+    print("{} CPUs".format(os.cpu_count()))
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for count in counts:
+                make_store(count)
+                print("import models with {} objects:".format(count))
+                for n in workers:
+                    elapsed = time_cold_start(n)
+                    print("  {:>2} workers{:>8.2f} s{:>12.0f} objects/s"
+                          .format(n, elapsed, count / elapsed))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100000, 1000000])
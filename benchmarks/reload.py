@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""The script benchmarks the throughput of FileStorage.reload().
+
+Usage: python3 -m benchmarks.reload [count]
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from unittest.mock import patch
+import models
+from models.base_model import BaseModel
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.amenity import Amenity
+from models.review import Review
+
+
+def make_store(count):
+    """Saves count objects of the model classes to file.json."""
+    classes = (User, State, City, Place, Amenity, Review)
+    FileStorage._FileStorage__objects = {}
+    for i in range(count):
+        classes[i % len(classes)]().name = "object {}".format(i)
+    models.storage.save()
+
+
+def time_reload(repeat=3):
+    """Returns the best reload throughput, in objects per second,
+    of repeat reloads of file.json."""
+    best = 0
+    for i in range(repeat):
+        FileStorage._FileStorage__objects = {}
+        start = perf_counter()
+        models.storage.reload()
+        elapsed = perf_counter() - start
+        best = max(best, len(FileStorage._FileStorage__objects) / elapsed)
+    return best
+
+
+def strptime_datetime(text):
+    """Parses a timestamp the way BaseModel did before parse_datetime()."""
+    return datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%f")
+
+
+class EvalClasses:
+    """Resolves class names the way reload() did before the registry."""
+
+    def __getitem__(self, name):
+        """Returns the class evaluated from its name."""
+        return eval(name, vars(file_storage))
+
+
+@classmethod
+def kwargs_from_dict(cls, odict):
+    """Builds an object the way reload() did before from_dict()."""
+    return cls(**{k: v for k, v in odict.items() if k != "__class__"})
+
+
+def main(count):
+    """Prints the reload throughput of a store of count objects."""
+    FileStorage._FileStorage__lazy_mode = False
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            make_store(count)
+            with patch.object(file_storage, "classes", EvalClasses()):
+                with patch.object(BaseModel, "from_dict", kwargs_from_dict):
+                    with patch("models.base_model.parse_datetime",
+                               strptime_datetime):
+                        results = [("eval, __init__, strptime",
+                                    time_reload())]
+                    results.append(("eval, __init__", time_reload()))
+                results.append(("eval, from_dict", time_reload()))
+            results.append(("registry, from_dict", time_reload()))
+        finally:
+            os.chdir(cwd)
+    print("reload of {} objects:".format(count))
+    for name, rate in results:
+        print("  {:<28}{:>10.0f} objects/s".format(name, rate))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""The script benchmarks the memory taken by the objects of a reloaded
+store, with the ids they hold shared or each a copy of its own.
+
+Usage: python3 -m benchmarks.shared_ids [count]
+"""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.ids import IdTable
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+def make_store(count):
+    """Saves a store of count Reviews, each referring to one of count // 10
+    Places and one of count // 20 Users."""
+    FileStorage._FileStorage__objects = {}
+    users = [User() for i in range(max(1, count // 20))]
+    places = [Place() for i in range(max(1, count // 10))]
+    for i, place in enumerate(places):
+        place.user_id = users[i % len(users)].id
+    for i in range(count):
+        review = Review()
+        review.place_id = places[i % len(places)].id
+        review.user_id = users[i % len(users)].id
+    models.storage.save()
+
+
+def reloaded_size():
+    """Returns the number of bytes allocated by a reload of the store."""
+    FileStorage._FileStorage__objects = {}
+    gc.collect()
+    tracemalloc.start()
+    models.storage.reload()
+    FileStorage._FileStorage__fragments.clear()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main(count):
+    """Prints the bytes per object of a reloaded store of count Reviews
+    and their Places and Users, with and without shared ids."""
+    FileStorage._FileStorage__lazy_mode = False
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            make_store(count)
+            total = models.storage.count()
+            shared = reloaded_size()
+            with patch.object(IdTable, "share_dict", lambda self, o: o):
+                copies = reloaded_size()
+            print("{} objects:".format(total))
+            print("  shared ids: {:>6.0f} bytes/object".format(
+                shared / total))
+            print("  copies:     {:>6.0f} bytes/object".format(
+                copies / total))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -2,9 +2,10 @@
 """The script defines the HBnB console."""
 import cmd
 import re
+from ast import literal_eval
 from shlex import split
 from models import storage
-from models.base_model import BaseModel
+from models.base_model import BaseModel, classes
 from models.user import User
 from models.state import State
 from models.city import City
@@ -39,15 +40,6 @@ class HBNBCommand(cmd.Cmd):
     """
 
     prompt = "(hbnb) "
-    __classes = {
-        "BaseModel",
-        "User",
-        "State",
-        "City",
-        "Place",
-        "Amenity",
-        "Review"
-    }
 
     def emptyline(self):
         """To do nothing upon receiving an empty line."""
@@ -60,7 +52,9 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
-            "update": self.do_update
+            "update": self.do_update,
+            "near": self.do_near,
+            "stats": self.do_stats
         }
         match = re.search(r"\.", arg)
         if match is not None:
@@ -76,11 +70,13 @@ class HBNBCommand(cmd.Cmd):
 
     def do_quit(self, arg):
         """The Quit command to exit the program."""
+        storage.close()
         return True
 
     def do_EOF(self, arg):
         """ The EOF signal to exit the program."""
         print("")
+        storage.close()
         return True
 
     def do_create(self, arg):
@@ -90,10 +86,10 @@ class HBNBCommand(cmd.Cmd):
         argl = parse(arg)
         if len(argl) == 0:
             print("** class name missing **")
-        elif argl[0] not in HBNBCommand.__classes:
+        elif argl[0] not in classes:
             print("** class doesn't exist **")
         else:
-            print(eval(argl[0])().id)
+            print(classes[argl[0]]().id)
             storage.save()
 
     def do_show(self, arg):
@@ -101,33 +97,31 @@ class HBNBCommand(cmd.Cmd):
         To display the string representation of a class instance of a given id.
         """
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
-        elif argl[0] not in HBNBCommand.__classes:
+        elif argl[0] not in classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict:
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
         else:
-            print(objdict["{}.{}".format(argl[0], argl[1])])
+            print(storage.get(argl[0], argl[1]))
 
     def do_destroy(self, arg):
         """Usage: destroy <class> <id> or <class>.destroy(<id>)
         To delete a class instance of a given id."""
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
-        elif argl[0] not in HBNBCommand.__classes:
+        elif argl[0] not in classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
         else:
-            del objdict["{}.{}".format(argl[0], argl[1])]
+            storage.delete(storage.get(argl[0], argl[1]))
             storage.save()
 
     def do_all(self, arg):
@@ -135,26 +129,67 @@ class HBNBCommand(cmd.Cmd):
         To deisplay string representations of all instances of a given class.
         If no class is specified, displays all instantiated objects."""
         argl = parse(arg)
-        if len(argl) > 0 and argl[0] not in HBNBCommand.__classes:
+        if len(argl) > 0 and argl[0] not in classes:
             print("** class doesn't exist **")
         else:
             objl = []
-            for obj in storage.all().values():
-                if len(argl) > 0 and argl[0] == obj.__class__.__name__:
-                    objl.append(obj.__str__())
-                elif len(argl) == 0:
-                    objl.append(obj.__str__())
+            cls = argl[0] if len(argl) > 0 else None
+            for obj in storage.all(cls).values():
+                objl.append(obj.__str__())
             print(objl)
 
     def do_count(self, arg):
         """Usage: count <class> or <class>.count()
         To retrieve the number of instances of a given class."""
         argl = parse(arg)
-        count = 0
-        for obj in storage.all().values():
-            if argl[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        print(storage.count(argl[0]))
+
+    def do_near(self, arg):
+        """Usage: near <class> <latitude> <longitude> <radius_km> or
+       <class>.near(<latitude>, <longitude>, <radius_km>)
+        To display string representations of the instances of a given class
+        located within radius_km kilometers of a point, nearest first."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+        elif argl[0] not in classes:
+            print("** class doesn't exist **")
+        elif len(argl) < 4:
+            print("** coordinates missing **")
+        else:
+            try:
+                lat, lon, radius = (float(a) for a in argl[1:4])
+            except ValueError:
+                print("** invalid coordinates **")
+                return False
+            objs = storage.near(lat, lon, radius, argl[0])
+            print([obj.__str__() for obj in objs.values()])
+
+    def do_stats(self, arg):
+        """Usage: stats <class> [<attribute> ...] [group_by=<attribute>] or
+       <class>.stats([<attribute>, ...][, group_by=<attribute>])
+        To display the number of instances of a given class and the sum,
+        average, minimum and maximum of the given numeric attributes,
+        for each value of the group_by attribute if one is given."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in classes:
+            print("** class doesn't exist **")
+            return False
+        group_by = None
+        metrics = ["count"]
+        for a in argl[1:]:
+            if a.startswith("group_by="):
+                group_by = a[len("group_by="):]
+            else:
+                metrics += ["{}({})".format(func, a)
+                            for func in ("sum", "avg", "min", "max")]
+        try:
+            print(storage.aggregate(argl[0], group_by, metrics))
+        except ValueError:
+            print("** invalid attribute **")
 
     def do_update(self, arg):
         """Usage: update <class> <id> <attribute_name> <attribute_value> or
@@ -163,18 +198,18 @@ class HBNBCommand(cmd.Cmd):
         Updates a class instance of a given id by adding or updating
         a given attribute key/value pair or dictionary."""
         argl = parse(arg)
-        objdict = storage.all()
 
         if len(argl) == 0:
             print("** class name missing **")
             return False
-        if argl[0] not in HBNBCommand.__classes:
+        if argl[0] not in classes:
             print("** class doesn't exist **")
             return False
         if len(argl) == 1:
             print("** instance id missing **")
             return False
-        if "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        obj = storage.get(argl[0], argl[1])
+        if obj is None:
             print("** no instance found **")
             return False
         if len(argl) == 2:
@@ -182,27 +217,29 @@ class HBNBCommand(cmd.Cmd):
             return False
         if len(argl) == 3:
             try:
-                type(eval(argl[2])) != dict
-            except NameError:
+                attrs = literal_eval(argl[2])
+            except (ValueError, SyntaxError):
+                attrs = None
+            if type(attrs) is not dict:
                 print("** value missing **")
                 return False
 
+        defaults = getattr(obj, "_declared", obj.__class__.__dict__)
         if len(argl) == 4:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
-            if argl[2] in obj.__class__.__dict__.keys():
-                valtype = type(obj.__class__.__dict__[argl[2]])
-                obj.__dict__[argl[2]] = valtype(argl[3])
+            if argl[2] in defaults.keys():
+                valtype = type(defaults[argl[2]])
+                setattr(obj, argl[2], valtype(argl[3]))
             else:
-                obj.__dict__[argl[2]] = argl[3]
-        elif type(eval(argl[2])) == dict:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
-            for k, v in eval(argl[2]).items():
-                if (k in obj.__class__.__dict__.keys() and
-                        type(obj.__class__.__dict__[k]) in {str, int, float}):
-                    valtype = type(obj.__class__.__dict__[k])
-                    obj.__dict__[k] = valtype(v)
+                setattr(obj, argl[2], argl[3])
+        else:
+            for k, v in attrs.items():
+                if (k in defaults.keys() and
+                        type(defaults[k]) in {str, int, float}):
+                    valtype = type(defaults[k])
+                    setattr(obj, k, valtype(v))
                 else:
-                    obj.__dict__[k] = v
+                    setattr(obj, k, v)
+        storage.new(obj)
         storage.save()
 
 
@@ -1,7 +1,20 @@
 #!/usr/bin/python3
 """__init__ magic file for models directory"""
+from os import getenv
 from models.engine.file_storage import FileStorage
+from models.engine.parallel import is_worker
+from models.compact import compact_all
 
+if getenv("HBNB_COMPACT_MODELS") == "1":
+    compact_all()
 
-storage = FileStorage()
-storage.reload()
+if getenv("HBNB_TYPE_STORAGE") == "column":
+    from models.engine.column_storage import ColumnStorage
+    storage = ColumnStorage()
+elif getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage()
+else:
+    storage = FileStorage()
+if not is_worker():
+    storage.reload()
@@ -1,12 +1,43 @@
 #!/usr/bin/python3
-"""The script defines the BaseModel class."""
+"""The script defines the BaseModel class and the registry of its
+subclasses, classes, mapping each model class name to the class."""
 import models
+from abc import ABCMeta
 from datetime import datetime
 from uuid import uuid4
+classes = {}
 
 
-class BaseModel:
-    """This represents the BaseModel of the HBnB project."""
+def parse_datetime(text):
+    """Returns the datetime of a timestamp written by isoformat(), or text
+    itself if it already is a datetime.
+
+    datetime.fromisoformat() parses it much faster than strptime(), which
+    is only used for the other timestamps the "%Y-%m-%dT%H:%M:%S.%f"
+    format accepts, such as ones with fewer microsecond digits.
+
+    Args:
+        text (str): The timestamp to parse.
+    """
+    if type(text) is datetime:
+        return text
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%f")
+
+
+class BaseModel(metaclass=ABCMeta):
+    """This represents the BaseModel of the HBnB project.
+
+    Its metaclass is ABCMeta only so that the compact classes, which do
+    not derive from it (see models/compact.py), can be registered as
+    virtual subclasses of it and of the model class they replace."""
+
+    def __init_subclass__(cls, **kwargs):
+        """Registers each subclass in classes under its name."""
+        super().__init_subclass__(**kwargs)
+        classes[cls.__name__] = cls
 
     def __init__(self, *args, **kwargs):
         """Initializes the new BaseModel.
@@ -15,32 +46,60 @@ class BaseModel:
             **kwargs (dict): Key/value pairs of attributes.
             *args (any): Unused.
         """
-        tform = "%Y-%m-%dT%H:%M:%S.%f"
         self.id = str(uuid4())
         self.created_at = datetime.today()
         self.updated_at = datetime.today()
         if len(kwargs) != 0:
             for k, v in kwargs.items():
                 if k == "created_at" or k == "updated_at":
-                    self.__dict__[k] = datetime.strptime(v, tform)
-                else:
-                    self.__dict__[k] = v
+                    setattr(self, k, parse_datetime(v))
+                elif k != "__class__":
+                    setattr(self, k, v)
         else:
             models.storage.new(self)
 
+    @classmethod
+    def from_dict(cls, odict):
+        """Returns an instance of cls rebuilt from a dictionary made by
+        to_dict(), without generating an id and timestamps that would
+        be overwritten, nor registering it in storage.
+
+        The attributes are set with setattr(), which interns their names
+        and lets the instances of a class share the table of their names:
+        copying odict into __dict__ kept a dict per object, holding the
+        copy of each name parsed from its line of the store.
+
+        Args:
+            odict (dict): Key/value pairs of attributes, including id,
+                created_at and updated_at. A __class__ key is ignored.
+        """
+        obj = cls.__new__(cls)
+        for k, v in odict.items():
+            if k != "__class__":
+                setattr(obj, k, v)
+        obj.created_at = parse_datetime(odict["created_at"])
+        obj.updated_at = parse_datetime(odict["updated_at"])
+        return obj
+
     def save(self):
         """To update updated_at with the current datetime."""
         self.updated_at = datetime.today()
+        models.storage.new(self)
         models.storage.save()
 
-    def to_dict(self):
+    def to_dict(self, *, native=False):
         """Returns the dictionary of the BaseModel instance.
             It includes the key/value pair __class__ representing
             the class name of the object.
+
+        Args:
+            native (bool): True to leave the timestamps as datetime
+                objects, for a JSON codec that encodes them itself.
         """
         rdict = self.__dict__.copy()
-        rdict["created_at"] = self.created_at.isoformat()
-        rdict["updated_at"] = self.updated_at.isoformat()
+        if not native:
+            rdict["created_at"] = self.created_at.isoformat()
+            rdict["updated_at"] = self.updated_at.isoformat()
         rdict["__class__"] = self.__class__.__name__
         return rdict
 
@@ -48,3 +107,6 @@ class BaseModel:
         """Returns the string representation of the BaseModel instance."""
         clname = self.__class__.__name__
         return "[{}] ({}) {}".format(clname, self.id, self.__dict__)
+
+
+classes["BaseModel"] = BaseModel
@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""The script defines the compact representation of the model classes,
+which keeps the attributes of each object in __slots__ instead of a
+per-object __dict__.
+
+A compact class keeps the name, default attributes and behaviour of the
+model class it is made from and replaces it in the classes registry, so
+that storage and the console build compact objects from then on.
+
+A compact class does not derive from BaseModel, whose objects always
+have a __dict__, but is registered as a virtual subclass of the model
+class it is made from, so that isinstance() and issubclass() with that
+class or BaseModel hold for compact objects as for regular ones.
+"""
+from models.base_model import BaseModel, classes, parse_datetime
+
+
+def declared(cls):
+    """Returns a dictionary of the public attributes declared with a
+    default value on cls and its bases, in declaration order.
+
+    Args:
+        cls (type): A model class.
+    """
+    if issubclass(cls, CompactModel):
+        return dict(cls._declared)
+    attrs = {}
+    for base in reversed(cls.__mro__):
+        for k, v in vars(base).items():
+            if k.startswith("_") or callable(v):
+                continue
+            if isinstance(v, (classmethod, staticmethod, property)):
+                continue
+            attrs[k] = v
+    return attrs
+
+
+class CompactModel:
+    """This represents the base of the compact model classes.
+
+    The id, timestamps and declared attributes of an object live in slots.
+    An unset declared attribute reads as its class default, and the
+    attributes added on the fly (e.g. by the console update command) go
+    to a dictionary that is only created for the objects that need one.
+
+    Attributes:
+        _declared (dict): The declared attributes mapped to their default.
+        _fields (frozenset): The names of the attributes kept in slots.
+    """
+
+    __slots__ = ()
+    _declared = {}
+    _fields = frozenset()
+    __init__ = BaseModel.__init__
+    save = BaseModel.save
+
+    def __new__(cls, *args, **kwargs):
+        """Returns a new object of cls without extra attributes."""
+        obj = super().__new__(cls)
+        object.__setattr__(obj, "_extra", None)
+        return obj
+
+    def __getattr__(self, name):
+        """Returns the default of an unset declared attribute, or an
+        attribute added on the fly."""
+        if name in self._declared:
+            return self._declared[name]
+        extra = object.__getattribute__(self, "_extra")
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            self.__class__.__name__, name))
+
+    def __setattr__(self, name, value):
+        """Sets a slot, or an attribute added on the fly."""
+        if name in self._fields:
+            object.__setattr__(self, name, value)
+            return
+        extra = object.__getattribute__(self, "_extra")
+        if extra is None:
+            extra = {}
+            object.__setattr__(self, "_extra", extra)
+        extra[name] = value
+
+    def __delattr__(self, name):
+        """Unsets a slot, or removes an attribute added on the fly."""
+        if name in self._fields:
+            object.__delattr__(self, name)
+            return
+        extra = object.__getattribute__(self, "_extra")
+        if extra is None or name not in extra:
+            raise AttributeError(name)
+        del extra[name]
+
+    def _attrs(self):
+        """Returns a dictionary of the attributes set on the object, the
+        same as the __dict__ of a regular model object."""
+        attrs = {}
+        for name in self.__slots__:
+            if name == "_extra" or name == "__weakref__":
+                continue
+            try:
+                attrs[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        extra = object.__getattribute__(self, "_extra")
+        if extra is not None:
+            attrs.update(extra)
+        return attrs
+
+    @classmethod
+    def from_dict(cls, odict):
+        """Returns an object of cls rebuilt from a dictionary made by
+        to_dict(), without registering it in storage.
+
+        Args:
+            odict (dict): Key/value pairs of attributes, including id,
+                created_at and updated_at. A __class__ key is ignored.
+        """
+        obj = cls.__new__(cls)
+        for k, v in odict.items():
+            if k == "created_at" or k == "updated_at":
+                object.__setattr__(obj, k, parse_datetime(v))
+            elif k != "__class__":
+                obj.__setattr__(k, v)
+        return obj
+
+    def to_dict(self, *, native=False):
+        """Returns the dictionary of the object, as BaseModel.to_dict()."""
+        rdict = self._attrs()
+        if not native:
+            rdict["created_at"] = self.created_at.isoformat()
+            rdict["updated_at"] = self.updated_at.isoformat()
+        rdict["__class__"] = self.__class__.__name__
+        return rdict
+
+    def __str__(self):
+        """Returns the string representation of the object."""
+        clname = self.__class__.__name__
+        return "[{}] ({}) {}".format(clname, self.id, self._attrs())
+
+
+def compact(cls):
+    """Returns the compact class of a model class, registering it in
+    classes in place of cls and as a virtual subclass of cls. A compact
+    class is returned unchanged.
+
+    Args:
+        cls (type): A model class.
+    """
+    if issubclass(cls, CompactModel):
+        return cls
+    defaults = declared(cls)
+    fields = ("id", "created_at", "updated_at") + tuple(defaults)
+    ccls = type(cls.__name__, (CompactModel,), {
+        "__slots__": fields + ("_extra", "__weakref__"),
+        "__doc__": cls.__doc__,
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "_declared": defaults,
+        "_fields": frozenset(fields),
+    })
+    cls.register(ccls)
+    classes[cls.__name__] = ccls
+    return ccls
+
+
+def compact_all():
+    """Replaces every class of the registry by its compact class."""
+    for cls in list(classes.values()):
+        compact(cls)
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""The script defines crash-safe file writes, which replace a file only
+once its new content is on disk, so a crash never leaves it truncated."""
+import os
+import shutil
+from contextlib import contextmanager
+
+
+def fsync_dir(dirname):
+    """Flushes the entries of a directory to disk, so that a rename made
+    in it survives a crash. Platforms that cannot open a directory are
+    left as they are.
+
+    Args:
+        dirname (str): The name of the directory.
+    """
+    try:
+        fd = os.open(dirname or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def link_previous(path, keep):
+    """Makes keep a hard link to the file path, or a copy of it where hard
+    links are not supported, replacing any previous keep. A missing path
+    is ignored.
+
+    Args:
+        path (str): The name of the file.
+        keep (str): The name of its previous generation.
+    """
+    if not os.path.isfile(path):
+        return
+    tmp = keep + ".tmp"
+    try:
+        os.remove(tmp)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, tmp)
+    except OSError:
+        shutil.copyfile(path, tmp)
+    os.replace(tmp, keep)
+
+
+@contextmanager
+def atomic_open(path, mode="w", keep=None):
+    """Opens a temporary file to write the new content of path to.
+
+    When the block exits normally the temporary file is flushed to disk
+    and renamed over path, then the directory is flushed; if it raises,
+    the temporary file is removed and path is left untouched. The
+    previous generation is linked to keep before that single rename, so
+    path exists at every point.
+
+    Args:
+        path (str): The name of the file to replace.
+        mode (str): The mode to open the temporary file with, "w" or "wb".
+        keep (str): The name to move the previous generation of path to
+            before replacing it, or None to discard it.
+
+    Yields:
+        The temporary file, opened for writing.
+    """
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    if keep is not None:
+        link_previous(path, keep)
+    os.replace(tmp, path)
+    fsync_dir(os.path.dirname(path))
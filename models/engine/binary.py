@@ -0,0 +1,375 @@
+#!/usr/bin/python3
+"""The script defines the compact binary format of a store, and its
+conversion to and from the JSON format.
+
+A binary store starts with b"HBNBBIN1", followed by one block per class:
+
+    name     the class name
+    fields   the number of attribute names, then each name, in the
+             order the attributes of each record follow
+    records  the number of records, then for each record one tagged
+             value per field, MISSING for the attributes it lacks
+
+and ends with a block with an empty name. Strings are a varint length
+followed by UTF-8 bytes, integers zigzag varints of any size, floats
+8-byte doubles, timestamps 8-byte signed microseconds since 1970 and
+UUID strings their 16 bytes. The __class__ of each record is the name of
+its block, and its key is <class>.<id>.
+
+Stores can be converted with:
+    python3 -m models.engine.binary to-binary file.json file.hbnb
+    python3 -m models.engine.binary to-json file.hbnb file.json
+"""
+import io
+import json
+import struct
+import sys
+from datetime import datetime, timedelta
+from uuid import UUID
+from models.base_model import parse_datetime
+from models.engine.atomic import atomic_open
+from models.engine.codec import isoformat
+from models.engine.compression import open_store
+from models.engine.columns import EPOCH, MICROSECOND, TIMESTAMPS
+from models.engine.json_stream import iter_items
+MAGIC = b"HBNBBIN1"
+MISSING, NONE, FALSE, TRUE, INT, FLOAT, STR, TIME, UUID16, LIST, DICT = \
+    range(11)
+DOUBLE = struct.Struct("<d")
+INT64 = struct.Struct("<q")
+ABSENT = object()
+
+
+def put_varint(out, n):
+    """Appends the unsigned LEB128 varint of n to the bytearray out."""
+    while n > 0x7f:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def put_str(out, s):
+    """Appends the length and UTF-8 bytes of s to the bytearray out."""
+    data = s.encode()
+    put_varint(out, len(data))
+    out += data
+
+
+def is_uuid(s):
+    """Returns True if s is a UUID in its canonical lowercase form, so
+    that its 16 bytes convert back to the same string."""
+    if len(s) != 36 or s[8] != "-":
+        return False
+    try:
+        return str(UUID(s)) == s
+    except ValueError:
+        return False
+
+
+def uuid_str(h):
+    """Returns the canonical form of the UUID of 32 hex digits h."""
+    if len(h) != 32:
+        raise IndexError("truncated UUID")
+    return "{}-{}-{}-{}-{}".format(h[:8], h[8:12], h[12:16], h[16:20],
+                                   h[20:])
+
+
+def put_value(out, v):
+    """Appends the tag and encoding of the value v to the bytearray out.
+
+    Raises:
+        TypeError: If v is not a JSON value or a datetime.
+    """
+    t = type(v)
+    if v is None:
+        out.append(NONE)
+    elif t is bool:
+        out.append(TRUE if v else FALSE)
+    elif t is int:
+        out.append(INT)
+        put_varint(out, v << 1 if v >= 0 else (-v << 1) - 1)
+    elif t is float:
+        out.append(FLOAT)
+        out += DOUBLE.pack(v)
+    elif t is str:
+        if is_uuid(v):
+            out.append(UUID16)
+            out += UUID(v).bytes
+        else:
+            out.append(STR)
+            put_str(out, v)
+    elif t is datetime and v.tzinfo is None:
+        out.append(TIME)
+        out += INT64.pack((v - EPOCH) // MICROSECOND)
+    elif t is datetime:
+        out.append(STR)
+        put_str(out, v.isoformat())
+    elif t is list:
+        out.append(LIST)
+        put_varint(out, len(v))
+        for item in v:
+            put_value(out, item)
+    elif t is dict:
+        out.append(DICT)
+        put_varint(out, len(v))
+        for key, item in v.items():
+            put_str(out, key)
+            put_value(out, item)
+    else:
+        raise TypeError("{} cannot be stored".format(t.__name__))
+
+
+def write_binary(f, groups):
+    """Writes a binary store.
+
+    Args:
+        f (file): A binary file opened for writing.
+        groups (iterable): The (class name, list of dictionaries) pair of
+            each class, the dictionaries made by to_dict(native=True) or
+            holding timestamps as strings.
+    """
+    f.write(MAGIC)
+    for name, odicts in groups:
+        if len(odicts) == 0:
+            continue
+        fields = {}
+        for o in odicts:
+            fields.update(dict.fromkeys(o))
+        fields.pop("__class__", None)
+        out = bytearray()
+        put_str(out, name)
+        put_varint(out, len(fields))
+        for field in fields:
+            put_str(out, field)
+        put_varint(out, len(odicts))
+        for o in odicts:
+            for field in fields:
+                if field in o:
+                    put_value(out, o[field])
+                else:
+                    out.append(MISSING)
+            if len(out) > 65536:
+                f.write(out)
+                out.clear()
+        f.write(out)
+    f.write(b"\x00")
+
+
+class Reader:
+    """This represents a cursor over the bytes of a binary store.
+
+    Attributes:
+        pos (int): The offset of the next byte to read.
+    """
+
+    def __init__(self, data):
+        """Initializes a new Reader.
+
+        Args:
+            data (bytes): The content of the binary store.
+        """
+        self.__data = data
+        self.pos = 0
+
+    def varint(self):
+        """Reads an unsigned varint."""
+        data = self.__data
+        n = shift = 0
+        while True:
+            b = data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7f) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def str(self):
+        """Reads a length-prefixed UTF-8 string."""
+        size = self.varint()
+        start = self.pos
+        self.pos += size
+        if self.pos > len(self.__data):
+            raise IndexError("truncated string")
+        return self.__data[start:self.pos].decode()
+
+    def value(self):
+        """Reads a tagged value, returning ABSENT for a missing one."""
+        data = self.__data
+        tag = data[self.pos]
+        self.pos += 1
+        if tag == STR:
+            return self.str()
+        if tag == UUID16:
+            self.pos += 16
+            if self.pos > len(data):
+                raise IndexError("truncated UUID")
+            return uuid_str(data[self.pos - 16:self.pos].hex())
+        if tag == TIME:
+            self.pos += 8
+            return EPOCH + timedelta(
+                microseconds=INT64.unpack_from(data, self.pos - 8)[0])
+        if tag == INT:
+            n = self.varint()
+            return n >> 1 if n & 1 == 0 else -((n + 1) >> 1)
+        if tag == FLOAT:
+            self.pos += 8
+            return DOUBLE.unpack_from(data, self.pos - 8)[0]
+        if tag <= TRUE:
+            return (ABSENT, None, False, True)[tag]
+        if tag == LIST:
+            return [self.value() for i in range(self.varint())]
+        if tag == DICT:
+            return {self.str(): self.value() for i in range(self.varint())}
+        raise ValueError("unknown tag {}".format(tag))
+
+    def record(self, fields):
+        """Reads the values of the fields of a record, decoding strings,
+        UUIDs and timestamps inline, and returns them as a dictionary."""
+        data = self.__data
+        pos = self.pos
+        o = {}
+        for field in fields:
+            tag = data[pos]
+            if tag == STR and data[pos + 1] < 0x80:
+                start = pos + 2
+                pos = start + data[pos + 1]
+                o[field] = data[start:pos].decode()
+            elif tag == UUID16:
+                o[field] = uuid_str(data[pos + 1:pos + 17].hex())
+                pos += 17
+            elif tag == TIME:
+                o[field] = EPOCH + timedelta(
+                    microseconds=INT64.unpack_from(data, pos + 1)[0])
+                pos += 9
+            elif tag == MISSING:
+                pos += 1
+            else:
+                self.pos = pos
+                o[field] = self.value()
+                pos = self.pos
+        if pos > len(data):
+            raise IndexError("truncated record")
+        self.pos = pos
+        return o
+
+
+def iter_binary(data, size=1 << 20):
+    """Yields the (<class>.<id> key, dictionary) pair of each record of a
+    binary store, its timestamps as datetime objects.
+
+    A file is read size bytes at a time and its records decoded as they
+    are read, so that only a chunk of the store is held in memory. A
+    record cut by the end of a chunk is decoded again once the next
+    chunk is read.
+
+    Args:
+        data (bytes or file): The content of the binary store, or a
+            binary file reading it.
+        size (int): The number of bytes to read from the file at a time.
+
+    Raises:
+        ValueError: If data is not a complete binary store.
+    """
+    f = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    buf = f.read(max(size, len(MAGIC)))
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a binary store")
+    reader = Reader(buf)
+    reader.pos = len(MAGIC)
+    left = 0
+    while True:
+        start = reader.pos
+        try:
+            if left == 0:
+                name = reader.str()
+                if name == "":
+                    return
+                fields = [reader.str() for i in range(reader.varint())]
+                left = reader.varint()
+                continue
+            o = reader.record(fields)
+            key = name + "." + o["id"]
+        except (IndexError, struct.error, UnicodeDecodeError):
+            more = f.read(size)
+            if len(more) == 0:
+                raise ValueError("truncated or invalid binary store")
+            buf = buf[start:] + more
+            reader = Reader(buf)
+            continue
+        except KeyError:
+            raise ValueError("truncated or invalid binary store")
+        left -= 1
+        o["__class__"] = name
+        yield key, o
+
+
+def load_binary(fpath):
+    """Yields the (<class>.<id> key, dictionary) pair of each record of
+    the binary store fpath, decoded as it is read, and decompressed as it
+    is read if it is compressed.
+
+    Raises:
+        FileNotFoundError: If there is no file fpath.
+        ValueError: If the file is not a complete binary store.
+    """
+    with open_store(fpath, text=False) as f:
+        yield from iter_binary(f)
+
+
+def native(o):
+    """Returns the dictionary o of a JSON store with its timestamps as
+    datetime objects, when they convert back to the same strings."""
+    for attr in TIMESTAMPS:
+        text = o.get(attr)
+        if type(text) is str:
+            try:
+                when = parse_datetime(text)
+            except ValueError:
+                continue
+            if when.isoformat() == text:
+                o[attr] = when
+    return o
+
+
+def json_to_binary(src, dst):
+    """Converts the JSON store src to the binary store dst.
+
+    Args:
+        src (str): The name of the JSON file.
+        dst (str): The name of the binary file.
+    """
+    groups = {}
+    with open(src) as f:
+        for key, o in iter_items(f):
+            groups.setdefault(o["__class__"], []).append(native(o))
+    with atomic_open(dst, "wb") as f:
+        write_binary(f, groups.items())
+
+
+def binary_to_json(src, dst):
+    """Converts the binary store src to the JSON store dst, laid out one
+    object per line as FileStorage writes it.
+
+    Args:
+        src (str): The name of the binary file.
+        dst (str): The name of the JSON file.
+    """
+    with atomic_open(dst) as f:
+        f.write("{")
+        sep = "\n"
+        for key, o in load_binary(src):
+            f.write("{}{}: {}".format(sep, json.dumps(key),
+                                      json.dumps(o, default=isoformat)))
+            sep = ",\n"
+        f.write("\n}\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-binary", "to-json"):
+        print("Usage: python3 -m models.engine.binary to-binary|to-json "
+              "<source> <destination>")
+        sys.exit(1)
+    if sys.argv[1] == "to-binary":
+        json_to_binary(sys.argv[2], sys.argv[3])
+    else:
+        binary_to_json(sys.argv[2], sys.argv[3])
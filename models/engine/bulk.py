@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""The script defines the bulk operations of the storage engines, which
+create, update or delete many objects and persist them with a single
+save, and the Batch class deferring the saves made in between."""
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from models.base_model import classes
+READ_ONLY = ("id", "__class__", "created_at", "updated_at")
+
+
+def model_class(cls):
+    """Returns the model class cls, or the one named cls.
+
+    Raises:
+        ValueError: If there is no model class named cls.
+    """
+    if type(cls) is not str:
+        return cls
+    try:
+        return classes[cls]
+    except KeyError:
+        raise ValueError("unknown class: {}".format(cls))
+
+
+class Batch:
+    """This represents the batches opened on a storage engine, during
+    which its saves are deferred until the outermost batch exits.
+
+    Attributes:
+        depth (int): The number of batches currently open.
+        deferred (bool): True if a save was deferred by the open batches.
+    """
+
+    def __init__(self):
+        """Initializes a new Batch, with no batch open."""
+        self.depth = 0
+        self.deferred = False
+        self.__lock = threading.Lock()
+
+    def defer(self):
+        """Returns True, recording a deferred save, if a batch is open, and
+        False if the save should be made right away."""
+        with self.__lock:
+            if self.depth == 0:
+                return False
+            self.deferred = True
+            return True
+
+    @contextmanager
+    def open(self, save):
+        """Opens a batch for the duration of the block. When the outermost
+        batch exits, even on an exception, save is called once if a save
+        was deferred.
+
+        Args:
+            save (function): The save method of the storage engine.
+        """
+        with self.__lock:
+            self.depth += 1
+        try:
+            yield
+        finally:
+            with self.__lock:
+                self.depth -= 1
+                due = self.depth == 0 and self.deferred
+                if due:
+                    self.deferred = False
+            if due:
+                save()
+
+
+def bulk_create(storage, cls, rows):
+    """Creates an object of class cls from each dictionary of attributes
+    in rows, adds them to storage and saves them once.
+
+    Args:
+        storage: The storage engine.
+        cls (type or str): The class, or class name, of the objects.
+        rows (iterable): The dictionaries of attributes, an id and
+            timestamps being generated for those that have none.
+
+    Returns:
+        The list of the objects created.
+    """
+    cls = model_class(cls)
+    with storage.batch():
+        objs = []
+        for row in rows:
+            # __class__ makes the keyword arguments non-empty, so that
+            # the object is not registered in models.storage by __init__
+            obj = cls(**dict(row, __class__=cls.__name__))
+            storage.new(obj)
+            objs.append(obj)
+        storage.save()
+    return objs
+
+
+def bulk_update(storage, cls, rows):
+    """Sets the attributes of the objects of class cls listed in rows
+    and saves them once. No object is changed if one of them is not in
+    storage.
+
+    Args:
+        storage: The storage engine.
+        cls (type or str): The class, or class name, of the objects.
+        rows (iterable): Dictionaries holding the id of an object and the
+            attributes to set on it. Its id, __class__ and timestamps are
+            left unchanged, except updated_at, which is set to now.
+
+    Returns:
+        The list of the objects updated.
+
+    Raises:
+        KeyError: If no object of class cls has one of the ids.
+    """
+    name = model_class(cls).__name__
+    changes = []
+    for row in rows:
+        obj = storage.get(name, row["id"])
+        if obj is None:
+            raise KeyError("{}.{}".format(name, row["id"]))
+        changes.append((obj, row))
+    with storage.batch():
+        for obj, row in changes:
+            for k, v in row.items():
+                if k not in READ_ONLY:
+                    setattr(obj, k, v)
+            obj.updated_at = datetime.today()
+            storage.new(obj)
+        storage.save()
+    return [obj for obj, row in changes]
+
+
+def bulk_delete(storage, cls, ids):
+    """Deletes the objects of class cls with the given ids from storage
+    and saves once. Ids without an object are ignored.
+
+    Args:
+        storage: The storage engine.
+        cls (type or str): The class, or class name, of the objects.
+        ids (iterable): The ids of the objects.
+
+    Returns:
+        The number of objects deleted.
+    """
+    name = model_class(cls).__name__
+    count = 0
+    with storage.batch():
+        for id in ids:
+            obj = storage.get(name, id)
+            if obj is not None:
+                storage.delete(obj)
+                count += 1
+        storage.save()
+    return count
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""The script defines the JSON codecs objects are stored with: orjson or
+ujson when they are installed, and the json module otherwise."""
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+PREFERENCE = ("orjson", "ujson", "json")
+INT64_MIN = -2.0 ** 63
+UINT64_MAX = 2.0 ** 64
+
+
+def isoformat(o):
+    """Returns the timestamp of a datetime o, for json.dumps().
+
+    Raises:
+        TypeError: If o is not a datetime.
+    """
+    try:
+        return o.isoformat()
+    except AttributeError:
+        raise TypeError("{} is not JSON serializable".format(type(o)))
+
+
+class Codec:
+    """This represents a JSON codec.
+
+    Attributes:
+        name (str): The name of the module encoding and decoding.
+        native (bool): True if dumps() encodes datetime objects itself,
+            so that the dictionaries of to_dict(native=True) can be
+            passed to it.
+    """
+
+    def __init__(self, name, dumps, loads, native=False):
+        """Initializes a new Codec.
+
+        Args:
+            name (str): The name of the module encoding and decoding.
+            dumps (function): The function returning the JSON text, str
+                or bytes, of a value.
+            loads (function): The function returning the value of a JSON
+                text, str or bytes.
+            native (bool): True if dumps encodes datetime objects.
+        """
+        self.name = name
+        self.native = native
+        self.__dumps = dumps
+        self.__loads = loads
+
+    def dumps(self, o):
+        """Returns the JSON text of o, as a str.
+
+        Values the codec cannot encode, such as integers over 64 bits
+        for the fast codecs, are encoded by the json module instead.
+        """
+        try:
+            text = self.__dumps(o)
+        except (TypeError, OverflowError):
+            return json.dumps(o, default=isoformat)
+        return text if type(text) is str else text.decode()
+
+    def loads(self, text):
+        """Returns the value of the JSON text, str or bytes.
+
+        Raises:
+            ValueError: If text is not valid JSON.
+        """
+        return self.__loads(text)
+
+
+def out_of_range(o):
+    """Returns True if the dictionary or list o holds, at any depth, a
+    float beyond the range of 64-bit integers."""
+    for v in (o.values() if type(o) is dict else o):
+        tv = type(v)
+        if tv is float:
+            if not INT64_MIN <= v < UINT64_MAX:
+                return True
+        elif (tv is dict or tv is list) and out_of_range(v):
+            return True
+    return False
+
+
+def orjson_loads(text):
+    """Decodes text with orjson, or again with json if it may hold an
+    integer over 64 bits, which orjson turns into a float."""
+    o = orjson.loads(text)
+    if (type(o) is dict or type(o) is list) and out_of_range(o):
+        return json.loads(text)
+    return o
+
+
+def ujson_loads(text):
+    """Decodes text with ujson, or with json if ujson cannot represent a
+    value, such as an integer over 64 bits."""
+    try:
+        return ujson.loads(text)
+    except ValueError:
+        return json.loads(text)
+
+
+codecs = {"json": Codec("json", json.dumps, json.loads)}
+if orjson is not None:
+    codecs["orjson"] = Codec("orjson", orjson.dumps, orjson_loads, True)
+if ujson is not None:
+    codecs["ujson"] = Codec("ujson", ujson.dumps, ujson_loads)
+
+
+def get_codec(name=None):
+    """Returns the codec named name, or the fastest one installed.
+
+    Args:
+        name (str): The name of the codec, or None.
+
+    Raises:
+        ValueError: If the codec named name is not installed.
+    """
+    if name is None:
+        name = next(name for name in PREFERENCE if name in codecs)
+    try:
+        return codecs[name]
+    except KeyError:
+        raise ValueError("unknown or missing JSON codec: {}".format(name))
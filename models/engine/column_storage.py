@@ -0,0 +1,318 @@
+#!/usr/bin/python3
+"""The script defines the ColumnStorage class."""
+import json
+from types import SimpleNamespace
+from weakref import WeakValueDictionary
+from models.base_model import classes
+from models.engine import bulk
+from models.engine.atomic import atomic_open
+from models.engine.columns import Table
+from models.engine.index import GridIndex
+from models.engine.json_stream import iter_items
+
+
+class ColumnStorage:
+    """This represents a storage engine keeping the attributes of the
+    objects of each model class in the typed columns of a Table, rather
+    than as a dictionary of objects.
+
+    Objects are built from their row when they are asked for. The objects
+    built or passed to new() stay in __live as long as they are referenced
+    elsewhere, so that the same object is returned each time and that the
+    changes made to it in place are written back by save().
+
+    It reads and writes the same JSON file as FileStorage.
+
+    Attributes:
+        __file_path (str): The name of the file to save objects to.
+        __tables (dict): The class names mapped to their Table.
+        __live (WeakValueDictionary): The <class>.<id> keys of the objects
+            currently referenced mapped to the object.
+        __batch (Batch): The batches open on storage, during which
+            save() is deferred until the outermost one exits.
+    """
+    __file_path = "file.json"
+    __tables = {}
+    __live = WeakValueDictionary()
+    __batch = bulk.Batch()
+
+    def all(self, cls=None):
+        """Returns a dictionary of the <class>.<id> keys and objects of
+        storage, or only of the objects of cls.
+
+        Args:
+            cls (type or str): The class, or class name, to filter on.
+        """
+        if cls is None:
+            names = list(ColumnStorage.__tables)
+        else:
+            names = [cls if type(cls) is str else cls.__name__]
+        objs = {}
+        for name in names:
+            table = ColumnStorage.__tables.get(name)
+            if table is not None:
+                objs.update(self.__objects(table, range(len(table))))
+        return objs
+
+    def get(self, cls, id):
+        """Returns the object of class cls with the given id, or None if
+        there is none.
+
+        Args:
+            cls (type or str): The class, or class name, of the object.
+            id (str): The id of the object.
+        """
+        table = self.__table(cls)
+        if table is None or id not in table.rows:
+            return None
+        return self.__object(table, table.rows[id])
+
+    def count(self, cls=None):
+        """Returns the number of objects in storage, or of class cls.
+
+        Args:
+            cls (type or str): The class, or class name, to count.
+        """
+        if cls is None:
+            return sum(len(t) for t in ColumnStorage.__tables.values())
+        table = self.__table(cls)
+        return 0 if table is None else len(table)
+
+    def filter(self, cls, **conds):
+        """Returns the objects of class cls whose attributes match conds,
+        scanning the columns of the attributes rather than the objects.
+
+        Args:
+            cls (type or str): The class, or class name, to search.
+            **conds (dict): The attribute names mapped to the value to
+                equal, or to a (low, high) pair of inclusive bounds where
+                None leaves a bound open.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        table = self.__table(cls)
+        if table is None:
+            return {}
+        return self.__objects(table, table.filter(**conds))
+
+    def find(self, cls, **equals):
+        """Returns the objects of class cls whose attributes equal the
+        given values.
+
+        Args:
+            cls (type or str): The class, or class name, to search.
+            **equals (dict): The attribute names and values to match.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        return self.filter(cls, **equals)
+
+    def find_range(self, cls, **bounds):
+        """Returns the objects of class cls whose attributes lie between
+        the given bounds.
+
+        Args:
+            cls (type or str): The class, or class name, to search.
+            **bounds (dict): The attribute names mapped to a (low, high)
+                pair of inclusive bounds; None leaves a bound open.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        return self.filter(cls, **{attr: tuple(bound)
+                                   for attr, bound in bounds.items()})
+
+    def aggregate(self, cls, group_by=None, metrics=("count",)):
+        """Computes aggregate metrics over the columns of class cls.
+
+        Args:
+            cls (type or str): The class, or class name, to aggregate.
+            group_by (str): The attribute to group objects on, or None.
+            metrics (list): The metrics, "count" or "<function>(<attr>)"
+                with function one of count, sum, avg, min and max.
+
+        Returns:
+            A dictionary of each group value (None without group_by)
+            mapped to a dictionary of each metric and its value.
+
+        Raises:
+            ValueError: If a metric is not known, or a value of group_by
+                cannot be grouped on, such as a list.
+        """
+        table = self.__table(cls)
+        if table is None:
+            return {}
+        return table.aggregate(metrics, group_by)
+
+    def near(self, latitude, longitude, radius_km, cls="Place"):
+        """Returns the objects of class cls located within radius_km
+        kilometers of a point, nearest first.
+
+        Args:
+            latitude (float): The latitude of the point.
+            longitude (float): The longitude of the point.
+            radius_km (float): The search radius, in kilometers.
+            cls (type or str): The class, or class name, to search.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        table = self.__table(cls)
+        if table is None:
+            return {}
+        found = self.__grid(table).near(latitude, longitude, radius_km)
+        return self.__objects(table, found)
+
+    def within_bbox(self, south, west, north, east, cls="Place"):
+        """Returns the objects of class cls located inside a bounding box.
+        A box with west > east crosses the antimeridian.
+
+        Args:
+            south (float): The lowest latitude of the box.
+            west (float): The western longitude of the box.
+            north (float): The highest latitude of the box.
+            east (float): The eastern longitude of the box.
+            cls (type or str): The class, or class name, to search.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        table = self.__table(cls)
+        if table is None:
+            return {}
+        found = self.__grid(table).within_bbox(south, west, north, east)
+        return self.__objects(table, found)
+
+    def new(self, obj):
+        """Stores the attributes of obj in the table of its class.
+
+        Objects changed in place are written back by the next save()
+        as long as they are referenced.
+        """
+        ocname = obj.__class__.__name__
+        self.__table(ocname, True).put(obj.to_dict())
+        ColumnStorage.__live["{}.{}".format(ocname, obj.id)] = obj
+
+    def delete(self, obj=None):
+        """Deletes obj from storage, if it is there."""
+        if obj is None:
+            return
+        ocname = obj.__class__.__name__
+        table = self.__table(ocname)
+        if table is not None:
+            table.remove(obj.id)
+        ColumnStorage.__live.pop("{}.{}".format(ocname, obj.id), None)
+
+    def save(self):
+        """Writes the objects changed in place back to their table, then
+        serializes every table to the JSON file __file_path, one object
+        per line, straight from the columns. The file is replaced
+        atomically once written (see atomic_open()). Within a batch()
+        the save is deferred until the batch exits."""
+        if ColumnStorage.__batch.defer():
+            return
+        for obj in list(ColumnStorage.__live.values()):
+            self.new(obj)
+        with atomic_open(ColumnStorage.__file_path) as f:
+            f.write("{")
+            sep = "\n"
+            for name, table in ColumnStorage.__tables.items():
+                for row, oid in enumerate(table.ids):
+                    key = json.dumps("{}.{}".format(name, oid))
+                    frag = json.dumps(table.record(row))
+                    f.write("{}{}: {}".format(sep, key, frag))
+                    sep = ",\n"
+            f.write("\n}\n")
+
+    def batch(self):
+        """Returns a context manager deferring the calls to save() made
+        within it to a single save when the outermost batch exits."""
+        return ColumnStorage.__batch.open(self.save)
+
+    def bulk_create(self, cls, rows):
+        """Creates an object of class cls from each dictionary of
+        attributes in rows and saves them once.
+
+        Returns:
+            The list of the objects created.
+        """
+        return bulk.bulk_create(self, cls, rows)
+
+    def bulk_update(self, cls, rows):
+        """Sets the attributes given with the id of each object of class
+        cls in the dictionaries rows and saves them once.
+
+        Returns:
+            The list of the objects updated.
+
+        Raises:
+            KeyError: If no object of class cls has one of the ids.
+        """
+        return bulk.bulk_update(self, cls, rows)
+
+    def bulk_delete(self, cls, ids):
+        """Deletes the objects of class cls with the given ids and saves
+        once.
+
+        Returns:
+            The number of objects deleted.
+        """
+        return bulk.bulk_delete(self, cls, ids)
+
+    def close(self):
+        """Does nothing, as every save is written right away; present so
+        that all the storage engines can be closed alike."""
+
+    def reload(self):
+        """Deserializes the JSON file __file_path to the tables, if it
+        exists, without building any object."""
+        try:
+            with open(ColumnStorage.__file_path) as f:
+                for key, o in iter_items(f):
+                    self.__table(o["__class__"], True).put(o)
+                    ColumnStorage.__live.pop(key, None)
+        except FileNotFoundError:
+            pass
+
+    def __table(self, cls, create=False):
+        """Returns the Table of class cls, or None if there is none and
+        create is False."""
+        if type(cls) is not str:
+            cls = cls.__name__
+        table = ColumnStorage.__tables.get(cls)
+        if table is None and create:
+            table = ColumnStorage.__tables[cls] = Table(cls)
+        return table
+
+    def __object(self, table, row):
+        """Returns the object of a row of table, building it if it is not
+        referenced already."""
+        key = "{}.{}".format(table.name, table.ids[row])
+        obj = ColumnStorage.__live.get(key)
+        if obj is None:
+            obj = classes[table.name].from_dict(table.record(row))
+            ColumnStorage.__live[key] = obj
+        return obj
+
+    def __objects(self, table, rows):
+        """Returns a dictionary of the keys and objects of the given rows
+        of table."""
+        objs = {}
+        for row in rows:
+            obj = self.__object(table, row)
+            objs["{}.{}".format(table.name, obj.id)] = obj
+        return objs
+
+    def __grid(self, table):
+        """Returns a GridIndex of the rows of table on their latitude and
+        longitude."""
+        grid = GridIndex("latitude", "longitude")
+        lats = table.columns.get("latitude")
+        lons = table.columns.get("longitude")
+        if lats is not None and lons is not None:
+            for row in range(len(table)):
+                grid.add(row, SimpleNamespace(latitude=lats.get(row),
+                                              longitude=lons.get(row)))
+        return grid
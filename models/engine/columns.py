@@ -0,0 +1,448 @@
+#!/usr/bin/python3
+"""The script defines the Column and Table classes of the columnar
+storage engine, and the aggregate functions they compute."""
+import re
+from array import array
+from datetime import datetime, timedelta
+from itertools import compress, repeat
+from operator import and_, eq, ge, le
+from models.base_model import parse_datetime
+from models.engine.index import MISSING
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+TIMESTAMPS = ("created_at", "updated_at")
+KINDS = {int: "q", float: "d", str: "s", datetime: "t"}
+FUNCTIONS = ("count", "sum", "avg", "min", "max")
+METRIC = re.compile(r"^\s*(\w+)\s*\(\s*(\w+)\s*\)\s*$")
+
+
+def parse_metric(metric):
+    """Returns the (function, attribute) pair of a metric written
+    "count" or "<function>(<attribute>)", e.g. "avg(price_by_night)".
+    The attribute of "count" is None.
+
+    Args:
+        metric (str): The metric to parse.
+
+    Raises:
+        ValueError: If metric is not a known function of an attribute.
+    """
+    if metric.strip() == "count":
+        return ("count", None)
+    match = METRIC.match(metric)
+    if match is None or match.group(1) not in FUNCTIONS:
+        raise ValueError("unknown metric: {!r}".format(metric))
+    return match.groups()
+
+
+def compute(func, values, rows):
+    """Returns the value of an aggregate function over a group.
+
+    Args:
+        func (str): One of count, sum, avg, min and max.
+        values (list): The numbers of the group, for sum, avg, min and max.
+        rows (int): The number of values set in the group, for count.
+    """
+    if func == "count":
+        return rows
+    if func == "sum":
+        return sum(values)
+    if len(values) == 0:
+        return None
+    if func == "avg":
+        return sum(values) / len(values)
+    return min(values) if func == "min" else max(values)
+
+
+class Column:
+    """This represents the values of one attribute of a model class, one
+    per row of its Table.
+
+    Integers, floats and timestamps are stored in typed arrays, strings as
+    codes of a dictionary of their distinct values. A column is turned
+    into a plain list when it is given a value that does not fit its type.
+
+    Attributes:
+        kind (str): "q" for integers, "d" for floats, "s" for strings,
+            "t" for timestamps and "o" for any value.
+        data (array or list): The stored value of each row.
+        mask (bytearray): 1 for each row where the attribute is set.
+        strings (list): The distinct strings of a "s" column, by code.
+        codes (dict): The distinct strings mapped to their code.
+    """
+
+    def __init__(self, kind, length=0):
+        """Initializes a new Column.
+
+        Args:
+            kind (str): The kind of values of the column.
+            length (int): The number of rows, all unset.
+        """
+        self.kind = kind
+        if kind == "o":
+            self.data = [MISSING] * length
+        else:
+            self.data = array("d" if kind == "d" else "q", bytes(8 * length))
+        self.mask = bytearray(length)
+        self.strings = []
+        self.codes = {}
+
+    @classmethod
+    def from_values(cls, values):
+        """Returns a Column of the given values, of the kind of the first
+        one set.
+
+        Args:
+            values (list): The value of each row, MISSING when unset.
+        """
+        kind = "o"
+        for value in values:
+            if value is not MISSING:
+                kind = KINDS.get(type(value), "o")
+                break
+        column = cls(kind, len(values))
+        for row, value in enumerate(values):
+            if value is not MISSING:
+                column.set(row, value)
+        return column
+
+    def __len__(self):
+        """Returns the number of rows of the column."""
+        return len(self.mask)
+
+    def encode(self, value):
+        """Returns the stored form of value.
+
+        Raises:
+            TypeError: If value does not fit the kind of the column.
+        """
+        kind = self.kind
+        if kind == "o":
+            return value
+        if KINDS.get(type(value)) != kind:
+            raise TypeError(value)
+        if kind == "s":
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.strings)
+                self.strings.append(value)
+            return code
+        if kind == "t":
+            return (value - EPOCH) // MICROSECOND
+        if kind == "q" and not -2 ** 63 <= value < 2 ** 63:
+            raise TypeError(value)
+        return value
+
+    def decode(self, stored):
+        """Returns the value whose stored form is stored."""
+        if self.kind == "s":
+            return self.strings[stored]
+        if self.kind == "t":
+            return EPOCH + timedelta(microseconds=stored)
+        return stored
+
+    def get(self, row):
+        """Returns the value of a row, or MISSING if it is unset."""
+        if not self.mask[row]:
+            return MISSING
+        return self.decode(self.data[row])
+
+    def set(self, row, value):
+        """Sets the value of a row, or unsets it if value is MISSING.
+        A row equal to the length of the column is appended."""
+        if row == len(self.mask):
+            self.mask.append(0)
+            self.data.append(MISSING if self.kind == "o" else 0)
+        if value is MISSING:
+            self.mask[row] = 0
+            if self.kind == "o":
+                self.data[row] = MISSING
+            return
+        try:
+            stored = self.encode(value)
+        except TypeError:
+            self.generalize()
+            stored = value
+        self.data[row] = stored
+        self.mask[row] = 1
+
+    def remove(self, row):
+        """Removes a row, moving the last row in its place."""
+        last = len(self.mask) - 1
+        self.data[row] = self.data[last]
+        self.mask[row] = self.mask[last]
+        del self.data[last]
+        del self.mask[last]
+
+    def generalize(self):
+        """Turns the column into a column of any values."""
+        if self.kind == "o":
+            return
+        self.data = [self.decode(v) if m else MISSING
+                     for v, m in zip(self.data, self.mask)]
+        self.kind = "o"
+        self.strings = []
+        self.codes = {}
+
+    def select(self, cond, rows=None):
+        """Returns the list of rows whose value matches cond.
+
+        Args:
+            cond (any): The value to equal, or a (low, high) pair of
+                inclusive bounds where None leaves a bound open.
+            rows (list): The rows to search, or None for all of them.
+        """
+        if type(cond) is tuple:
+            return self.__between(cond[0], cond[1], rows)
+        data, mask = self.data, self.mask
+        if self.kind == "s":
+            cond = self.codes.get(cond) if type(cond) is str else None
+            if cond is None:
+                return []
+        elif self.kind == "t":
+            if type(cond) is not datetime:
+                return []
+            cond = self.encode(cond)
+        if rows is None:
+            if self.kind == "o":
+                rows = range(len(mask))
+            else:
+                hits = map(and_, mask, map(eq, data, repeat(cond)))
+                return list(compress(range(len(mask)), hits))
+        return [r for r in rows if mask[r] and data[r] == cond]
+
+    def __between(self, low, high, rows):
+        """Returns the list of rows whose value lies between low and high,
+        both included. None leaves a bound open."""
+        data, mask = self.data, self.mask
+        if self.kind in ("q", "d") and all(
+                b is None or type(b) in (int, float) for b in (low, high)):
+            if rows is None:
+                hits = mask
+                if low is not None:
+                    hits = map(and_, hits, map(ge, data, repeat(low)))
+                if high is not None:
+                    hits = map(and_, hits, map(le, data, repeat(high)))
+                return list(compress(range(len(mask)), hits))
+            return [r for r in rows if mask[r] and
+                    (low is None or data[r] >= low) and
+                    (high is None or data[r] <= high)]
+        if rows is None:
+            rows = range(len(mask))
+        found = []
+        for r in rows:
+            if not mask[r]:
+                continue
+            value = self.decode(data[r])
+            try:
+                if ((low is None or value >= low) and
+                        (high is None or value <= high)):
+                    found.append(r)
+            except TypeError:
+                pass
+        return found
+
+    def numbers(self, rows):
+        """Returns the list of the numbers set in the given rows."""
+        data, mask = self.data, self.mask
+        if self.kind in ("q", "d"):
+            if type(rows) is range and len(rows) == len(mask):
+                return list(compress(data, mask))
+            return [data[r] for r in rows if mask[r]]
+        if self.kind != "o":
+            return []
+        return [data[r] for r in rows
+                if type(data[r]) in (int, float)]
+
+
+class Table:
+    """This represents the objects of one model class, stored as one
+    Column per attribute and one row per object.
+
+    Attributes:
+        name (str): The name of the model class.
+        ids (list): The id of the object of each row.
+        rows (dict): The ids mapped to their row.
+        columns (dict): The attribute names mapped to their Column.
+    """
+
+    def __init__(self, name):
+        """Initializes a new Table.
+
+        Args:
+            name (str): The name of the model class.
+        """
+        self.name = name
+        self.ids = []
+        self.rows = {}
+        self.columns = {}
+
+    def __len__(self):
+        """Returns the number of rows of the table."""
+        return len(self.ids)
+
+    def put(self, odict):
+        """Stores the attributes of an object, replacing those stored
+        under the same id.
+
+        Args:
+            odict (dict): The dictionary of the object, as made by
+                to_dict(). Its __class__ key is ignored.
+        """
+        oid = odict["id"]
+        row = self.rows.get(oid)
+        if row is None:
+            row = self.rows[oid] = len(self.ids)
+            self.ids.append(oid)
+        for attr, column in self.columns.items():
+            if attr not in odict:
+                column.set(row, MISSING)
+        for attr, value in odict.items():
+            if attr == "id" or attr == "__class__":
+                continue
+            if attr in TIMESTAMPS and type(value) is str:
+                value = parse_datetime(value)
+            column = self.columns.get(attr)
+            if column is None:
+                kind = KINDS.get(type(value), "o")
+                column = self.columns[attr] = Column(kind, len(self.ids))
+            column.set(row, value)
+
+    def remove(self, oid):
+        """Removes the row of an object, if there is one.
+
+        Args:
+            oid (str): The id of the object.
+        """
+        row = self.rows.pop(oid, None)
+        if row is None:
+            return
+        last = self.ids.pop()
+        if row != len(self.ids):
+            self.ids[row] = last
+            self.rows[last] = row
+        for column in self.columns.values():
+            column.remove(row)
+
+    def record(self, row):
+        """Returns the dictionary of the object of a row, as made by
+        to_dict()."""
+        odict = {"id": self.ids[row]}
+        for attr, column in self.columns.items():
+            value = column.get(row)
+            if value is MISSING:
+                continue
+            if type(value) is datetime:
+                value = value.isoformat()
+            odict[attr] = value
+        odict["__class__"] = self.name
+        return odict
+
+    def filter(self, **conds):
+        """Returns the list of rows whose attributes match conds.
+
+        Args:
+            **conds (dict): The attribute names mapped to the value to
+                equal, or to a (low, high) pair of inclusive bounds.
+        """
+        rows = None
+        for attr, cond in conds.items():
+            column = self.columns.get(attr)
+            if column is None:
+                return []
+            rows = column.select(cond, rows)
+        return list(range(len(self.ids))) if rows is None else rows
+
+    def groups(self, group_by, rows=None):
+        """Returns a dictionary of the values of attribute group_by mapped
+        to the list or range of their rows. Unset values group under None.
+
+        Args:
+            group_by (str): The attribute to group on, or None for a single
+                group of every row under None.
+            rows (list): The rows to group, or None for all of them.
+
+        Raises:
+            ValueError: If a value of group_by cannot be a dictionary key,
+                such as a list.
+        """
+        if rows is None:
+            rows = range(len(self.ids))
+        column = self.columns.get(group_by)
+        if group_by is None or column is None:
+            return {None: rows} if len(rows) != 0 else {}
+        stored = {}
+        data, mask = column.data, column.mask
+        try:
+            for r in rows:
+                stored.setdefault(data[r] if mask[r] else MISSING,
+                                  []).append(r)
+        except TypeError:
+            raise ValueError("cannot group on {}: unhashable value".format(
+                group_by))
+        return {None if key is MISSING else column.decode(key): grouped
+                for key, grouped in stored.items()}
+
+    def aggregate(self, metrics, group_by=None, rows=None):
+        """Computes aggregate metrics over the rows of the table.
+
+        Args:
+            metrics (list): The metrics, "count" or "<function>(<attr>)"
+                with function one of count, sum, avg, min and max.
+            group_by (str): The attribute to group rows on, or None.
+            rows (list): The rows to aggregate, or None for all of them.
+
+        Returns:
+            A dictionary of each group value (None without group_by)
+            mapped to a dictionary of each metric and its value.
+            Only numbers take part in sum, avg, min and max.
+
+        Raises:
+            ValueError: If a metric is not known, or a value of group_by
+                cannot be grouped on, such as a list.
+        """
+        parsed = [(metric, parse_metric(metric)) for metric in metrics]
+        found = {}
+        for key, grouped in self.groups(group_by, rows).items():
+            results = found[key] = {}
+            for metric, (func, attr) in parsed:
+                column = self.columns.get(attr)
+                if attr is None:
+                    results[metric] = len(grouped)
+                elif column is None:
+                    results[metric] = compute(func, [], 0)
+                elif func == "count":
+                    mask = column.mask
+                    results[metric] = sum(mask[r] for r in grouped)
+                else:
+                    results[metric] = compute(
+                        func, column.numbers(grouped), 0)
+        return found
+
+
+def aggregate_objects(name, objs, metrics, group_by=None):
+    """Computes aggregate metrics over a list of objects, gathering the
+    value of each attribute involved into a Column once and computing the
+    metrics over the columns. As in a Table, only the attributes set on
+    an object count, not the class defaults of those unset.
+
+    Args:
+        name (str): The name of the class of the objects.
+        objs (list): The objects to aggregate.
+        metrics (list): The metrics, as for Table.aggregate().
+        group_by (str): The attribute to group objects on, or None.
+
+    Raises:
+        ValueError: If a metric is not known, or a value of group_by
+            cannot be grouped on, such as a list.
+    """
+    attrs = [parse_metric(metric)[1] for metric in metrics]
+    attrs.append(group_by)
+    odicts = [obj.to_dict(native=True) for obj in objs]
+    table = Table(name)
+    table.ids = [odict["id"] for odict in odicts]
+    for attr in dict.fromkeys(attrs):
+        if attr is not None:
+            table.columns[attr] = Column.from_values(
+                [odict.get(attr, MISSING) for odict in odicts])
+    return table.aggregate(metrics, group_by)
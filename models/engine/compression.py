@@ -0,0 +1,154 @@
+#!/usr/bin/python3
+"""The script defines the compressed stores: gzip and xz from the
+standard library, and zstd when the zstandard module is installed.
+
+Compressed stores are read and written as streams, so a full
+uncompressed copy of the store is never held in memory. A store saved
+with another compression than the configured one is found by its suffix,
+and the compression of a store being read is detected from its first
+bytes."""
+import gzip
+import io
+import lzma
+import os
+from contextlib import contextmanager
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+SUFFIXES = {"gzip": ".gz", "xz": ".xz", "zstd": ".zst"}
+MAGICS = {"gzip": b"\x1f\x8b", "xz": b"\xfd7zXZ\x00",
+          "zstd": b"\x28\xb5\x2f\xfd"}
+ERRORS = (EOFError, OSError, lzma.LZMAError)
+if zstandard is not None:
+    ERRORS += (zstandard.ZstdError,)
+
+
+def available():
+    """Returns the names of the compressions that can be used."""
+    return [name for name in SUFFIXES
+            if name != "zstd" or zstandard is not None]
+
+
+def check(name):
+    """Returns name if it is None or the name of a compression that can
+    be used.
+
+    Raises:
+        ValueError: If it is not.
+    """
+    if name is not None and name not in available():
+        raise ValueError("unknown or missing compression: {}".format(name))
+    return name
+
+
+def suffix(name):
+    """Returns the file suffix of the compression name, or "" if name is
+    None."""
+    return "" if name is None else SUFFIXES[name]
+
+
+def find(path, name=None):
+    """Returns the name of the store path to read: path with the suffix of
+    the compression name if that file exists, or else the first of path
+    and path with the suffix of each compression that exists, so that a
+    store saved with another compression is still found. If none exists,
+    path with the suffix of name is returned.
+
+    Args:
+        path (str): The name of the uncompressed store.
+        name (str): The name of the compression, or None.
+    """
+    candidates = [path + suffix(name), path]
+    candidates += [path + ext for ext in SUFFIXES.values()]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return candidates[0]
+
+
+def detect(raw):
+    """Returns the name of the compression of the binary file raw, from
+    its first bytes, or None if it is not compressed. The position of raw
+    is left unchanged."""
+    pos = raw.tell()
+    head = raw.read(6)
+    raw.seek(pos)
+    for name, magic in MAGICS.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def compressor(raw, name):
+    """Returns a binary stream compressing what is written to it into the
+    binary file raw. Closing the stream does not close raw."""
+    if name == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+    if name == "xz":
+        return lzma.LZMAFile(raw, "wb")
+    if name == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError("unknown or missing compression: {}".format(name))
+
+
+def decompressor(raw, name):
+    """Returns a binary stream reading the decompressed content of the
+    binary file raw. Closing the stream does not close raw."""
+    if name == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if name == "xz":
+        return lzma.LZMAFile(raw, "rb")
+    if name == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    raise ValueError("unknown or missing compression: {}".format(name))
+
+
+@contextmanager
+def writer(raw, name=None, text=True):
+    """Yields a stream writing to the binary file raw, compressed with
+    the compression name unless it is None. raw is left open.
+
+    Args:
+        raw (file): A binary file opened for writing.
+        name (str): The name of the compression, or None.
+        text (bool): True for a text stream, False for a binary one.
+    """
+    stream = raw if name is None else compressor(raw, name)
+    f = io.TextIOWrapper(stream, encoding="utf-8") if text else stream
+    yield f
+    if text:
+        f.flush()
+        f.detach()
+    if stream is not raw:
+        stream.close()
+
+
+@contextmanager
+def open_store(path, text=True):
+    """Opens the store path for reading, decompressing it as it is read
+    if it is compressed.
+
+    Args:
+        path (str): The name of the store.
+        text (bool): True for a text stream, False for a binary one.
+
+    Raises:
+        ValueError: If the store is compressed with a compression that
+            cannot be used, or its compressed content is corrupt.
+    """
+    with open(path, "rb") as raw:
+        name = detect(raw)
+        stream = raw if name is None else decompressor(raw, name)
+        try:
+            if text:
+                yield io.TextIOWrapper(stream, encoding="utf-8")
+            else:
+                yield stream
+        except ERRORS as e:
+            if stream is raw:
+                raise
+            raise ValueError("{} is corrupt: {}".format(path, e))
+        finally:
+            if stream is not raw:
+                stream.close()
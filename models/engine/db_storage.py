@@ -0,0 +1,465 @@
+#!/usr/bin/python3
+"""The script defines the DBStorage class."""
+import json
+import sqlite3
+from types import SimpleNamespace
+from weakref import WeakValueDictionary
+from models.base_model import classes
+from models.engine import bulk
+from models.compact import declared
+from models.engine.columns import aggregate_objects, parse_metric
+from models.engine.index import GridIndex, MISSING
+SQL_FUNCTIONS = {"sum": "SUM", "avg": "AVG", "min": "MIN", "max": "MAX"}
+NUMBER = "CASE WHEN typeof({0}) IN ('integer', 'real') THEN {0} END"
+
+
+def quote(name):
+    """Returns name quoted as an SQL identifier."""
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def is_scalar(value):
+    """Returns True if value is stored in a column of its own, that is a
+    string, a float or an integer SQLite can hold."""
+    if type(value) is int:
+        return -2 ** 63 <= value < 2 ** 63
+    return type(value) in (str, float)
+
+
+class DBStorage:
+    """This represents a storage engine backed by an SQLite database, so
+    that the objects do not need to fit in memory.
+
+    Each model class has a table with an id primary key, its timestamps,
+    one column per attribute declared on the class and an extra column
+    holding the JSON of the other attributes and of the declared ones
+    whose value is not a string or a number. The columns of attributes
+    ending with _id are indexed, and the database runs in WAL mode.
+
+    Changes are written to the database as new() and delete() are called
+    and committed by save(). Objects are read when they are asked for;
+    those currently referenced are kept in __live, so that the same
+    object is returned each time and that the changes made to it in place
+    are written back by save().
+
+    Attributes:
+        __db_path (str): The name of the database file.
+        __conn (sqlite3.Connection): The connection to the database,
+            opened when first needed.
+        __tables (dict): The class names mapped to the list of attribute
+            columns of their table.
+        __live (WeakValueDictionary): The <class>.<id> keys of the objects
+            currently referenced mapped to the object.
+        __batch (Batch): The batches open on storage, during which
+            save() is deferred until the outermost one exits.
+    """
+    __db_path = "file.db"
+    __conn = None
+    __tables = {}
+    __live = WeakValueDictionary()
+    __batch = bulk.Batch()
+
+    def all(self, cls=None):
+        """Returns a dictionary of the <class>.<id> keys and objects of
+        storage, or only of the objects of cls.
+
+        Args:
+            cls (type or str): The class, or class name, to filter on.
+        """
+        if cls is None:
+            names = self.__names()
+        else:
+            names = [cls if type(cls) is str else cls.__name__]
+        objs = {}
+        for name in names:
+            objs.update(self.__select(name))
+        return objs
+
+    def get(self, cls, id):
+        """Returns the object of class cls with the given id, or None if
+        there is none.
+
+        Args:
+            cls (type or str): The class, or class name, of the object.
+            id (str): The id of the object.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        found = self.__select(cls, "id = ?", [id])
+        return found.get("{}.{}".format(cls, id))
+
+    def count(self, cls=None):
+        """Returns the number of objects in storage, or of class cls.
+
+        Args:
+            cls (type or str): The class, or class name, to count.
+        """
+        if cls is None:
+            return sum(self.count(name) for name in self.__names())
+        if type(cls) is not str:
+            cls = cls.__name__
+        if self.__table(cls) is None:
+            return 0
+        sql = "SELECT COUNT(*) FROM {}".format(quote(cls))
+        return self.__connect().execute(sql).fetchone()[0]
+
+    def find(self, cls, **equals):
+        """Returns the objects of class cls whose attributes equal the
+        given values, filtering in SQL on the attribute columns.
+
+        Args:
+            cls (type or str): The class, or class name, to search.
+            **equals (dict): The attribute names and values to match.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        return self.__filter(cls, equals, {})
+
+    def find_range(self, cls, **bounds):
+        """Returns the objects of class cls whose attributes lie between
+        the given bounds, filtering in SQL on the attribute columns.
+
+        Args:
+            cls (type or str): The class, or class name, to search.
+            **bounds (dict): The attribute names mapped to a (low, high)
+                pair of inclusive bounds; None leaves a bound open.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        return self.__filter(cls, {}, bounds)
+
+    def aggregate(self, cls, group_by=None, metrics=("count",)):
+        """Computes aggregate metrics over the objects of class cls, in
+        SQL when every attribute involved has a column and group_by is not
+        declared with a list or dictionary, whose values the column does
+        not hold.
+
+        Args:
+            cls (type or str): The class, or class name, to aggregate.
+            group_by (str): The attribute to group objects on, or None.
+            metrics (list): The metrics, "count" or "<function>(<attr>)"
+                with function one of count, sum, avg, min and max.
+
+        Returns:
+            A dictionary of each group value (None without group_by)
+            mapped to a dictionary of each metric and its value.
+
+        Raises:
+            ValueError: If a metric is not known, or a value of group_by
+                cannot be grouped on, such as a list.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        parsed = [parse_metric(metric) for metric in metrics]
+        cols = self.__table(cls)
+        if cols is None:
+            return {}
+        attrs = [attr for func, attr in parsed] + [group_by]
+        defaults = declared(classes[cls]) if cls in classes else {}
+        if (any(attr is not None and attr not in cols for attr in attrs) or
+                (group_by in defaults and
+                 not is_scalar(defaults[group_by]))):
+            objs = list(self.all(cls).values())
+            return aggregate_objects(cls, objs, metrics, group_by)
+        exprs = ["COUNT(*)"]
+        for func, attr in parsed:
+            if attr is None:
+                exprs.append("COUNT(*)")
+            elif func == "count":
+                exprs.append("COUNT({})".format(quote(attr)))
+            else:
+                exprs.append("{}({})".format(SQL_FUNCTIONS[func],
+                                             NUMBER.format(quote(attr))))
+        group = "NULL" if group_by is None else quote(group_by)
+        sql = "SELECT {}, {} FROM {}".format(group, ", ".join(exprs),
+                                             quote(cls))
+        if group_by is not None:
+            sql += " GROUP BY {}".format(group)
+        found = {}
+        for row in self.__connect().execute(sql):
+            if row[1] == 0:
+                continue
+            results = found[row[0]] = {}
+            for metric, (func, attr), value in zip(metrics, parsed, row[2:]):
+                if value is None and func == "sum":
+                    value = 0
+                results[metric] = value
+        return found
+
+    def near(self, latitude, longitude, radius_km, cls="Place"):
+        """Returns the objects of class cls located within radius_km
+        kilometers of a point, nearest first.
+
+        Args:
+            latitude (float): The latitude of the point.
+            longitude (float): The longitude of the point.
+            radius_km (float): The search radius, in kilometers.
+            cls (type or str): The class, or class name, to search.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        cols = self.__table(cls)
+        if cols is None or "latitude" not in cols or "longitude" not in cols:
+            return {}
+        grid = GridIndex("latitude", "longitude")
+        sql = "SELECT id, latitude, longitude FROM {}".format(quote(cls))
+        for oid, lat, lon in self.__connect().execute(sql):
+            grid.add(oid, SimpleNamespace(latitude=lat, longitude=lon))
+        ids = list(grid.near(latitude, longitude, radius_km))
+        found = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            where = "id IN ({})".format(", ".join("?" * len(chunk)))
+            found.update(self.__select(cls, where, chunk))
+        return {"{}.{}".format(cls, oid): found["{}.{}".format(cls, oid)]
+                for oid in ids}
+
+    def within_bbox(self, south, west, north, east, cls="Place"):
+        """Returns the objects of class cls located inside a bounding box.
+        A box with west > east crosses the antimeridian.
+
+        Args:
+            south (float): The lowest latitude of the box.
+            west (float): The western longitude of the box.
+            north (float): The highest latitude of the box.
+            east (float): The eastern longitude of the box.
+            cls (type or str): The class, or class name, to search.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        cols = self.__table(cls)
+        if cols is None or "latitude" not in cols or "longitude" not in cols:
+            return {}
+        where = ("typeof(latitude) IN ('integer', 'real') AND "
+                 "typeof(longitude) IN ('integer', 'real') AND "
+                 "latitude BETWEEN ? AND ? AND ")
+        if west <= east:
+            where += "longitude BETWEEN ? AND ?"
+        else:
+            where += "(longitude >= ? OR longitude <= ?)"
+        return self.__select(cls, where, [south, north, west, east])
+
+    def new(self, obj):
+        """Writes obj to the table of its class, creating the table if
+        needed. The change is committed by the next save()."""
+        ocname = obj.__class__.__name__
+        cols = self.__table(ocname, True)
+        odict = obj.to_dict()
+        row = [odict.pop("id"), odict.pop("created_at"),
+               odict.pop("updated_at"), None]
+        del odict["__class__"]
+        for col in cols:
+            value = odict.get(col, MISSING)
+            if is_scalar(value):
+                row.append(value)
+                del odict[col]
+            else:
+                row.append(None)
+        if len(odict) != 0:
+            row[3] = json.dumps(odict)
+        sql = "INSERT OR REPLACE INTO {} VALUES ({})".format(
+            quote(ocname), ", ".join("?" * len(row)))
+        self.__connect().execute(sql, row)
+        DBStorage.__live["{}.{}".format(ocname, obj.id)] = obj
+
+    def delete(self, obj=None):
+        """Deletes obj from the table of its class, if it is there. The
+        change is committed by the next save()."""
+        if obj is None:
+            return
+        ocname = obj.__class__.__name__
+        if self.__table(ocname) is not None:
+            sql = "DELETE FROM {} WHERE id = ?".format(quote(ocname))
+            self.__connect().execute(sql, [obj.id])
+        DBStorage.__live.pop("{}.{}".format(ocname, obj.id), None)
+
+    def save(self):
+        """Writes the referenced objects back to the database and commits
+        the changes made since the last save. Within a batch() the save
+        is deferred until the batch exits."""
+        if DBStorage.__batch.defer():
+            return
+        for obj in list(DBStorage.__live.values()):
+            self.new(obj)
+        self.__connect().commit()
+
+    def batch(self):
+        """Returns a context manager deferring the calls to save() made
+        within it to a single save when the outermost batch exits."""
+        return DBStorage.__batch.open(self.save)
+
+    def bulk_create(self, cls, rows):
+        """Creates an object of class cls from each dictionary of
+        attributes in rows and saves them once.
+
+        Returns:
+            The list of the objects created.
+        """
+        return bulk.bulk_create(self, cls, rows)
+
+    def bulk_update(self, cls, rows):
+        """Sets the attributes given with the id of each object of class
+        cls in the dictionaries rows and saves them once.
+
+        Returns:
+            The list of the objects updated.
+
+        Raises:
+            KeyError: If no object of class cls has one of the ids.
+        """
+        return bulk.bulk_update(self, cls, rows)
+
+    def bulk_delete(self, cls, ids):
+        """Deletes the objects of class cls with the given ids and saves
+        once.
+
+        Returns:
+            The number of objects deleted.
+        """
+        return bulk.bulk_delete(self, cls, ids)
+
+    def close(self):
+        """Commits the changes made since the last save and closes the
+        database, which is opened again when next needed."""
+        if DBStorage.__conn is not None:
+            DBStorage.__conn.commit()
+            DBStorage.__conn.close()
+            DBStorage.__conn = None
+
+    def reload(self):
+        """Opens the database and forgets the objects read so far, so that
+        they are read again from the database when next asked for."""
+        self.__connect()
+        DBStorage.__live = WeakValueDictionary()
+
+    def __connect(self):
+        """Returns the connection to the database, opening it in WAL mode
+        if it is not open yet."""
+        if DBStorage.__conn is None:
+            DBStorage.__conn = sqlite3.connect(DBStorage.__db_path)
+            DBStorage.__conn.execute("PRAGMA journal_mode=WAL")
+            DBStorage.__tables = {}
+        return DBStorage.__conn
+
+    def __names(self):
+        """Returns the list of the class names having a table."""
+        sql = "SELECT name FROM sqlite_master WHERE type = 'table'"
+        return [row[0] for row in self.__connect().execute(sql)]
+
+    def __table(self, name, create=False):
+        """Returns the list of attribute columns of the table of class
+        name, or None if there is none and create is False.
+
+        A table is created with a column for each attribute declared on
+        the class, and given the columns of attributes declared since."""
+        if name in DBStorage.__tables:
+            return DBStorage.__tables[name]
+        conn = self.__connect()
+        sql = "PRAGMA table_info({})".format(quote(name))
+        cols = [row[1] for row in conn.execute(sql)]
+        if len(cols) == 0 and not create:
+            return None
+        wanted = list(declared(classes[name])) if name in classes else []
+        if len(cols) == 0:
+            conn.execute("CREATE TABLE {} (id TEXT PRIMARY KEY, "
+                         "created_at TEXT, updated_at TEXT, extra TEXT)"
+                         .format(quote(name)))
+            cols = ["id", "created_at", "updated_at", "extra"]
+        for attr in wanted:
+            if attr not in cols:
+                conn.execute("ALTER TABLE {} ADD COLUMN {}".format(
+                    quote(name), quote(attr)))
+                cols.append(attr)
+            if attr.endswith("_id"):
+                conn.execute("CREATE INDEX IF NOT EXISTS {} ON {} ({})"
+                             .format(quote("{}_{}".format(name, attr)),
+                                     quote(name), quote(attr)))
+        cols = DBStorage.__tables[name] = cols[4:]
+        return cols
+
+    def __select(self, name, where=None, params=()):
+        """Returns a dictionary of the keys and objects of the rows of the
+        table of class name matching an SQL condition."""
+        cols = self.__table(name)
+        if cols is None:
+            return {}
+        sql = "SELECT id, created_at, updated_at, extra{} FROM {}".format(
+            "".join(", " + quote(col) for col in cols), quote(name))
+        if where is not None:
+            sql += " WHERE " + where
+        objs = {}
+        live = DBStorage.__live
+        for row in self.__connect().execute(sql, params):
+            key = "{}.{}".format(name, row[0])
+            obj = live.get(key)
+            if obj is None:
+                odict = {"id": row[0], "created_at": row[1],
+                         "updated_at": row[2]}
+                for col, value in zip(cols, row[4:]):
+                    if value is not None:
+                        odict[col] = value
+                if row[3] is not None:
+                    odict.update(json.loads(row[3]))
+                obj = live[key] = classes[name].from_dict(odict)
+            objs[key] = obj
+        return objs
+
+    def __filter(self, cls, equals, bounds):
+        """Returns the objects of class cls whose attributes equal the
+        values of equals and lie between the bounds of bounds.
+
+        Conditions on a column are run in SQL, the others on the objects
+        the SQL query returns. Values equal to the class default are
+        checked on the objects, as unset attributes read as the default.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        cols = self.__table(cls)
+        if cols is None:
+            return {}
+        defaults = declared(classes[cls]) if cls in classes else {}
+        where = []
+        params = []
+        rest = {}
+        for attr, value in equals.items():
+            if (attr in cols and is_scalar(value) and
+                    defaults.get(attr, MISSING) != value):
+                where.append("{} = ?".format(quote(attr)))
+                params.append(value)
+            else:
+                rest[attr] = value
+        for attr, (low, high) in bounds.items():
+            if attr not in cols or not all(
+                    b is None or type(b) in (int, float, str)
+                    for b in (low, high)):
+                continue
+            kinds = {type(b) is str for b in (low, high) if b is not None}
+            if len(kinds) != 1:
+                continue
+            typeof = "'text'" if kinds == {True} else "'integer', 'real'"
+            where.append("typeof({}) IN ({})".format(quote(attr), typeof))
+            for op, bound in ((">=", low), ("<=", high)):
+                if bound is not None:
+                    where.append("{} {} ?".format(quote(attr), op))
+                    params.append(bound)
+        objs = self.__select(cls, " AND ".join(where) or None, params)
+        found = {}
+        for key, obj in objs.items():
+            try:
+                if (all(getattr(obj, attr, MISSING) == value
+                        for attr, value in rest.items()) and
+                        all((low is None or getattr(obj, attr) >= low) and
+                            (high is None or getattr(obj, attr) <= high)
+                            for attr, (low, high) in bounds.items())):
+                    found[key] = obj
+            except (AttributeError, TypeError):
+                pass
+        return found
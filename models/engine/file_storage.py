@@ -1,49 +1,1025 @@
 #!/usr/bin/python3
 """The script defines the FileStorage class."""
+import atexit
 import json
-from models.base_model import BaseModel
+import os
+import threading
+from os import getenv, path
+from models.base_model import BaseModel, classes
 from models.user import User
 from models.city import City
 from models.place import Place
 from models.state import State
 from models.amenity import Amenity
 from models.review import Review
+from models.engine.journal import Journal
+from models.engine.json_stream import iter_items
+from models.engine.index import HashIndex, SortedIndex, GridIndex, MISSING
+from models.engine.columns import Table
+from models.engine.snapshot import Snapshot, write_snapshot
+from models.engine.parallel import can_load_parallel, load_parallel
+from models.engine.codec import get_codec
+from models.engine.binary import load_binary, write_binary
+from models.engine.compression import (check, find, open_store, suffix,
+                                       writer)
+from models.engine.atomic import atomic_open
+from models.engine.ids import IdTable
+from models.engine import bulk
 
 
 class FileStorage:
     """This represents the abstracted storage engine.
 
+    Objects are saved to the JSON file __file_path, or as configured by
+    the HBNB_STORAGE_* and HBNB_JSON_CODEC environment variables listed
+    in the README. The methods implementing each mode describe it.
+
     Attributes:
         __objects (dict): A dictionary of instantiated objects.
         __file_path (str): The name of the file to save objects to.
+        __pending (dict): The keys changed since the last save, mapped to
+            their object, or to None when deleted.
+        __classes (dict): The objects of __objects by class name.
+        __indexes (dict): The attribute indexes of each class name.
+        __indexed (dict): The __objects the indexes were built from.
+        __unlinked (list): The (key, object) pairs not added to the
+            attribute indexes and tables yet.
+        __tables (dict): The Table of the objects of each class name
+            aggregated.
+        __fragments (dict): The keys mapped to the (object, JSON text)
+            pair of their last encoding.
+        __log_mode (bool): True to append saves to __journal.
+        __journal (Journal): The log of changes since the last compact.
+        __compact_after (int): The log length that triggers a compact.
+        __lazy_mode (bool): True to build objects on first access.
+        __raw (dict): The objects not built yet in lazy mode.
+        __snapshot_path (str): The name of the binary snapshot.
+        __snapshot_mode (bool): True to read objects from the snapshot.
+        __snapshot (Snapshot): The mapped snapshot, or None.
+        __shadowed (set): The keys and class names no longer read from
+            __snapshot.
+        __shard_mode (bool): True to store each class in its own shard.
+        __shard_dir (str): The name of the directory of the shards.
+        __unloaded (set): The class names whose shard was not read yet.
+        __dirty (set): The class names whose shard is out of date.
+        __workers (int): The number of processes reload() parses with.
+        __double_buffer (bool): True to keep the previous generation of
+            each file as <file>.prev.
+        __write_behind (bool): True to defer saves to __flusher.
+        __flush_interval (float): The seconds between flushes.
+        __flush_after (int): The deferred saves that trigger a flush.
+        __unsaved (int): The number of saves deferred since the last
+            flush.
+        __flusher (Thread): The background flush thread, or None.
+        __stopping (Event): Set by close() to stop __flusher.
+        __closing (bool): True once close() is registered to run at exit.
+        __lock (RLock): Held while objects are changed or persisted.
+        __codec (Codec): The JSON codec objects are encoded with.
+        __binary_mode (bool): True to use the binary store format.
+        __binary_path (str): The name of the binary store.
+        __compression (str): The name of the compression, or None.
+        __ids (IdTable): The canonical copy of each id referred to.
+        __batch (Batch): The batches open on storage.
     """
     __file_path = "file.json"
     __objects = {}
+    __classes = {}
+    __indexes = {
+        "City": {"state_id": HashIndex("state_id")},
+        "Place": {"city_id": HashIndex("city_id"),
+                  "user_id": HashIndex("user_id"),
+                  "price_by_night": SortedIndex("price_by_night"),
+                  "number_rooms": SortedIndex("number_rooms"),
+                  "max_guest": SortedIndex("max_guest"),
+                  ("latitude", "longitude"): GridIndex("latitude",
+                                                       "longitude")},
+        "Review": {"place_id": HashIndex("place_id"),
+                   "user_id": HashIndex("user_id")}
+    }
+    __indexed = None
+    __unlinked = []
+    __tables = {}
+    __pending = {}
+    __fragments = {}
+    __log_mode = getenv("HBNB_STORAGE_LOG") == "1"
+    __journal = Journal(__file_path + ".log")
+    __compact_after = 1000
+    __lazy_mode = getenv("HBNB_STORAGE_LAZY") == "1"
+    __raw = {}
+    __snapshot_path = __file_path + ".snap"
+    __snapshot_mode = getenv("HBNB_STORAGE_SNAPSHOT") == "1"
+    __snapshot = None
+    __shadowed = set()
+    __shard_mode = getenv("HBNB_STORAGE_SHARDS") == "1"
+    __shard_dir = __file_path + ".d"
+    __unloaded = set()
+    __dirty = set()
+    __workers = int(getenv("HBNB_STORAGE_WORKERS", "1"))
+    __double_buffer = getenv("HBNB_STORAGE_DOUBLE_BUFFER") == "1"
+    __write_behind = getenv("HBNB_STORAGE_WRITE_BEHIND") == "1"
+    __flush_interval = float(getenv("HBNB_STORAGE_FLUSH_INTERVAL", "1"))
+    __flush_after = int(getenv("HBNB_STORAGE_FLUSH_AFTER", "100"))
+    __unsaved = 0
+    __flusher = None
+    __stopping = threading.Event()
+    __closing = False
+    __lock = threading.RLock()
+    __codec = get_codec(getenv("HBNB_JSON_CODEC") or None)
+    __binary_mode = getenv("HBNB_STORAGE_FORMAT") == "binary"
+    __binary_path = "file.hbnb"
+    __compression = check(getenv("HBNB_STORAGE_COMPRESSION") or None)
+    __ids = IdTable()
+    __batch = bulk.Batch()
+
+    def all(self, cls=None):
+        """Returns the dictionary __objects, or only the objects of cls.
+
+        Args:
+            cls (type or str): The class, or class name, to filter on.
+        """
+        with FileStorage.__lock:
+            if cls is None:
+                if len(FileStorage.__unloaded) != 0:
+                    self.__load()
+                if len(FileStorage.__raw) != 0:
+                    self.__hydrate()
+                if FileStorage.__snapshot is not None:
+                    self.__unmap()
+                return FileStorage.__objects
+            if type(cls) is not str:
+                cls = cls.__name__
+            if cls in FileStorage.__unloaded:
+                self.__load(cls)
+            if cls in FileStorage.__raw:
+                self.__hydrate(cls)
+            if (FileStorage.__snapshot is not None and
+                    cls not in FileStorage.__shadowed):
+                self.__unmap(cls)
+            return self.__index().get(cls, {})
+
+    def get(self, cls, id):
+        """Returns the object of class cls with the given id, or None if
+        there is none. In lazy mode only that object is built.
+
+        Args:
+            cls (type or str): The class, or class name, of the object.
+            id (str): The id of the object.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        key = cls + "." + id
+        with FileStorage.__lock:
+            if cls in FileStorage.__unloaded:
+                self.__load(cls)
+            if key in FileStorage.__raw.get(cls, {}):
+                self.__hydrate(cls, key)
+            elif (FileStorage.__snapshot is not None and
+                    key not in FileStorage.__shadowed):
+                self.__unmap(cls, key)
+            return FileStorage.__objects.get(key)
+
+    def count(self, cls=None):
+        """Returns the number of objects in storage, or of class cls,
+        without building the objects not accessed yet in lazy mode.
+
+        Args:
+            cls (type or str): The class, or class name, to count.
+        """
+        raw = FileStorage.__raw
+        if cls is not None and type(cls) is not str:
+            cls = cls.__name__
+        with FileStorage.__lock:
+            if cls is None and len(FileStorage.__unloaded) != 0:
+                self.__load()
+            elif cls in FileStorage.__unloaded:
+                self.__load(cls)
+        if cls is None:
+            count = (len(FileStorage.__objects) +
+                     sum(len(keys) for keys in raw.values()))
+        else:
+            count = (len(self.__reindex().get(cls, {})) +
+                     len(raw.get(cls, {})))
+        snapshot = FileStorage.__snapshot
+        if snapshot is not None:
+            prefix = "" if cls is None else cls + "."
+            count += snapshot.count(cls) - sum(
+                1 for key in FileStorage.__shadowed
+                if key.startswith(prefix) and key in snapshot)
+        return count
+
+    def find(self, cls, **equals):
+        """Returns the objects of class cls whose attributes equal the
+        given values, using an attribute index when one exists.
+
+        Args:
+            cls (type or str): The class, or class name, to search.
+            **equals (dict): The attribute names and values to match.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        objs = self.all(cls)
+        indexes = FileStorage.__indexes.get(cls, {})
+        for attr, value in equals.items():
+            if attr in indexes:
+                found = indexes[attr].lookup(value)
+                if found is not None and len(found) < len(objs):
+                    objs = found
+        return {key: obj for key, obj in objs.items()
+                if all(getattr(obj, attr, MISSING) == value
+                       for attr, value in equals.items())}
+
+    def find_range(self, cls, **bounds):
+        """Returns the objects of class cls whose attributes lie between
+        the given bounds, using the most selective sorted index.
+
+        Args:
+            cls (type or str): The class, or class name, to search.
+            **bounds (dict): The attribute names mapped to a (low, high)
+                pair of inclusive bounds; None leaves a bound open.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        objs = self.all(cls)
+        best = None
+        indexes = FileStorage.__indexes.get(cls, {})
+        for attr, (low, high) in bounds.items():
+            index = indexes.get(attr)
+            if isinstance(index, SortedIndex):
+                start, stop = index.span(low, high)
+                if best is None or stop - start < best[1]:
+                    best = (index, stop - start, low, high)
+        if best is not None:
+            objs = best[0].range(best[2], best[3])
+        found = {}
+        for key, obj in objs.items():
+            try:
+                if all((low is None or getattr(obj, attr) >= low) and
+                       (high is None or getattr(obj, attr) <= high)
+                       for attr, (low, high) in bounds.items()):
+                    found[key] = obj
+            except (AttributeError, TypeError):
+                pass
+        return found
+
+    def aggregate(self, cls, group_by=None, metrics=("count",)):
+        """Computes aggregate metrics over the objects of class cls, as
+        ColumnStorage does.
+
+        The attributes of the objects are kept in a Table of columns in
+        __tables, built by the first aggregate of the class and then kept
+        up to date with the objects added, passed again to new() or
+        deleted, so the metrics are computed over the columns without
+        reading the attributes of each object again. Only the attributes
+        set on an object count, not the class defaults of those unset.
+
+        Args:
+            cls (type or str): The class, or class name, to aggregate.
+            group_by (str): The attribute to group objects on, or None.
+            metrics (list): The metrics, "count" or "<function>(<attr>)"
+                with function one of count, sum, avg, min and max.
+
+        Returns:
+            A dictionary of each group value (None without group_by)
+            mapped to a dictionary of each metric and its value.
+
+        Raises:
+            ValueError: If a metric is not known, or a value of group_by
+                cannot be grouped on, such as a list.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        with FileStorage.__lock:
+            objs = self.all(cls)
+            table = FileStorage.__tables.get(cls)
+            if table is None:
+                table = FileStorage.__tables[cls] = Table(cls)
+                for obj in objs.values():
+                    table.put(obj.to_dict(native=True))
+            return table.aggregate(metrics, group_by)
+
+    def near(self, latitude, longitude, radius_km, cls="Place"):
+        """Returns the objects of class cls located within radius_km
+        kilometers of a point, nearest first.
+
+        Args:
+            latitude (float): The latitude of the point.
+            longitude (float): The longitude of the point.
+            radius_km (float): The search radius, in kilometers.
+            cls (type or str): The class, or class name, to search.
+
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        return self.__grid(cls).near(latitude, longitude, radius_km)
+
+    def within_bbox(self, south, west, north, east, cls="Place"):
+        """Returns the objects of class cls located inside a bounding box.
+        A box with west > east crosses the antimeridian.
+
+        Args:
+            south (float): The lowest latitude of the box.
+            west (float): The western longitude of the box.
+            north (float): The highest latitude of the box.
+            east (float): The eastern longitude of the box.
+            cls (type or str): The class, or class name, to search.
 
-    def all(self):
-        """Returns the dictionary __objects."""
-        return FileStorage.__objects
+        Returns:
+            A dictionary of the matching <class>.<id> keys and objects.
+        """
+        return self.__grid(cls).within_bbox(south, west, north, east)
+
+    def __grid(self, cls):
+        """Returns the GridIndex on the latitude and longitude of class
+        cls, or a temporary one built from its objects if none exists."""
+        if type(cls) is not str:
+            cls = cls.__name__
+        self.all(cls)
+        attrs = ("latitude", "longitude")
+        index = FileStorage.__indexes.get(cls, {}).get(attrs)
+        if index is None:
+            index = GridIndex(*attrs)
+            index.add_all(self.all(cls))
+        return index
+
+    def create_index(self, cls, attr, ordered=False):
+        """Declares an index on attribute attr of class cls.
+
+        Args:
+            cls (type or str): The class, or class name, to index.
+            attr (str): The name of the attribute to index.
+            ordered (bool): True for a SortedIndex answering range
+                queries on a numeric attribute, False for a HashIndex.
+        """
+        if type(cls) is not str:
+            cls = cls.__name__
+        objs = self.all(cls)
+        indexes = FileStorage.__indexes.setdefault(cls, {})
+        if attr in indexes:
+            return
+        index = SortedIndex(attr) if ordered else HashIndex(attr)
+        indexes[attr] = index
+        index.add_all(objs)
 
     def new(self, obj):
-        """Get in __objects obj with key <obj_class_name>.id"""
+        """Get in __objects obj with key <obj_class_name>.id
+
+        Objects changed in place must be passed to new() again (as
+        BaseModel.save() does) to be re-encoded by the next save.
+        """
+        ocname = obj.__class__.__name__
+        key = ocname + "." + obj.id
+        with FileStorage.__lock:
+            if ocname in FileStorage.__unloaded:
+                self.__load(ocname)
+            FileStorage.__ids.share_object(obj)
+            FileStorage.__raw.get(ocname, {}).pop(key, None)
+            if FileStorage.__snapshot is not None:
+                FileStorage.__shadowed.add(key)
+            FileStorage.__objects[key] = obj
+            self.__reindex()
+            self.__link(key, obj)
+            FileStorage.__pending[key] = obj
+            FileStorage.__dirty.add(ocname)
+
+    def delete(self, obj=None):
+        """Deletes obj from __objects, if it is there."""
+        if obj is None:
+            return
         ocname = obj.__class__.__name__
-        FileStorage.__objects["{}.{}".format(ocname, obj.id)] = obj
+        key = ocname + "." + obj.id
+        with FileStorage.__lock:
+            if ocname in FileStorage.__unloaded:
+                self.__load(ocname)
+            raw = FileStorage.__raw.get(ocname, {}).pop(key, None)
+            snapshot = FileStorage.__snapshot
+            if (snapshot is not None and key not in FileStorage.__shadowed and
+                    key in snapshot):
+                FileStorage.__shadowed.add(key)
+                raw = key
+            obj = FileStorage.__objects.pop(key, None)
+            if obj is not None:
+                self.__reindex()
+                self.__unlink(key, obj)
+            if obj is not None or raw is not None:
+                FileStorage.__pending[key] = None
+                FileStorage.__dirty.add(ocname)
 
     def save(self):
-        """Serializes __objects to the JSON file __file_path."""
+        """Persists the changes made since the last save.
+
+        In log mode the pending changes are appended to the log, which is
+        compacted once it grows past __compact_after records. Otherwise
+        __objects is serialized to the JSON file __file_path, or in shard
+        mode the changed classes to their shards.
+
+        In write-behind mode the save is only counted, and persisted by
+        the background thread or by flush(), or right away once
+        __flush_after saves are waiting.
+
+        Within a batch() the save is deferred until the batch exits.
+        """
+        if FileStorage.__batch.defer():
+            return
+        if not FileStorage.__write_behind:
+            self.__persist()
+            return
+        with FileStorage.__lock:
+            FileStorage.__unsaved += 1
+            due = FileStorage.__unsaved >= FileStorage.__flush_after
+        if due:
+            self.flush()
+        elif FileStorage.__flusher is None:
+            self.__start_flusher()
+
+    def batch(self):
+        """Returns a context manager deferring the calls to save() made
+        within it, from any thread, to a single save when it exits, so
+        that creating many objects one at a time, each saved by
+        BaseModel.save(), persists the store once. Batches can be nested,
+        the outermost one saving."""
+        return FileStorage.__batch.open(self.save)
+
+    def bulk_create(self, cls, rows):
+        """Creates an object of class cls from each dictionary of
+        attributes in rows and saves them once (see bulk.bulk_create()).
+
+        Returns:
+            The list of the objects created.
+        """
+        return bulk.bulk_create(self, cls, rows)
+
+    def bulk_update(self, cls, rows):
+        """Sets the attributes of the objects of class cls listed, with
+        their id, in the dictionaries rows and saves them once (see
+        bulk.bulk_update()).
+
+        Returns:
+            The list of the objects updated.
+
+        Raises:
+            KeyError: If no object of class cls has one of the ids.
+        """
+        return bulk.bulk_update(self, cls, rows)
+
+    def bulk_delete(self, cls, ids):
+        """Deletes the objects of class cls with the given ids and saves
+        once (see bulk.bulk_delete()).
+
+        Returns:
+            The number of objects deleted.
+        """
+        return bulk.bulk_delete(self, cls, ids)
+
+    def flush(self):
+        """Persists the saves deferred in write-behind mode, if any."""
+        with FileStorage.__lock:
+            if FileStorage.__unsaved == 0:
+                return
+            FileStorage.__unsaved = 0
+            self.__persist()
+
+    def close(self):
+        """Stops the background flush thread, if it runs, and persists the
+        saves deferred in write-behind mode."""
+        flusher = FileStorage.__flusher
+        if flusher is not None:
+            FileStorage.__stopping.set()
+            flusher.join()
+            FileStorage.__flusher = None
+            FileStorage.__stopping.clear()
+        self.flush()
+
+    def __start_flusher(self):
+        """Starts the background thread flushing deferred saves every
+        __flush_interval seconds, and flushes them at exit. close() is
+        registered to run at exit only the first time the thread starts,
+        however many times it is stopped and started again."""
+        with FileStorage.__lock:
+            if FileStorage.__flusher is not None:
+                return
+            FileStorage.__flusher = threading.Thread(
+                target=self.__flush_loop, name="FileStorage-flush",
+                daemon=True)
+            FileStorage.__flusher.start()
+            if FileStorage.__closing:
+                return
+            FileStorage.__closing = True
+        atexit.register(self.close)
+
+    def __flush_loop(self):
+        """Flushes the deferred saves every __flush_interval seconds until
+        __stopping is set."""
+        while not FileStorage.__stopping.wait(FileStorage.__flush_interval):
+            self.flush()
+
+    def __persist(self):
+        """Appends the pending changes to the log in log mode, compacting
+        it if it grew past __compact_after records, or compacts."""
+        with FileStorage.__lock:
+            if not FileStorage.__log_mode:
+                self.compact()
+                return
+            FileStorage.__journal.append(self.__encode_pending())
+            if FileStorage.__journal.records >= FileStorage.__compact_after:
+                self.compact()
+
+    def compact(self):
+        """Serializes __objects to __file_path and empties the log.
+
+        The file is written one object per line as it is encoded,
+        rather than built in memory first, to a temporary file renamed
+        over __file_path once on disk. In shard mode only the shards
+        of the classes in __dirty are rewritten, and the shard of a class
+        with no objects left is removed. In binary mode __objects is
+        written to __binary_path instead.
+        """
+        with FileStorage.__lock:
+            if FileStorage.__shard_mode:
+                self.__compact_shards()
+                return
+            if len(FileStorage.__raw) != 0:
+                self.__hydrate()
+            if FileStorage.__snapshot is not None:
+                self.__unmap()
+            if FileStorage.__binary_mode:
+                self.__dump_binary()
+                return
+            self.__encode_pending()
+            frags = FileStorage.__fragments
+            self.__dump(self.__store_path(), FileStorage.__objects,
+                        FileStorage.__compression)
+            FileStorage.__dirty.clear()
+            FileStorage.__journal.truncate()
+            if (FileStorage.__snapshot_mode and
+                    FileStorage.__compression is None):
+                write_snapshot(FileStorage.__snapshot_path,
+                               ((key, frags[key][1])
+                                for key in FileStorage.__objects))
+
+    def __compact_shards(self):
+        """Rewrites the shards of the classes in __dirty and empties the
+        log."""
+        dirty = FileStorage.__dirty
+        for name in dirty & FileStorage.__unloaded:
+            self.__load(name)
+        self.__encode_pending()
+        os.makedirs(FileStorage.__shard_dir, exist_ok=True)
+        index = self.__reindex()
+        for name in sorted(dirty):
+            objs = index.get(name)
+            if objs:
+                self.__dump(self.__shard(name), objs,
+                            FileStorage.__compression)
+            else:
+                try:
+                    os.remove(self.__shard(name))
+                except FileNotFoundError:
+                    pass
+        dirty.clear()
+        FileStorage.__journal.truncate()
+
+    def __dump(self, fpath, objs, compression=None):
+        """Writes the objects of the dictionary objs to the JSON file fpath,
+        one object per line, re-encoding only those not cached in
+        __fragments, and compressed as it is written with compression
+        unless it is None. The file is replaced atomically, keeping the
+        previous generation in double-buffered mode."""
+        frags = FileStorage.__fragments
+        keep = fpath + ".prev" if FileStorage.__double_buffer else None
+        with atomic_open(fpath, "wb", keep=keep) as raw:
+            with writer(raw, compression) as f:
+                f.write("{")
+                sep = "\n"
+                for key, obj in objs.items():
+                    cached = frags.get(key)
+                    if cached is None or cached[0] is not obj:
+                        cached = frags[key] = (obj, self.__encode(obj))
+                    f.write("{}{}: {}".format(sep, json.dumps(key),
+                                              cached[1]))
+                    sep = ",\n"
+                f.write("\n}\n")
+
+    def __store_path(self, existing=False):
+        """Returns the name of the file the store is saved to, __file_path
+        or __binary_path in binary mode, with the suffix of __compression.
+
+        Args:
+            existing (bool): True for the name of the file to read the
+                store from instead, which may have the suffix of another
+                compression (see compression.find()).
+        """
+        if FileStorage.__binary_mode:
+            fpath = FileStorage.__binary_path
+        else:
+            fpath = FileStorage.__file_path
+        if existing:
+            return find(fpath, FileStorage.__compression)
+        return fpath + suffix(FileStorage.__compression)
+
+    def __dump_binary(self):
+        """Writes __objects to the binary store __binary_path, grouped by
+        class, and empties the log."""
+        FileStorage.__pending.clear()
+        groups = ((name, [obj.to_dict(native=True) for obj in objs.values()])
+                  for name, objs in self.__reindex().items())
+        fpath = self.__store_path()
+        keep = fpath + ".prev" if FileStorage.__double_buffer else None
+        with atomic_open(fpath, "wb", keep=keep) as raw:
+            with writer(raw, FileStorage.__compression, False) as f:
+                write_binary(f, groups)
+        FileStorage.__dirty.clear()
+        FileStorage.__journal.truncate()
+
+    def __read_binary(self):
+        """Builds the objects of the binary store __binary_path, or of its
+        previous generation in double-buffered mode if it is missing or
+        cannot be read, into __objects, as its records are decoded.
+
+        Raises:
+            ValueError: If no generation of the store can be read.
+        """
+        fpath = self.__store_path(True)
+        error = None
+        for fpath in ([fpath, fpath + ".prev"] if FileStorage.__double_buffer
+                      else [fpath]):
+            try:
+                for key, o in load_binary(fpath):
+                    self.__build(key, o)
+            except FileNotFoundError:
+                continue
+            except ValueError as e:
+                error = error or e
+                continue
+            return
+        if error is not None:
+            raise error
+
+    def __shard(self, name):
+        """Returns the path of the shard of the class named name, with the
+        suffix of __compression. Shards are always JSON, whatever the
+        format of the store."""
+        return path.join(FileStorage.__shard_dir,
+                         name + ".json" + suffix(FileStorage.__compression))
+
+    def __load(self, cls=None):
+        """Reads the shard of class cls, or every shard not read yet, and
+        builds its objects into __objects."""
+        unloaded = FileStorage.__unloaded
+        names = [cls] if cls is not None else sorted(unloaded)
+        unloaded.difference_update(names)
+        self.__read([self.__shard(name) for name in names])
+
+    def __read(self, fpaths):
+        """Builds the objects of the JSON files fpaths that exist into
+        __objects, split between __workers processes when there are more
+        than one and the files are laid out one object per line.
+
+        In double-buffered mode the previous generation of a file is read
+        instead when the file is missing or cannot be parsed.
+
+        Raises:
+            ValueError: If a file, and its previous generation if any,
+                cannot be parsed.
+        """
+        double = FileStorage.__double_buffer
+        current = []
+        for fpath in fpaths:
+            if path.isfile(fpath):
+                current.append(fpath)
+            elif double and path.isfile(fpath + ".prev"):
+                current.append(fpath + ".prev")
+        self.__reindex()
+        if can_load_parallel(FileStorage.__workers):
+            try:
+                for key, obj in load_parallel(current, FileStorage.__workers,
+                                              FileStorage.__codec.name):
+                    FileStorage.__objects[key] = obj
+                    self.__link(key, FileStorage.__ids.share_object(obj))
+                return
+            except ValueError:
+                pass
+        for fpath in current:
+            try:
+                self.__parse(fpath)
+            except ValueError:
+                if (not double or fpath.endswith(".prev") or
+                        not path.isfile(fpath + ".prev")):
+                    raise
+                self.__parse(fpath + ".prev")
+
+    def __parse(self, fpath):
+        """Builds the objects of the JSON file fpath into __objects, parsed
+        one object at a time, by __codec when the file is laid out one
+        object per line. A compressed file is decompressed as it is
+        parsed.
+
+        The layout is told from the first 3 bytes only, as a store written
+        on a single line by json.dump() would be read whole otherwise."""
+        loads = FileStorage.__codec.loads
+        with open_store(fpath, text=False) as f:
+            if f.readline(3) == b"{\n":
+                for line in f:
+                    if line == b"}\n":
+                        break
+                    entry = loads(b"{" + line.rstrip(b",\n") + b"}")
+                    for key, o in entry.items():
+                        self.__build(key, o)
+                return
+        with open_store(fpath) as f:
+            for key, o in iter_items(f):
+                self.__build(key, o)
+
+    def __encode(self, obj):
+        """Returns the JSON text of the dictionary of obj, letting the
+        codec encode its timestamps when it can."""
+        codec = FileStorage.__codec
+        return codec.dumps(obj.to_dict(native=codec.native))
+
+    def __encode_pending(self):
+        """Re-encodes the objects in __pending and empties it.
+
+        Returns:
+            A dict of the pending keys mapped to the new JSON text of their
+            object, or to None for deleted keys.
+        """
+        frags = FileStorage.__fragments
+        changes = {}
+        for key, obj in FileStorage.__pending.items():
+            if obj is None:
+                frags.pop(key, None)
+                changes[key] = None
+            else:
+                frag = self.__encode(obj)
+                frags[key] = (obj, frag)
+                changes[key] = frag
+        FileStorage.__pending.clear()
+        return changes
+
+    def __index(self):
+        """Returns __classes, once the attribute indexes and the tables
+        are up to date.
+
+        The objects queued in __unlinked are added to them together,
+        grouped by class, so that a SortedIndex sorts its entries once
+        for all the objects loaded or created since the last query (see
+        SortedIndex.add_all()). Queued objects no longer in __objects
+        are skipped.
+        """
+        classes = self.__reindex()
+        unlinked = FileStorage.__unlinked
+        if len(unlinked) == 0:
+            return classes
+        FileStorage.__unlinked = []
         odict = FileStorage.__objects
-        objdict = {obj: odict[obj].to_dict() for obj in odict.keys()}
-        with open(FileStorage.__file_path, "w") as f:
-            json.dump(objdict, f)
+        groups = {}
+        for key, obj in unlinked:
+            if odict.get(key) is obj:
+                groups.setdefault(obj.__class__.__name__, {})[key] = obj
+        for ocname, objs in groups.items():
+            for index in FileStorage.__indexes.get(ocname, {}).values():
+                index.add_all(objs)
+            table = FileStorage.__tables.get(ocname)
+            if table is not None:
+                for obj in objs.values():
+                    table.put(obj.to_dict(native=True))
+        return classes
 
-    def reload(self):
-        """Deserializes JSON file __file_path to __objects, if it exists."""
+    def __reindex(self):
+        """Returns __classes, rebuilding it, dropping the tables and
+        queuing every object to be added to the cleared attribute indexes
+        if __objects was replaced since they were built."""
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__indexed = FileStorage.__objects
+            FileStorage.__classes = {}
+            FileStorage.__unlinked = []
+            FileStorage.__tables = {}
+            for indexes in FileStorage.__indexes.values():
+                for index in indexes.values():
+                    index.clear()
+            for key, obj in FileStorage.__objects.items():
+                self.__link(key, obj)
+        return FileStorage.__classes
+
+    def __link(self, key, obj):
+        """Adds obj to the per-class index, and queues it to be added to
+        its attribute indexes and its table by the next __index()."""
+        ocname = obj.__class__.__name__
+        FileStorage.__classes.setdefault(ocname, {})[key] = obj
+        if ocname in FileStorage.__indexes or ocname in FileStorage.__tables:
+            FileStorage.__unlinked.append((key, obj))
+
+    def __unlink(self, key, obj):
+        """Removes obj from the per-class index, its attribute indexes and
+        its table."""
+        ocname = obj.__class__.__name__
+        FileStorage.__classes.get(ocname, {}).pop(key, None)
+        for index in FileStorage.__indexes.get(ocname, {}).values():
+            index.remove(key)
+        table = FileStorage.__tables.get(ocname)
+        if table is not None:
+            table.remove(obj.id)
+
+    def __build(self, key, o):
+        """Builds the object stored under key from its dictionary o,
+        adds it to __objects and returns it. The ids o holds are replaced
+        by their canonical copy first."""
+        FileStorage.__ids.share_dict(o)
+        obj = classes[o["__class__"]].from_dict(o)
+        FileStorage.__objects[key] = obj
+        self.__link(key, obj)
+        return obj
+
+    def __hydrate(self, cls=None, key=None):
+        """Builds the objects of __raw stored under key, of class cls, or
+        all of them, and moves them to __objects."""
+        raw = FileStorage.__raw
+        if key is not None:
+            entries = {key: raw[cls].pop(key)}
+            if len(raw[cls]) == 0:
+                del raw[cls]
+        elif cls is not None:
+            entries = raw.pop(cls)
+        else:
+            entries = {k: o for keys in raw.values() for k, o in keys.items()}
+            raw.clear()
+        self.__reindex()
+        decoder = json.JSONDecoder()
+        f = None
         try:
-            with open(FileStorage.__file_path) as f:
-                objdict = json.load(f)
-                for o in objdict.values():
-                    cls_name = o["__class__"]
-                    del o["__class__"]
-                    self.new(eval(cls_name)(**o))
-        except FileNotFoundError:
+            for key, o in entries.items():
+                if type(o) is not int:
+                    self.__build(key, o)
+                    continue
+                if f is None:
+                    f = open(FileStorage.__file_path, "rb")
+                f.seek(o)
+                line = f.readline().decode()
+                start = line.index(":", decoder.raw_decode(line)[1]) + 1
+                frag = line[start:].rstrip(",\n").strip()
+                obj = self.__build(key, FileStorage.__codec.loads(frag))
+                FileStorage.__fragments[key] = (obj, frag)
+        finally:
+            if f is not None:
+                f.close()
+
+    def __unmap(self, cls=None, key=None):
+        """Builds the objects of __snapshot stored under key, of class cls,
+        or all of them, that are not shadowed, and moves them to __objects.
+        The snapshot is closed once all of them are built."""
+        snapshot = FileStorage.__snapshot
+        shadowed = FileStorage.__shadowed
+        if key is not None:
+            text = snapshot.get(key)
+            items = [] if text is None else [(key, text)]
+        else:
+            items = snapshot.items(cls)
+        self.__reindex()
+        for k, text in items:
+            if k in shadowed:
+                continue
+            shadowed.add(k)
+            obj = self.__build(k, FileStorage.__codec.loads(text))
+            FileStorage.__fragments[k] = (obj, text)
+        if key is not None:
+            return
+        if cls is not None:
+            shadowed.add(cls)
             return
+        snapshot.close()
+        FileStorage.__snapshot = None
+        shadowed.clear()
+
+    def __map(self):
+        """Maps the snapshot __snapshot_path, if it exists and is not older
+        than __file_path, without building any object.
+
+        Returns:
+            True if the snapshot was mapped, False otherwise.
+        """
+        try:
+            if (path.getmtime(FileStorage.__snapshot_path) <
+                    path.getmtime(FileStorage.__file_path)):
+                return False
+            snapshot = Snapshot(FileStorage.__snapshot_path)
+        except (OSError, ValueError):
+            return False
+        odict = FileStorage.__objects
+        for key in [key for key in odict if key in snapshot]:
+            self.__unlink(key, odict.pop(key))
+        FileStorage.__snapshot = snapshot
+        return True
+
+    def __scan(self):
+        """Records the byte offset of the line of each object of
+        __file_path in __raw, without building any object.
+
+        Returns:
+            False if the file is not laid out one object per line, as
+            compact() writes it, or if it is missing and has a previous
+            generation in double-buffered mode, so that reload() reads
+            the file, or its previous generation, in full. True otherwise.
+        """
+        raw = {}
+        decoder = json.JSONDecoder()
+        try:
+            with open(FileStorage.__file_path, "rb") as f:
+                line = f.readline(3)
+                if line != b"{\n":
+                    return False
+                offset = len(line)
+                for line in f:
+                    if line == b"}\n":
+                        break
+                    if (not line.startswith(b'"') or
+                            not line.rstrip(b",\n").endswith(b"}")):
+                        return False
+                    key = decoder.raw_decode(line.decode())[0]
+                    raw.setdefault(key.partition(".")[0], {})[key] = offset
+                    offset += len(line)
+        except FileNotFoundError:
+            if (FileStorage.__double_buffer and
+                    path.isfile(FileStorage.__file_path + ".prev")):
+                return False
+        for keys in raw.values():
+            for key in keys:
+                obj = FileStorage.__objects.pop(key, None)
+                if obj is not None:
+                    self.__unlink(key, obj)
+        FileStorage.__raw = raw
+        return True
+
+    def reload(self):
+        """Deserializes JSON file __file_path to __objects, if it exists,
+        then replays the changes recorded in the log after it.
+
+        The file is parsed one object at a time, so the whole text and
+        the parsed dictionary are never held in memory at once. In lazy
+        mode only the position of each object is recorded, and objects
+        are built when all(), get() or a query first needs them. In
+        snapshot mode an up to date snapshot is mapped instead, and
+        objects are read from it when first needed in the same way. In
+        shard mode, which takes precedence over both, only the names of
+        the shards are listed, and a shard is read when its class is
+        first needed. In binary mode, which takes precedence over all but
+        shard mode, the binary store is read instead of __file_path.
+        Files are otherwise split into chunks parsed by __workers
+        processes when it is above 1. A compressed store, found by its
+        suffix whatever __compression is, is always read in full,
+        decompressed as it is parsed.
+        """
+        with FileStorage.__lock:
+            odict = FileStorage.__objects
+            raw = FileStorage.__raw
+            self.__reindex()
+            FileStorage.__fragments.clear()
+            FileStorage.__ids.clear()
+            if FileStorage.__snapshot is not None:
+                FileStorage.__snapshot.close()
+                FileStorage.__snapshot = None
+            FileStorage.__shadowed = set()
+            FileStorage.__unloaded = set()
+            if FileStorage.__shard_mode:
+                raw.clear()
+                try:
+                    names = os.listdir(FileStorage.__shard_dir)
+                except FileNotFoundError:
+                    names = []
+                ext = ".json" + suffix(FileStorage.__compression)
+                FileStorage.__unloaded = {name[:-len(ext)] for name in names
+                                          if name.endswith(ext)}
+            elif FileStorage.__binary_mode:
+                raw.clear()
+                self.__read_binary()
+            elif (self.__store_path(True) == FileStorage.__file_path and
+                    FileStorage.__snapshot_mode and self.__map()):
+                raw.clear()
+            elif (self.__store_path(True) == FileStorage.__file_path and
+                    FileStorage.__lazy_mode and self.__scan()):
+                raw = FileStorage.__raw
+            else:
+                raw.clear()
+                self.__read([self.__store_path(True)])
+            for op, key, o in FileStorage.__journal.replay():
+                cls_name = key.partition(".")[0]
+                if cls_name in FileStorage.__unloaded:
+                    self.__load(cls_name)
+                FileStorage.__dirty.add(cls_name)
+                raw.get(cls_name, {}).pop(key, None)
+                if FileStorage.__snapshot is not None:
+                    FileStorage.__shadowed.add(key)
+                obj = odict.pop(key, None)
+                if obj is not None:
+                    self.__unlink(key, obj)
+                if op == "del":
+                    continue
+                if FileStorage.__lazy_mode:
+                    raw.setdefault(cls_name, {})[key] = o
+                else:
+                    self.__build(key, o)
+            self.__index()
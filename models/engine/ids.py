@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""The script defines the IdTable class, which keeps a single copy of
+each id string the objects of a store refer to.
+
+The id of an object is held by every object referring to it, such as
+the place_id and user_id of each Review, and each of them is a copy of
+its own when the objects are parsed from a store. Sharing one string per
+referred id between all of them stores it once however many objects
+refer to it. The own id of each object is left out: most objects are
+referred to by none, and a table entry per object would cost more than
+it saves."""
+from models.base_model import classes
+from models.compact import declared
+
+
+def is_ref_attr(name):
+    """Returns True if the attribute name holds the id of another object,
+    or a list of ids: the names ending in _id or _ids."""
+    return name.endswith("_id") or name.endswith("_ids")
+
+
+def ref_attrs(cls):
+    """Returns a tuple of the names of the attributes declared on the
+    model class cls that hold the ids of other objects."""
+    return tuple(name for name in declared(cls) if is_ref_attr(name))
+
+
+class IdTable:
+    """This represents a table of the canonical copy of each id string
+    referred to."""
+
+    def __init__(self):
+        """Initializes a new, empty IdTable."""
+        self.__ids = {}
+        self.__attrs = {}
+
+    def __len__(self):
+        """Returns the number of ids in the table."""
+        return len(self.__ids)
+
+    def share(self, value):
+        """Returns the canonical copy of the id string value, making value
+        the canonical copy if it is not in the table yet. A list of ids is
+        returned with each of its strings shared, and any other value is
+        returned unchanged."""
+        if type(value) is str:
+            return self.__ids.setdefault(value, value)
+        if type(value) is list:
+            ids = self.__ids
+            return [ids.setdefault(v, v) if type(v) is str else v
+                    for v in value]
+        return value
+
+    def share_dict(self, attrs):
+        """Replaces the ids of other objects held by the dictionary of
+        attributes attrs of an object, made by to_dict(), by their
+        canonical copy, in place, and returns attrs. Only the declared
+        attributes of its __class__ are looked at, the ones most objects
+        hold, which is much faster than looking at each attribute."""
+        name = attrs.get("__class__")
+        names = self.__attrs.get(name)
+        if names is None:
+            cls = classes.get(name)
+            if cls is None:
+                names = tuple(k for k in attrs if is_ref_attr(k))
+            else:
+                names = self.__attrs[name] = ref_attrs(cls)
+        ids = self.__ids
+        for name in names:
+            value = attrs.get(name)
+            if type(value) is str:
+                attrs[name] = ids.setdefault(value, value)
+            elif value is not None:
+                attrs[name] = self.share(value)
+        return attrs
+
+    def share_object(self, obj):
+        """Replaces the ids of other objects held by the attributes of the
+        model object obj by their canonical copy, and returns obj."""
+        attrs = getattr(obj, "__dict__", None)
+        if attrs is None:
+            attrs = obj._attrs()
+        elif type(attrs) is dict:
+            for name, value in attrs.items():
+                if is_ref_attr(name):
+                    attrs[name] = self.share(value)
+            return obj
+        for name, value in attrs.items():
+            if is_ref_attr(name):
+                shared = self.share(value)
+                if shared is not value:
+                    setattr(obj, name, shared)
+        return obj
+
+    def clear(self):
+        """Removes every id from the table."""
+        self.__ids.clear()
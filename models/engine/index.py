@@ -0,0 +1,365 @@
+#!/usr/bin/python3
+"""The script defines the secondary index classes of the storage engine."""
+from bisect import bisect_left, bisect_right, insort
+from math import asin, cos, degrees, floor, pi, radians, sin, sqrt
+MISSING = object()
+EARTH_RADIUS = 6371.0088
+BULK_SIZE = 64
+
+
+class HashIndex:
+    """This represents a hash index on one attribute of a model class.
+
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        entries (dict): The attribute values mapped to a dictionary of the
+            <class>.<id> keys and objects having that value.
+        values (dict): The keys mapped to the value they are indexed under.
+    """
+
+    def __init__(self, attr):
+        """Initializes a new HashIndex.
+
+        Args:
+            attr (str): The name of the attribute to index.
+        """
+        self.attr = attr
+        self.entries = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """Indexes obj under the current value of its attribute.
+
+        An object already in the index is moved from its old value.
+        Objects without the attribute, or with an unhashable value,
+        are left out of the index.
+
+        Args:
+            key (str): The <class>.<id> key of obj.
+            obj (BaseModel): The object to index.
+        """
+        self.remove(key)
+        value = getattr(obj, self.attr, MISSING)
+        if value is MISSING:
+            return
+        try:
+            self.entries.setdefault(value, {})[key] = obj
+        except TypeError:
+            return
+        self.values[key] = value
+
+    def add_all(self, objs):
+        """Indexes each object of objs, as add() does.
+
+        Args:
+            objs (dict): The <class>.<id> keys mapped to their object.
+        """
+        for key, obj in objs.items():
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Removes key from the index, if it is there.
+
+        Args:
+            key (str): The <class>.<id> key to remove.
+        """
+        if key not in self.values:
+            return
+        value = self.values.pop(key)
+        bucket = self.entries[value]
+        del bucket[key]
+        if len(bucket) == 0:
+            del self.entries[value]
+
+    def lookup(self, value):
+        """Returns a dictionary of the keys and objects having value,
+        or None if value cannot be looked up in a hash index."""
+        try:
+            return self.entries.get(value, {})
+        except TypeError:
+            return None
+
+    def clear(self):
+        """Removes every key from the index."""
+        self.entries = {}
+        self.values = {}
+
+
+class SortedIndex:
+    """This represents an ordered index on one numeric attribute of a
+    model class, answering range queries with a binary search.
+
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        entries (list): The sorted (value, key) pairs of indexed objects.
+        objects (dict): The indexed keys mapped to their object.
+        values (dict): The keys mapped to the value they are indexed under.
+    """
+
+    def __init__(self, attr):
+        """Initializes a new SortedIndex.
+
+        Args:
+            attr (str): The name of the attribute to index.
+        """
+        self.attr = attr
+        self.entries = []
+        self.objects = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """Indexes obj under the current value of its attribute.
+
+        An object already in the index is moved from its old value.
+        Objects whose attribute is missing, not a number or NaN are left
+        out of the index.
+
+        Args:
+            key (str): The <class>.<id> key of obj.
+            obj (BaseModel): The object to index.
+        """
+        self.remove(key)
+        value = getattr(obj, self.attr, MISSING)
+        if type(value) not in (int, float) or value != value:
+            return
+        insort(self.entries, (value, key))
+        self.objects[key] = obj
+        self.values[key] = value
+
+    def add_all(self, objs):
+        """Indexes each object of objs, as add() does.
+
+        Inserting each entry in place moves the entries after it, which
+        makes loading n objects one at a time quadratic. From BULK_SIZE
+        objects on, the new entries are appended and the list sorted
+        once instead, in O(n log n).
+
+        Args:
+            objs (dict): The <class>.<id> keys mapped to their object.
+        """
+        if len(objs) < BULK_SIZE:
+            for key, obj in objs.items():
+                self.add(key, obj)
+            return
+        values = self.values
+        stale = [key for key in objs if key in values]
+        if len(stale) != 0:
+            for key in stale:
+                del values[key]
+                del self.objects[key]
+            self.entries = [entry for entry in self.entries
+                            if entry[1] in values]
+        added = []
+        for key, obj in objs.items():
+            value = getattr(obj, self.attr, MISSING)
+            if type(value) not in (int, float) or value != value:
+                continue
+            added.append((value, key))
+            self.objects[key] = obj
+            values[key] = value
+        self.entries.extend(added)
+        self.entries.sort()
+
+    def remove(self, key):
+        """Removes key from the index, if it is there.
+
+        Args:
+            key (str): The <class>.<id> key to remove.
+        """
+        if key not in self.values:
+            return
+        entry = (self.values.pop(key), key)
+        del self.entries[bisect_left(self.entries, entry)]
+        del self.objects[key]
+
+    def span(self, low=None, high=None):
+        """Returns the (start, stop) positions in entries of the values
+        between low and high, both included. None leaves a bound open."""
+        start = 0 if low is None else bisect_left(self.entries, (low,))
+        if high is None:
+            stop = len(self.entries)
+        else:
+            # Keys start with a class name, so they all sort below
+            # the highest code point.
+            stop = bisect_right(self.entries, (high, "\U0010ffff"))
+        return start, max(start, stop)
+
+    def range(self, low=None, high=None):
+        """Returns a dictionary of the keys and objects whose value lies
+        between low and high, both included, in ascending value order.
+        None leaves a bound open."""
+        start, stop = self.span(low, high)
+        objs = self.objects
+        return {key: objs[key] for value, key in self.entries[start:stop]}
+
+    def lookup(self, value):
+        """Returns a dictionary of the keys and objects having value,
+        or None if value cannot be looked up in a sorted index."""
+        if type(value) not in (int, float):
+            return None
+        return self.range(value, value)
+
+    def clear(self):
+        """Removes every key from the index."""
+        self.entries = []
+        self.objects = {}
+        self.values = {}
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Returns the great-circle distance in kilometers between two points
+    given by their latitude and longitude in degrees."""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = (sin((lat2 - lat1) / 2) ** 2 +
+         cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(a)))
+
+
+class GridIndex:
+    """This represents a spatial index on a latitude/longitude attribute
+    pair, bucketing objects into square cells of the coordinate grid.
+
+    Attributes:
+        attrs (tuple): The names of the latitude and longitude attributes.
+        cell (float): The side of a grid cell, in degrees.
+        cells (dict): The (row, column) of each non-empty cell mapped to a
+            dictionary of the keys and objects located in it.
+        positions (dict): The keys mapped to the (latitude, longitude)
+            they are indexed under.
+    """
+
+    def __init__(self, lat_attr, lon_attr, cell=0.1):
+        """Initializes a new GridIndex.
+
+        Args:
+            lat_attr (str): The name of the latitude attribute.
+            lon_attr (str): The name of the longitude attribute.
+            cell (float): The side of a grid cell, in degrees.
+        """
+        self.attrs = (lat_attr, lon_attr)
+        self.cell = cell
+        self.cells = {}
+        self.positions = {}
+
+    def __cell(self, lat, lon):
+        """Returns the (row, column) of the cell containing a point."""
+        return (floor(lat / self.cell), floor(lon / self.cell))
+
+    def add(self, key, obj):
+        """Indexes obj under its current position.
+
+        An object already in the index is moved from its old position.
+        Objects without valid coordinates are left out of the index.
+
+        Args:
+            key (str): The <class>.<id> key of obj.
+            obj (BaseModel): The object to index.
+        """
+        self.remove(key)
+        lat = getattr(obj, self.attrs[0], MISSING)
+        lon = getattr(obj, self.attrs[1], MISSING)
+        if type(lat) not in (int, float) or type(lon) not in (int, float):
+            return
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return
+        self.cells.setdefault(self.__cell(lat, lon), {})[key] = obj
+        self.positions[key] = (lat, lon)
+
+    def add_all(self, objs):
+        """Indexes each object of objs, as add() does.
+
+        Args:
+            objs (dict): The <class>.<id> keys mapped to their object.
+        """
+        for key, obj in objs.items():
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Removes key from the index, if it is there.
+
+        Args:
+            key (str): The <class>.<id> key to remove.
+        """
+        if key not in self.positions:
+            return
+        cell = self.__cell(*self.positions.pop(key))
+        bucket = self.cells[cell]
+        del bucket[key]
+        if len(bucket) == 0:
+            del self.cells[cell]
+
+    def within_bbox(self, south, west, north, east):
+        """Returns a dictionary of the keys and objects located inside a
+        bounding box. A box with west > east crosses the antimeridian.
+
+        Args:
+            south (float): The lowest latitude of the box.
+            west (float): The western longitude of the box.
+            north (float): The highest latitude of the box.
+            east (float): The eastern longitude of the box.
+        """
+        if west <= east:
+            spans = [(west, east)]
+        else:
+            spans = [(west, 180), (-180, east)]
+        rows = (floor(south / self.cell), floor(north / self.cell))
+        ranges = []
+        for lo, hi in spans:
+            cols = (floor(lo / self.cell), floor(hi / self.cell))
+            ranges.append((cols, lo, hi))
+        ncells = sum((rows[1] - rows[0] + 1) * (c[1] - c[0] + 1)
+                     for c, lo, hi in ranges)
+        if ncells > len(self.cells):
+            cells = [c for c in self.cells
+                     if rows[0] <= c[0] <= rows[1] and
+                     any(r[0][0] <= c[1] <= r[0][1] for r in ranges)]
+        else:
+            cells = [(row, col) for cols, lo, hi in ranges
+                     for row in range(rows[0], rows[1] + 1)
+                     for col in range(cols[0], cols[1] + 1)
+                     if (row, col) in self.cells]
+        found = {}
+        positions = self.positions
+        for cell in cells:
+            for key, obj in self.cells[cell].items():
+                lat, lon = positions[key]
+                if south <= lat <= north and any(lo <= lon <= hi
+                                                 for c, lo, hi in ranges):
+                    found[key] = obj
+        return found
+
+    def near(self, lat, lon, radius_km):
+        """Returns a dictionary of the keys and objects located within
+        radius_km kilometers of a point, nearest first.
+
+        Args:
+            lat (float): The latitude of the point.
+            lon (float): The longitude of the point.
+            radius_km (float): The search radius, in kilometers.
+        """
+        angle = radius_km / EARTH_RADIUS
+        dlat = degrees(angle)
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        if south == -90.0 or north == 90.0 or angle >= pi / 2:
+            west, east = -180.0, 180.0
+        else:
+            dlon = degrees(asin(min(1.0, sin(angle) / cos(radians(lat)))))
+            west, east = lon - dlon, lon + dlon
+            if dlon >= 180:
+                west, east = -180.0, 180.0
+            elif west < -180:
+                west += 360
+            elif east > 180:
+                east -= 360
+        found = []
+        for key, obj in self.within_bbox(south, west, north, east).items():
+            dist = haversine(lat, lon, *self.positions[key])
+            if dist <= radius_km:
+                found.append((dist, key, obj))
+        found.sort(key=lambda f: f[0])
+        return {key: obj for dist, key, obj in found}
+
+    def clear(self):
+        """Removes every key from the index."""
+        self.cells = {}
+        self.positions = {}
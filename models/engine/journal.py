@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""The script defines the Journal class."""
+import json
+import os
+
+
+class Journal:
+    """This represents an append-only log of storage changes.
+
+    Each line of the log file is one JSON record, either
+    {"op": "put", "key": <key>, "obj": <dict>} or {"op": "del", "key": <key>}.
+
+    Attributes:
+        path (str): The name of the log file.
+        records (int): The number of records currently in the log.
+    """
+
+    def __init__(self, path):
+        """Initializes a new Journal.
+
+        Args:
+            path (str): The name of the log file.
+        """
+        self.path = path
+        self.records = 0
+
+    def append(self, changes):
+        """Appends one record per change to the log file, and flushes it
+        to disk.
+
+        Args:
+            changes (dict): Keys mapped to the JSON text of the object
+                to store, or to None when the key was deleted.
+        """
+        lines = []
+        for key, frag in changes.items():
+            if frag is None:
+                rec = '{{"op": "del", "key": {}}}\n'.format(json.dumps(key))
+            else:
+                rec = '{{"op": "put", "key": {}, "obj": {}}}\n'.format(
+                    json.dumps(key), frag)
+            lines.append(rec)
+        if len(lines) == 0:
+            return
+        with open(self.path, "a") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.records += len(lines)
+
+    def replay(self):
+        """Yields (op, key, obj) for each record of the log, oldest first.
+
+        A torn record left at the end of the file by a crash is dropped
+        from the file so that later appends start on a clean line.
+        """
+        self.records = 0
+        good = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        break
+                    good += len(line)
+                    self.records += 1
+                    yield rec["op"], rec["key"], rec.get("obj")
+                torn = f.seek(0, os.SEEK_END) != good
+        except FileNotFoundError:
+            return
+        if torn:
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def truncate(self):
+        """Removes the log file, if it exists."""
+        self.records = 0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""The script defines an incremental reader for JSON object files."""
+import json
+
+
+def iter_items(f, chunk_size=65536):
+    """Yields the (key, value) pairs of the JSON object stored in a file,
+    parsing one entry at a time from chunks of the file.
+
+    Only the chunk being parsed and the current entry are held in memory,
+    whatever the size of the file or its layout.
+
+    Args:
+        f (file): A text file opened for reading.
+        chunk_size (int): The number of characters read at a time.
+
+    Raises:
+        json.JSONDecodeError: If the file does not hold a JSON object.
+    """
+    decoder = json.JSONDecoder()
+    ws = " \t\n\r"
+    buf = f.read(chunk_size)
+    pos = 0
+    eof = len(buf) == 0
+
+    def more():
+        """Appends the next chunk to the unparsed end of the buffer."""
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = len(chunk) == 0
+        buf = buf[pos:] + chunk
+        pos = 0
+        return not eof
+
+    def skip():
+        """Moves pos to the next non-whitespace character, if any."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ws:
+                pos += 1
+            if pos < len(buf) or not more():
+                return
+
+    def expect(chars):
+        """Consumes and returns the next character, one of chars."""
+        nonlocal pos
+        skip()
+        if pos == len(buf) or buf[pos] not in chars:
+            raise json.JSONDecodeError(
+                "Expecting one of {!r}".format(chars), buf, pos)
+        pos += 1
+        return buf[pos - 1]
+
+    def value():
+        """Decodes and returns the next JSON value."""
+        nonlocal pos
+        skip()
+        while True:
+            try:
+                val, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            if end == len(buf) and not eof:
+                more()
+                continue
+            pos = end
+            return val
+
+    def end():
+        """Checks that nothing but whitespace follows the object."""
+        skip()
+        if pos < len(buf):
+            raise json.JSONDecodeError("Extra data", buf, pos)
+
+    expect("{")
+    skip()
+    if pos < len(buf) and buf[pos] == "}":
+        pos += 1
+        end()
+        return
+    while True:
+        key = value()
+        if type(key) is not str:
+            raise json.JSONDecodeError("Expecting property name", buf, pos)
+        expect(":")
+        yield key, value()
+        if expect(",}") == "}":
+            end()
+            return
@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+"""The script defines the parallel loading of stores written one object
+per line, split into chunks parsed and built by a pool of processes.
+
+The workers are spawned rather than forked, so that the first reload,
+made while the models package is being imported, can use them: a
+spawned worker imports models afresh, with WORKER_ENV set so that
+models/__init__.py does not reload the store in it."""
+import multiprocessing
+import os
+import sys
+from os import path
+from models.base_model import classes
+from models.engine.codec import get_codec
+WORKER_ENV = "HBNB_STORAGE_WORKER"
+
+
+def chunks(fpath, count):
+    """Splits a store written one object per line into byte ranges that
+    start and end on line boundaries.
+
+    Args:
+        fpath (str): The name of the store.
+        count (int): The number of ranges to split it into.
+
+    Returns:
+        A list of at most count (start, stop) byte offsets, or None if the
+        store is not laid out one object per line.
+    """
+    size = path.getsize(fpath)
+    bounds = []
+    with open(fpath, "rb") as f:
+        line = f.readline(3)
+        if line != b"{\n":
+            return None
+        bounds.append(len(line))
+        for i in range(1, count):
+            f.seek(max(size * i // count, bounds[-1]))
+            if f.tell() != bounds[-1]:
+                f.readline()
+            bounds.append(f.tell())
+    bounds.append(size)
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:])
+            if start < stop]
+
+
+def iter_lines(fpath, start, stop, codec="json"):
+    """Yields the (<class>.<id> key, dictionary) pair stored on each line
+    between two byte offsets of a store written one object per line.
+
+    Args:
+        fpath (str): The name of the store.
+        start (int): The offset of the first line.
+        stop (int): The offset past the last line.
+        codec (str): The name of the JSON codec to decode lines with.
+
+    Raises:
+        ValueError: If a line is not valid JSON.
+    """
+    loads = get_codec(codec).loads
+    with open(fpath, "rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < stop:
+            line = f.readline()
+            if len(line) == 0 or line == b"}\n":
+                break
+            pos += len(line)
+            yield from loads(b"{" + line.rstrip(b",\n") + b"}").items()
+
+
+def load_chunk(fpath, start, stop, codec="json"):
+    """Builds the objects stored on the lines between two byte offsets of
+    a store written one object per line.
+
+    Args:
+        fpath (str): The name of the store.
+        start (int): The offset of the first line.
+        stop (int): The offset past the last line.
+        codec (str): The name of the JSON codec to decode lines with.
+
+    Returns:
+        A list of the (<class>.<id> key, object) pair of each line.
+    """
+    return [(key, classes[o["__class__"]].from_dict(o))
+            for key, o in iter_lines(fpath, start, stop, codec)]
+
+
+def picklable():
+    """Returns True if the objects of every registered class can be sent
+    back from a worker, i.e. if each class is the one found under its
+    name in its module (compact classes are not)."""
+    return all(getattr(sys.modules.get(cls.__module__), cls.__qualname__,
+                       None) is cls for cls in classes.values())
+
+
+def load_parallel(fpaths, workers, codec="json"):
+    """Yields the (<class>.<id> key, object) pairs of stores, built by
+    worker processes, each store split into chunks between them.
+
+    The tasks and results are pickled by the calling thread itself, over
+    a pipe per worker: a helper thread, as in a process pool, would wait
+    forever for the import lock of the models package when pickling
+    them during the first reload, which runs while models is imported.
+
+    Args:
+        fpaths (list): The names of the stores, each written one object
+            per line.
+        workers (int): The number of worker processes.
+        codec (str): The name of the JSON codec to decode lines with.
+
+    Raises:
+        ValueError: If a store is not laid out one object per line, or a
+            line is not valid JSON.
+        EOFError: If a worker process exits before sending its results.
+    """
+    tasks = []
+    for fpath in fpaths:
+        ranges = chunks(fpath, workers)
+        if ranges is None:
+            raise ValueError("{} is not one object per line".format(fpath))
+        tasks.extend((fpath, start, stop, codec) for start, stop in ranges)
+    if len(tasks) == 0:
+        return
+    context = multiprocessing.get_context("spawn")
+    count = min(workers, len(tasks))
+    procs = []
+    conns = []
+    done = False
+    os.environ[WORKER_ENV] = "1"
+    try:
+        for i in range(count):
+            recv, send = context.Pipe(duplex=False)
+            proc = context.Process(target=work, args=(send, tasks[i::count]),
+                                   daemon=True)
+            proc.start()
+            send.close()
+            procs.append(proc)
+            conns.append(recv)
+    finally:
+        del os.environ[WORKER_ENV]
+    try:
+        for i in range(len(tasks)):
+            objs = conns[i % count].recv()
+            if isinstance(objs, Exception):
+                raise objs
+            yield from objs
+        done = True
+    finally:
+        for conn in conns:
+            conn.close()
+        for proc in procs:
+            if not done:
+                proc.terminate()
+            proc.join()
+
+
+def work(conn, tasks):
+    """Sends the result of load_chunk() for each of tasks, in order,
+    through the connection conn, or the exception it raised. This is the
+    body of the worker processes of load_parallel().
+
+    Args:
+        conn (Connection): The connection to send the results through.
+        tasks (list): The arguments of load_chunk() of each task.
+    """
+    try:
+        for task in tasks:
+            try:
+                objs = load_chunk(*task)
+            except Exception as e:
+                conn.send(e)
+                return
+            conn.send(objs)
+    finally:
+        conn.close()
+
+
+def is_worker():
+    """Returns True in a worker process started by load_parallel()."""
+    return os.getenv(WORKER_ENV) == "1"
+
+
+def can_load_parallel(workers):
+    """Returns True if stores can be loaded by workers processes: more
+    than one is asked for, this is not itself a worker process and the
+    objects built can be sent back."""
+    return (workers > 1 and multiprocessing.parent_process() is None and
+            not is_worker() and picklable())
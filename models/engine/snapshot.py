@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+"""The script defines the read-only binary snapshot of a store, which
+is memory-mapped and read one record at a time without being parsed.
+
+A snapshot file is laid out as:
+
+    header   b"HBNBSNP1", the number of records and the offset of the
+             table, as little-endian unsigned 64-bit integers
+    records  the JSON text of each object, in UTF-8
+    keys     the <class>.<id> key of each object, in UTF-8
+    table    one (key offset, record offset, key length, record length)
+             entry per object, sorted by key
+
+It can be compiled from a JSON store with:
+    python3 -m models.engine.snapshot [file.json [file.json.snap]]
+"""
+import json
+import mmap
+import struct
+import sys
+from models.engine.atomic import atomic_open
+from models.engine.json_stream import iter_items
+MAGIC = b"HBNBSNP1"
+HEADER = struct.Struct("<8sQQ")
+ENTRY = struct.Struct("<QQII")
+
+
+def write_snapshot(path, items):
+    """Writes a snapshot file, replacing it atomically.
+
+    Records are written as they come, so only the keys and offsets are
+    held in memory.
+
+    Args:
+        path (str): The name of the snapshot file.
+        items (iterable): The (<class>.<id> key, JSON text) pair of each
+            object.
+    """
+    entries = []
+    with atomic_open(path, "wb") as f:
+        f.write(bytes(HEADER.size))
+        offset = HEADER.size
+        for key, text in items:
+            record = text.encode()
+            f.write(record)
+            entries.append([key.encode(), offset, len(record)])
+            offset += len(record)
+        entries.sort(key=lambda e: e[0])
+        for entry in entries:
+            f.write(entry[0])
+            entry.append(offset)
+            offset += len(entry[0])
+        for key, rec_off, rec_len, key_off in entries:
+            f.write(ENTRY.pack(key_off, rec_off, len(key), rec_len))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(entries), offset))
+
+
+class Snapshot:
+    """This represents an open snapshot file, memory-mapped read-only.
+
+    Looking up a key is a binary search over the table, so opening the
+    file and reading a record costs the same whatever its size.
+
+    Attributes:
+        path (str): The name of the snapshot file.
+    """
+
+    def __init__(self, path):
+        """Opens and maps a snapshot file.
+
+        Args:
+            path (str): The name of the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("{} is not a snapshot".format(path))
+        if len(self.__map) < HEADER.size:
+            self.close()
+            raise ValueError("{} is not a snapshot".format(path))
+        magic, self.__count, self.__table = HEADER.unpack_from(self.__map)
+        if (magic != MAGIC or
+                self.__table + self.__count * ENTRY.size != len(self.__map)):
+            self.close()
+            raise ValueError("{} is not a snapshot".format(path))
+
+    def __len__(self):
+        """Returns the number of records of the snapshot."""
+        return self.__count
+
+    def __entry(self, i):
+        """Returns the (key offset, record offset, key length, record
+        length) entry of the table at position i."""
+        return ENTRY.unpack_from(self.__map, self.__table + i * ENTRY.size)
+
+    def __key(self, i):
+        """Returns the UTF-8 key of the table entry at position i."""
+        key_off, rec_off, key_len, rec_len = self.__entry(i)
+        return self.__map[key_off:key_off + key_len]
+
+    def __bisect(self, key):
+        """Returns the position of the first table entry whose key is not
+        lower than the UTF-8 key."""
+        lo, hi = 0, self.__count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.__key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __span(self, cls):
+        """Returns the (start, stop) positions of the table entries of the
+        keys of class cls, or of every key if cls is None."""
+        if cls is None:
+            return 0, self.__count
+        start = self.__bisect(cls.encode() + b".")
+        return start, self.__bisect(cls.encode() + b"/")
+
+    def __contains__(self, key):
+        """Returns True if the snapshot holds a record for key."""
+        return self.get(key) is not None
+
+    def get(self, key):
+        """Returns the JSON text of the record of key, or None if the
+        snapshot holds none.
+
+        Args:
+            key (str): The <class>.<id> key of the object.
+        """
+        bkey = key.encode()
+        i = self.__bisect(bkey)
+        if i == self.__count or self.__key(i) != bkey:
+            return None
+        key_off, rec_off, key_len, rec_len = self.__entry(i)
+        return self.__map[rec_off:rec_off + rec_len].decode()
+
+    def count(self, cls=None):
+        """Returns the number of records, or of records of class cls."""
+        start, stop = self.__span(cls)
+        return stop - start
+
+    def keys(self, cls=None):
+        """Yields the keys of the records, or of the records of class cls,
+        in sorted order."""
+        start, stop = self.__span(cls)
+        for i in range(start, stop):
+            yield self.__key(i).decode()
+
+    def items(self, cls=None):
+        """Yields the (key, JSON text) pair of each record, or of each
+        record of class cls, in key order."""
+        start, stop = self.__span(cls)
+        view = self.__map
+        for i in range(start, stop):
+            key_off, rec_off, key_len, rec_len = self.__entry(i)
+            yield (view[key_off:key_off + key_len].decode(),
+                   view[rec_off:rec_off + rec_len].decode())
+
+    def close(self):
+        """Unmaps the snapshot file."""
+        self.__map.close()
+
+
+def compile_snapshot(src, dst):
+    """Compiles the snapshot dst of the JSON store src.
+
+    Args:
+        src (str): The name of the JSON file.
+        dst (str): The name of the snapshot file.
+    """
+    with open(src) as f:
+        write_snapshot(dst, ((key, json.dumps(o))
+                             for key, o in iter_items(f)))
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "file.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else src + ".snap"
+    compile_snapshot(src, dst)
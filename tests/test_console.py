@@ -10,6 +10,9 @@ Unittest classes:
     TestHBNBCommand_all
     TestHBNBCommand_destroy
     TestHBNBCommand_update
+    TestHBNBCommand_count
+    TestHBNBCommand_near
+    TestHBNBCommand_stats
 """
 import os
 import sys
@@ -21,6 +24,16 @@ from models.engine.file_storage import FileStorage
 from console import HBNBCommand
 
 
+def create_place(**attrs):
+    """Creates a Place with the console, sets its attributes attrs with
+    update and returns it."""
+    with patch("sys.stdout", new=StringIO()) as output:
+        HBNBCommand().onecmd("create Place")
+        testId = output.getvalue().strip()
+    HBNBCommand().onecmd("Place.update({}, {})".format(testId, attrs))
+    return storage.all()["Place.{}".format(testId)]
+
+
 class TestHBNBCommand_prompting(unittest.TestCase):
     """Unittests for testing prompting of the HBNB command interpreter."""
     def test_prompt_string(self):
@@ -50,7 +63,8 @@ class TestHBNBCommand_help(unittest.TestCase):
     def test_help(self):
         h = ("Documented commands (type help <topic>):\n"
              "========================================\n"
-             "EOF  all  count  create  destroy  help  quit  show  update")
+             "EOF  all  count  create  destroy  help  near  quit  show"
+             "  stats  update")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(h, output.getvalue().strip())
@@ -67,6 +81,17 @@ class TestHBNBCommand_exit(unittest.TestCase):
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertTrue(HBNBCommand().onecmd("EOF"))
 
+    def test_quit_closes_storage(self):
+        with patch.object(storage, "close") as close:
+            HBNBCommand().onecmd("quit")
+        close.assert_called_once_with()
+
+    def test_EOF_closes_storage(self):
+        with patch("sys.stdout", new=StringIO()):
+            with patch.object(storage, "close") as close:
+                HBNBCommand().onecmd("EOF")
+        close.assert_called_once_with()
+
 
 class TestHBNBCommand_create(unittest.TestCase):
     """Unittests for testing create from the HBNB command interpreter."""
@@ -1441,6 +1466,36 @@ class TestHBNBCommand_update(unittest.TestCase):
         test_dict = storage.all()["Place.{}".format(testId)].__dict__
         self.assertEqual(9.8, test_dict["latitude"])
 
+    def test_update_dictionary_is_not_evaluated(self):
+        correct = "** value missing **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create User")
+            testId = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            testCmd = "User.update({}, ".format(testId)
+            testCmd += "{'first_name': last_name})"
+            self.assertFalse(HBNBCommand().onecmd(testCmd))
+            self.assertEqual(correct, output.getvalue().strip())
+        test_dict = storage.all()["User.{}".format(testId)].__dict__
+        self.assertNotIn("first_name", test_dict)
+
+    def test_update_keeps_range_index_consistent(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            testId = output.getvalue().strip()
+        testKey = "Place.{}".format(testId)
+        HBNBCommand().onecmd("update Place {} price_by_night 300".format(
+            testId))
+        self.assertIn(testKey, storage.find_range(
+            "Place", price_by_night=(250, 350)))
+        testCmd = "Place.update({}, ".format(testId)
+        testCmd += "{'price_by_night': 80, 'max_guest': 4})"
+        HBNBCommand().onecmd(testCmd)
+        self.assertNotIn(testKey, storage.find_range(
+            "Place", price_by_night=(250, 350)))
+        self.assertIn(testKey, storage.find_range(
+            "Place", price_by_night=(50, 120), max_guest=(4, None)))
+
 
 class TestHBNBCommand_count(unittest.TestCase):
     """Unittests to test count method of HBNB comand interpreter."""
@@ -1507,5 +1562,157 @@ class TestHBNBCommand_count(unittest.TestCase):
             self.assertEqual("1", output.getvalue().strip())
 
 
+class TestHBNBCommand_near(unittest.TestCase):
+    """Unittests to test near method of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except FileNotFoundError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except FileNotFoundError:
+            pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except FileNotFoundError:
+            pass
+
+    def test_near_missing_class(self):
+        correct = "** class name missing **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("near"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_near_invalid_class(self):
+        correct = "** class doesn't exist **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.near(0, 0, 5)"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_near_missing_coordinates(self):
+        correct = "** coordinates missing **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("near Place 37.77 -122.4"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_near_invalid_coordinates(self):
+        correct = "** invalid coordinates **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Place.near(a, b, 5)"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_near_space_notation(self):
+        place = create_place(latitude=37.7749, longitude=-122.4194)
+        far = create_place(latitude=34.0522, longitude=-118.2437)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "near Place 37.78 -122.41 5"))
+            self.assertIn(place.__str__(), output.getvalue())
+            self.assertNotIn(far.__str__(), output.getvalue())
+
+    def test_near_dot_notation(self):
+        place = create_place(latitude=37.7749, longitude=-122.4194)
+        nearer = create_place(latitude=37.7800, longitude=-122.4100)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.near(37.78, -122.41, 5)"))
+            correct = str([nearer.__str__(), place.__str__()])
+            self.assertEqual(correct, output.getvalue().strip())
+
+
+class TestHBNBCommand_stats(unittest.TestCase):
+    """Unittests to test stats method of HBNB comand interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except FileNotFoundError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except FileNotFoundError:
+            pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except FileNotFoundError:
+            pass
+
+    def test_stats_missing_class(self):
+        correct = "** class name missing **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_stats_invalid_class(self):
+        correct = "** class doesn't exist **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.stats()"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_stats_invalid_attribute(self):
+        correct = "** invalid attribute **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats Place price-x"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_stats_group_by_list(self):
+        correct = "** invalid attribute **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            place_id = output.getvalue().strip()
+        HBNBCommand().onecmd("Place.update({}, {{'amenity_ids': ['a']}})"
+                             .format(place_id))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "stats Place group_by=amenity_ids"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_stats_count(self):
+        create_place(city_id="c1", price_by_night=40)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Place.stats()"))
+            self.assertEqual("{None: {'count': 1}}", output.getvalue().strip())
+
+    def test_stats_space_notation(self):
+        create_place(city_id="c1", price_by_night=40)
+        create_place(city_id="c1", price_by_night=60)
+        correct = str({None: {"count": 2, "sum(price_by_night)": 100,
+                              "avg(price_by_night)": 50.0,
+                              "min(price_by_night)": 40,
+                              "max(price_by_night)": 60}})
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "stats Place price_by_night"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+    def test_stats_dot_notation_group_by(self):
+        create_place(city_id="c1", price_by_night=40)
+        create_place(city_id="c2", price_by_night=60)
+        correct = str({"c1": {"count": 1, "sum(price_by_night)": 40,
+                              "avg(price_by_night)": 40.0,
+                              "min(price_by_night)": 40,
+                              "max(price_by_night)": 40},
+                       "c2": {"count": 1, "sum(price_by_night)": 60,
+                              "avg(price_by_night)": 60.0,
+                              "min(price_by_night)": 60,
+                              "max(price_by_night)": 60}})
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.stats(price_by_night, group_by=city_id)"))
+            self.assertEqual(correct, output.getvalue().strip())
+
+
 if __name__ == "__main__":
     unittest.main()
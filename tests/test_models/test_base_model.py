@@ -2,16 +2,65 @@
 """The script defines unittests for models/base_model.py.
 
 Unittest classes:
+    TestClasses
+    TestParseDatetime
     TestBaseModel_save
     TestBaseModel_to_dict
     TestBaseModel_instantiation
+    TestBaseModel_from_dict
 """
+import json
 import os
 import models
 import unittest
 from datetime import datetime
 from time import sleep
-from models.base_model import BaseModel
+from timeit import repeat
+from unittest.mock import patch
+from models.base_model import BaseModel, classes, parse_datetime
+from models.place import Place
+
+
+class TestClasses(unittest.TestCase):
+    """Unittests to test the registry of model classes."""
+
+    def test_model_classes_registered(self):
+        for name in ("BaseModel", "User", "State", "City", "Place",
+                     "Amenity", "Review"):
+            self.assertIn(name, classes)
+            self.assertEqual(name, classes[name].__name__)
+        self.assertIs(BaseModel, classes["BaseModel"])
+        self.assertIs(Place, classes["Place"])
+
+    def test_subclass_registered(self):
+        class MyModel(BaseModel):
+            pass
+        self.assertIs(MyModel, classes["MyModel"])
+        del classes["MyModel"]
+
+
+class TestParseDatetime(unittest.TestCase):
+    """Unittests to test the parse_datetime function."""
+
+    def test_isoformat(self):
+        dt = datetime.today()
+        self.assertEqual(dt, parse_datetime(dt.isoformat()))
+
+    def test_isoformat_without_microseconds(self):
+        dt = datetime(2017, 9, 28, 21, 3, 54)
+        self.assertEqual(dt, parse_datetime(dt.isoformat()))
+
+    def test_short_microseconds(self):
+        dt = datetime(2017, 9, 28, 21, 3, 54, 50000)
+        self.assertEqual(dt, parse_datetime("2017-09-28T21:03:54.05"))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_datetime("28/09/2017")
+
+    def test_None(self):
+        with self.assertRaises(TypeError):
+            parse_datetime(None)
 
 
 class TestBaseModel_instantiation(unittest.TestCase):
@@ -184,11 +233,76 @@ class TestBaseModel_to_dict(unittest.TestCase):
         my_base_model = BaseModel()
         self.assertNotEqual(my_base_model.to_dict(), my_base_model.__dict__)
 
+    def test_to_dict_native(self):
+        my_base_model = BaseModel()
+        my_base_model_dict = my_base_model.to_dict(native=True)
+        self.assertIs(my_base_model.created_at,
+                      my_base_model_dict["created_at"])
+        self.assertIs(my_base_model.updated_at,
+                      my_base_model_dict["updated_at"])
+        self.assertEqual("BaseModel", my_base_model_dict["__class__"])
+
     def test_to_dict_with_arg(self):
         my_base_model = BaseModel()
         with self.assertRaises(TypeError):
             my_base_model.to_dict(None)
 
 
+class TestBaseModel_from_dict(unittest.TestCase):
+    """Unittests to test the from_dict method of the BaseModel class."""
+
+    def test_from_dict(self):
+        my_place = Place()
+        my_place.name = "Loft"
+        my_place.max_guest = 4
+        rebuilt = Place.from_dict(my_place.to_dict())
+        self.assertEqual(Place, type(rebuilt))
+        self.assertEqual(my_place.__dict__, rebuilt.__dict__)
+        self.assertEqual(my_place.to_dict(), rebuilt.to_dict())
+
+    def test_from_dict_without_class_key(self):
+        odict = BaseModel().to_dict()
+        del odict["__class__"]
+        self.assertEqual(odict["id"], BaseModel.from_dict(odict).id)
+
+    def test_from_dict_not_stored(self):
+        odict = BaseModel().to_dict()
+        odict["id"] = "345"
+        BaseModel.from_dict(odict)
+        self.assertNotIn("BaseModel.345", models.storage.all())
+
+    def test_from_dict_leaves_dict_unchanged(self):
+        odict = BaseModel().to_dict()
+        copy = odict.copy()
+        BaseModel.from_dict(odict)
+        self.assertEqual(copy, odict)
+
+    def test_from_dict_interns_names(self):
+        odict = json.loads(json.dumps(BaseModel().to_dict()))
+        other = json.loads(json.dumps(odict))
+        names = list(BaseModel.from_dict(odict).__dict__)
+        for name, other_name in zip(names,
+                                    BaseModel.from_dict(other).__dict__):
+            self.assertIs(name, other_name)
+
+    def test_from_dict_missing_timestamp(self):
+        with self.assertRaises(KeyError):
+            BaseModel.from_dict({"id": "345"})
+
+    def test_from_dict_skips_uuid4(self):
+        odict = BaseModel().to_dict()
+        with patch("models.base_model.uuid4") as uuid4:
+            BaseModel.from_dict(odict)
+            uuid4.assert_not_called()
+
+    def test_from_dict_faster_than_kwargs(self):
+        odict = Place().to_dict()
+        kwargs = {k: v for k, v in odict.items() if k != "__class__"}
+        fast = min(repeat(lambda: Place.from_dict(odict),
+                          number=500, repeat=5))
+        slow = min(repeat(lambda: Place(**kwargs), number=500, repeat=5))
+        self.assertLess(fast * 2, slow)
+
+
 if __name__ == "__main__":
     unittest.main()
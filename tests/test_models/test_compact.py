@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/compact.py.
+
+Unittest classes:
+    TestCompact
+    TestCompactModel
+    TestCompactModel_storage
+"""
+import os
+import models
+import unittest
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.base_model import BaseModel, classes
+from models.compact import CompactModel, compact, compact_all, declared
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class TestCompact(unittest.TestCase):
+    """Unittests to test building compact classes."""
+
+    def setUp(self):
+        self.saved = dict(classes)
+
+    def tearDown(self):
+        classes.clear()
+        classes.update(self.saved)
+
+    def test_declared(self):
+        attrs = declared(Place)
+        self.assertEqual("city_id", list(attrs)[0])
+        self.assertEqual(0, attrs["price_by_night"])
+        self.assertEqual([], attrs["amenity_ids"])
+        self.assertNotIn("save", attrs)
+        self.assertNotIn("from_dict", attrs)
+
+    def test_compact_class(self):
+        cls = compact(Place)
+        self.assertTrue(issubclass(cls, CompactModel))
+        self.assertEqual("Place", cls.__name__)
+        self.assertIs(cls, classes["Place"])
+        self.assertIn("city_id", cls.__slots__)
+        self.assertIn("id", cls.__slots__)
+
+    def test_compact_idempotent(self):
+        cls = compact(Place)
+        self.assertIs(cls, compact(cls))
+
+    def test_compact_all(self):
+        compact_all()
+        for name in ("BaseModel", "User", "Place", "Review"):
+            self.assertTrue(issubclass(classes[name], CompactModel))
+
+    def test_isinstance(self):
+        obj = compact(User)()
+        self.assertIsInstance(obj, User)
+        self.assertIsInstance(obj, BaseModel)
+        self.assertNotIsInstance(obj, Place)
+        self.assertTrue(issubclass(type(obj), User))
+
+    def test_no_instance_dict(self):
+        obj = compact(User)()
+        self.assertFalse(hasattr(obj, "__dict__"))
+
+
+class TestCompactModel(unittest.TestCase):
+    """Unittests to test compact model objects."""
+
+    @classmethod
+    def setUpClass(cls):
+        saved = classes["Place"]
+        cls.Place = compact(Place)
+        classes["Place"] = saved
+
+    def test_defaults(self):
+        obj = self.Place()
+        self.assertEqual("", obj.name)
+        self.assertEqual(0, obj.price_by_night)
+        self.assertEqual(str, type(obj.id))
+        self.assertEqual(datetime, type(obj.created_at))
+
+    def test_set_declared(self):
+        obj = self.Place()
+        obj.price_by_night = 80
+        self.assertEqual(80, obj.price_by_night)
+        self.assertIsNone(obj._extra)
+
+    def test_set_dynamic(self):
+        obj = self.Place()
+        obj.garden = True
+        self.assertTrue(obj.garden)
+        self.assertEqual({"garden": True}, obj._extra)
+        del obj.garden
+        with self.assertRaises(AttributeError):
+            obj.garden
+
+    def test_missing_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.Place().garden
+        with self.assertRaises(AttributeError):
+            del self.Place().garden
+
+    def test_delete_declared_restores_default(self):
+        obj = self.Place()
+        obj.name = "Loft"
+        del obj.name
+        self.assertEqual("", obj.name)
+
+    def test_to_dict(self):
+        obj = self.Place()
+        obj.name = "Loft"
+        obj.garden = True
+        odict = obj.to_dict()
+        self.assertEqual("Place", odict["__class__"])
+        self.assertEqual(obj.id, odict["id"])
+        self.assertEqual(obj.created_at.isoformat(), odict["created_at"])
+        self.assertEqual("Loft", odict["name"])
+        self.assertTrue(odict["garden"])
+        self.assertNotIn("_extra", odict)
+        self.assertNotIn("city_id", odict)
+
+    def test_to_dict_native(self):
+        obj = self.Place()
+        odict = obj.to_dict(native=True)
+        self.assertIs(obj.created_at, odict["created_at"])
+        self.assertIs(obj.updated_at, odict["updated_at"])
+        with self.assertRaises(TypeError):
+            obj.to_dict(None)
+
+    def test_to_dict_matches_regular_object(self):
+        regular = Place()
+        regular.name = "Loft"
+        regular.garden = True
+        obj = self.Place.from_dict(regular.to_dict())
+        self.assertEqual(regular.to_dict(), obj.to_dict())
+
+    def test_str(self):
+        obj = self.Place()
+        obj.name = "Loft"
+        attrs = {"id": obj.id, "created_at": obj.created_at,
+                 "updated_at": obj.updated_at, "name": "Loft"}
+        self.assertEqual("[Place] ({}) {}".format(obj.id, attrs), str(obj))
+
+    def test_kwargs(self):
+        obj = self.Place()
+        obj.garden = True
+        new = self.Place(**obj.to_dict())
+        self.assertEqual(obj.to_dict(), new.to_dict())
+
+    def test_from_dict(self):
+        obj = self.Place()
+        obj.max_guest = 4
+        new = self.Place.from_dict(obj.to_dict())
+        self.assertEqual(4, new.max_guest)
+        self.assertEqual(obj.updated_at, new.updated_at)
+
+
+class TestCompactModel_storage(unittest.TestCase):
+    """Unittests to test storing compact model objects."""
+
+    def setUp(self):
+        self.saved = dict(classes)
+        compact_all()
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        classes.clear()
+        classes.update(self.saved)
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_reload(self):
+        obj = classes["Place"]()
+        obj.price_by_night = 120
+        obj.garden = True
+        obj.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        new = models.storage.get("Place", obj.id)
+        self.assertIsInstance(new, CompactModel)
+        self.assertEqual(obj.to_dict(), new.to_dict())
+
+    def test_range_query(self):
+        obj = classes["Place"]()
+        obj.price_by_night = 120
+        models.storage.new(obj)
+        found = models.storage.find_range("Place", price_by_night=(100, 150))
+        self.assertEqual(["Place." + obj.id], list(found))
+
+    def test_console_update(self):
+        obj = classes["Place"]()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd("update Place {} max_guest 6".format(obj.id))
+            HBNBCommand().onecmd("update Place {} view 'sea'".format(obj.id))
+        self.assertEqual(6, obj.max_guest)
+        self.assertEqual("sea", obj.view)
+        self.assertEqual(6, models.storage.get("Place", obj.id).max_guest)
+
+
+if __name__ == "__main__":
+    unittest.main()
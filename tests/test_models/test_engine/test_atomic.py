@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/atomic.py.
+
+Unittest classes:
+    TestAtomicOpen
+"""
+import os
+import unittest
+from unittest.mock import patch
+from models.engine.atomic import atomic_open, fsync_dir
+
+
+class TestAtomicOpen(unittest.TestCase):
+    """Unittests to test replacing files atomically."""
+
+    def setUp(self):
+        with open("test.txt", "w") as f:
+            f.write("old")
+
+    def tearDown(self):
+        for name in ("test.txt", "test.txt.tmp", "test.txt.prev"):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+
+    def read(self, name="test.txt"):
+        with open(name) as f:
+            return f.read()
+
+    def test_replace(self):
+        with atomic_open("test.txt") as f:
+            f.write("new")
+            self.assertEqual("old", self.read())
+        self.assertEqual("new", self.read())
+        self.assertFalse(os.path.exists("test.txt.tmp"))
+
+    def test_new_file(self):
+        os.remove("test.txt")
+        with atomic_open("test.txt", "wb", keep="test.txt.prev") as f:
+            f.write(b"new")
+        self.assertEqual("new", self.read())
+        self.assertFalse(os.path.exists("test.txt.prev"))
+
+    def test_error_leaves_file(self):
+        with self.assertRaises(RuntimeError):
+            with atomic_open("test.txt") as f:
+                f.write("new")
+                raise RuntimeError
+        self.assertEqual("old", self.read())
+        self.assertFalse(os.path.exists("test.txt.tmp"))
+
+    def test_keep_previous_generation(self):
+        with atomic_open("test.txt", keep="test.txt.prev") as f:
+            f.write("new")
+        self.assertEqual("old", self.read("test.txt.prev"))
+        with atomic_open("test.txt", keep="test.txt.prev") as f:
+            f.write("newer")
+        self.assertEqual("new", self.read("test.txt.prev"))
+        self.assertEqual("newer", self.read())
+
+    def test_file_never_missing(self):
+        replace = os.replace
+
+        def check(src, dst):
+            self.assertTrue(os.path.isfile("test.txt"))
+            replace(src, dst)
+        with patch("os.replace", side_effect=check) as mock:
+            with atomic_open("test.txt", keep="test.txt.prev") as f:
+                f.write("new")
+        self.assertIn((("test.txt.tmp", "test.txt"),),
+                      [c[:1] for c in mock.call_args_list])
+        self.assertNotIn((("test.txt", "test.txt.prev"),),
+                         [c[:1] for c in mock.call_args_list])
+        self.assertEqual("old", self.read("test.txt.prev"))
+        self.assertEqual("new", self.read())
+
+    def test_keep_without_hard_links(self):
+        with patch("os.link", side_effect=OSError):
+            with atomic_open("test.txt", keep="test.txt.prev") as f:
+                f.write("new")
+        self.assertEqual("old", self.read("test.txt.prev"))
+        self.assertEqual("new", self.read())
+
+    def test_fsync(self):
+        with patch("os.fsync") as fsync:
+            with atomic_open("test.txt") as f:
+                f.write("new")
+        self.assertEqual(2, fsync.call_count)
+
+    def test_fsync_dir_missing(self):
+        fsync_dir("no_such_directory")
+
+
+if __name__ == "__main__":
+    unittest.main()
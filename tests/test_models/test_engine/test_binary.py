@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/binary.py.
+
+Unittest classes:
+    TestBinaryFormat
+    TestBinaryConversion
+"""
+import io
+import os
+import json
+import unittest
+from datetime import datetime
+from models.engine.binary import (binary_to_json, is_uuid, iter_binary,
+                                  json_to_binary, load_binary, write_binary)
+from models.place import Place
+from models.user import User
+
+
+def encode(groups):
+    """Returns the binary store of groups."""
+    f = io.BytesIO()
+    write_binary(f, groups)
+    return f.getvalue()
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Unittests to test writing and reading binary stores."""
+
+    def test_round_trip(self):
+        place = Place()
+        place.number_rooms = 0
+        place.price_by_night = -5
+        place.latitude = 48.85
+        place.amenity_ids = ["a", {"x": 1.5, "y": None}]
+        place.big = -2 ** 70
+        place.garden = False
+        place.code = "ABCDEF01-0000-4000-8000-000000000000"
+        user = User()
+        data = encode([("Place", [place.to_dict(native=True)]),
+                       ("User", [user.to_dict(native=True)])])
+        items = list(iter_binary(data))
+        self.assertEqual(["Place." + place.id, "User." + user.id],
+                         [key for key, o in items])
+        self.assertEqual(place.to_dict(native=True), items[0][1])
+        self.assertEqual(user.to_dict(), User.from_dict(items[1][1])
+                         .to_dict())
+
+    def test_schema_per_class(self):
+        places = [Place(id="1", name="Loft"), Place(id="2", garden=True)]
+        data = encode([("Place", [p.to_dict() for p in places])])
+        self.assertEqual(1, data.count(b"garden"))
+        self.assertEqual([p.to_dict() for p in places],
+                         [o for key, o in iter_binary(data)])
+
+    def test_smaller_than_json(self):
+        places = [Place() for i in range(10)]
+        data = encode([("Place", [p.to_dict(native=True) for p in places])])
+        text = json.dumps({"Place." + p.id: p.to_dict() for p in places})
+        self.assertLess(len(data) * 2, len(text))
+
+    def test_timestamps(self):
+        when = datetime(1969, 12, 31, 23, 59, 59, 999999)
+        data = encode([("User", [{"id": "1", "created_at": when}])])
+        (key, o), = iter_binary(data)
+        self.assertEqual(when, o["created_at"])
+
+    def test_unsupported_value(self):
+        with self.assertRaises(TypeError):
+            encode([("User", [{"id": "1", "bad": object()}])])
+
+    def test_empty(self):
+        self.assertEqual([], list(iter_binary(encode([("User", [])]))))
+
+    def test_invalid(self):
+        data = encode([("User", [User().to_dict(native=True)])])
+        for size in range(len(data)):
+            with self.assertRaises(ValueError):
+                list(iter_binary(data[:size]))
+        with self.assertRaises(ValueError):
+            list(iter_binary(b"{}"))
+
+    def test_streamed(self):
+        places = [Place(id=str(i), name="Caf\u00e9 " * i, number_rooms=i)
+                  for i in range(20)]
+        data = encode([("Place", [p.to_dict(native=True) for p in places]),
+                       ("User", [User().to_dict(native=True)])])
+        whole = list(iter_binary(data))
+        for size in (1, 7, 64):
+            with self.subTest(size=size):
+                self.assertEqual(whole, list(iter_binary(io.BytesIO(data),
+                                                         size)))
+
+    def test_streamed_reads_in_chunks(self):
+        data = encode([("User", [User().to_dict(native=True)
+                                 for i in range(50)])])
+        f = io.BytesIO(data)
+        items = iter_binary(f, 64)
+        next(items)
+        self.assertLess(f.tell(), len(data))
+        self.assertEqual(49, len(list(items)))
+
+    def test_streamed_invalid(self):
+        data = encode([("User", [User().to_dict(native=True)])])
+        for size in range(len(data)):
+            with self.assertRaises(ValueError):
+                list(iter_binary(io.BytesIO(data[:size]), 5))
+
+    def test_is_uuid(self):
+        self.assertTrue(is_uuid("0c5d6c6c-1b48-4d4e-8e50-3c1b9d9a6a11"))
+        self.assertFalse(is_uuid("0C5D6C6C-1B48-4D4E-8E50-3C1B9D9A6A11"))
+        self.assertFalse(is_uuid("0c5d6c6c1b484d4e8e503c1b9d9a6a11abcd"))
+        self.assertFalse(is_uuid("0c5d6c6c-1b48-4d4e-8e50-3c1b9d9a6a1z"))
+
+
+class TestBinaryConversion(unittest.TestCase):
+    """Unittests to test converting stores between JSON and binary."""
+
+    def tearDown(self):
+        for name in ("test.json", "test.hbnb", "test2.json"):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+
+    def test_lossless(self):
+        place = Place(id="1", name="Loft", max_guest=4)
+        user = User()
+        store = {"User." + user.id: user.to_dict(),
+                 "Place.1": place.to_dict(),
+                 "User.2": {"id": "2", "__class__": "User",
+                            "created_at": "2017-09-28T21:03:54.000000",
+                            "updated_at": "not a timestamp"}}
+        with open("test.json", "w") as f:
+            json.dump(store, f)
+        json_to_binary("test.json", "test.hbnb")
+        self.assertEqual(3, len(list(load_binary("test.hbnb"))))
+        binary_to_json("test.hbnb", "test2.json")
+        with open("test2.json") as f:
+            lines = f.readlines()
+        self.assertEqual(5, len(lines))
+        with open("test2.json") as f:
+            self.assertEqual(store, json.load(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
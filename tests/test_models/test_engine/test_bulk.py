@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/bulk.py.
+
+Unittest classes:
+    TestBatch
+    TestBulk
+"""
+import unittest
+from unittest.mock import MagicMock
+from models.engine.bulk import (Batch, bulk_create, bulk_delete,
+                                bulk_update, model_class)
+from models.place import Place
+from models.user import User
+
+
+class TestBatch(unittest.TestCase):
+    """Unittests to test deferring saves until a batch exits."""
+
+    def setUp(self):
+        self.batch = Batch()
+        self.save = MagicMock()
+
+    def test_no_batch(self):
+        self.assertFalse(self.batch.defer())
+        self.assertFalse(self.batch.deferred)
+
+    def test_saves_once_on_exit(self):
+        with self.batch.open(self.save):
+            for i in range(3):
+                self.assertTrue(self.batch.defer())
+            self.save.assert_not_called()
+        self.save.assert_called_once_with()
+        self.assertFalse(self.batch.defer())
+
+    def test_no_save_deferred(self):
+        with self.batch.open(self.save):
+            pass
+        self.save.assert_not_called()
+
+    def test_nested(self):
+        with self.batch.open(self.save):
+            with self.batch.open(self.save):
+                self.batch.defer()
+            self.save.assert_not_called()
+        self.save.assert_called_once_with()
+        self.assertEqual(0, self.batch.depth)
+
+    def test_saves_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with self.batch.open(self.save):
+                self.batch.defer()
+                raise RuntimeError
+        self.save.assert_called_once_with()
+        self.assertEqual(0, self.batch.depth)
+
+
+class TestBulk(unittest.TestCase):
+    """Unittests to test the bulk operations on a storage engine."""
+
+    def setUp(self):
+        self.objs = {}
+        self.storage = MagicMock()
+        self.storage.batch.side_effect = lambda: Batch().open(lambda: None)
+        self.storage.new.side_effect = lambda obj: self.objs.update(
+            {obj.id: obj})
+        self.storage.get.side_effect = lambda cls, id: self.objs.get(id)
+
+    def test_model_class(self):
+        self.assertIs(User, model_class(User))
+        self.assertIs(User, model_class("User"))
+        with self.assertRaises(ValueError):
+            model_class("Nope")
+
+    def test_bulk_create(self):
+        users = bulk_create(self.storage, "User",
+                            [{"first_name": "Betty"}, {}, {"id": "u"}])
+        self.assertEqual(3, len(users))
+        self.assertEqual("Betty", users[0].first_name)
+        self.assertEqual("u", users[2].id)
+        self.assertTrue(all(type(user) is User for user in users))
+        self.assertEqual(3, self.storage.new.call_count)
+        self.storage.save.assert_called_once_with()
+
+    def test_bulk_update(self):
+        place = Place(id="p", name="old")
+        self.objs["p"] = place
+        before = place.updated_at
+        updated = bulk_update(self.storage, Place,
+                              [{"id": "p", "name": "new", "created_at": 0}])
+        self.assertEqual([place], updated)
+        self.assertEqual("new", place.name)
+        self.assertNotEqual(0, place.created_at)
+        self.assertGreaterEqual(place.updated_at, before)
+        self.storage.save.assert_called_once_with()
+
+    def test_bulk_update_missing(self):
+        self.objs["p"] = Place(id="p", name="old")
+        with self.assertRaises(KeyError):
+            bulk_update(self.storage, Place,
+                        [{"id": "p", "name": "new"}, {"id": "q"}])
+        self.assertEqual("old", self.objs["p"].name)
+        self.storage.save.assert_not_called()
+
+    def test_bulk_delete(self):
+        self.objs["p"] = Place(id="p")
+        self.assertEqual(1, bulk_delete(self.storage, Place, ["p", "q"]))
+        self.storage.delete.assert_called_once_with(self.objs["p"])
+        self.storage.save.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/codec.py.
+
+Unittest classes:
+    TestCodec
+    TestGetCodec
+"""
+import json
+import unittest
+from datetime import datetime
+from models.engine.codec import (Codec, codecs, get_codec, isoformat,
+                                 out_of_range)
+from models.place import Place
+
+
+class TestCodec(unittest.TestCase):
+    """Unittests to test each installed JSON codec."""
+
+    def test_round_trip(self):
+        values = {"id": "1", "name": "Café \"Loft\"/1", "rooms": 3,
+                  "price": 10.5, "ids": ["a", "b"], "garden": None,
+                  "pool": True, "big": 2 ** 70, "neg": -2 ** 64}
+        for name, codec in codecs.items():
+            with self.subTest(codec=name):
+                text = codec.dumps(values)
+                self.assertEqual(str, type(text))
+                self.assertEqual(values, json.loads(text))
+                self.assertEqual(values, codec.loads(text))
+                self.assertEqual(values, codec.loads(text.encode()))
+
+    def test_native_timestamps(self):
+        place = Place()
+        for name, codec in codecs.items():
+            with self.subTest(codec=name):
+                text = codec.dumps(place.to_dict(native=codec.native))
+                self.assertEqual(place.to_dict(), codec.loads(text))
+
+    def test_dumps_falls_back_to_json(self):
+        codec = Codec("test", json.dumps, json.loads)
+        when = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        self.assertEqual('["2017-09-28T21:03:54.052298"]',
+                         codec.dumps([when]))
+        with self.assertRaises(TypeError):
+            codec.dumps([object()])
+
+    def test_loads_invalid(self):
+        for name, codec in codecs.items():
+            with self.subTest(codec=name):
+                with self.assertRaises(ValueError):
+                    codec.loads('{"id": ')
+
+    def test_out_of_range(self):
+        self.assertFalse(out_of_range({"a": 1.5, "b": [2.0 ** 63, {}]}))
+        self.assertTrue(out_of_range({"a": [{"b": 2.0 ** 64}]}))
+        self.assertTrue(out_of_range([-2.0 ** 64]))
+
+    def test_isoformat(self):
+        when = datetime(2017, 9, 28, 21, 3, 54)
+        self.assertEqual("2017-09-28T21:03:54", isoformat(when))
+        with self.assertRaises(TypeError):
+            isoformat(1)
+
+
+class TestGetCodec(unittest.TestCase):
+    """Unittests to test selecting a JSON codec."""
+
+    def test_json_always_installed(self):
+        self.assertEqual("json", get_codec("json").name)
+        self.assertFalse(get_codec("json").native)
+
+    def test_fastest_installed(self):
+        fastest = next(name for name in ("orjson", "ujson", "json")
+                       if name in codecs)
+        self.assertIs(codecs[fastest], get_codec())
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/column_storage.py.
+
+Unittest classes:
+    TestColumnStorage
+"""
+import os
+import json
+import unittest
+from models.engine.column_storage import ColumnStorage
+from models.engine.columns import Table
+from models.place import Place
+from models.user import User
+
+
+class TestColumnStorage(unittest.TestCase):
+    """Unittests to test the ColumnStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except IOError:
+            pass
+        ColumnStorage._ColumnStorage__tables = {}
+        self.storage = ColumnStorage()
+        self.places = []
+        for i in range(4):
+            place = Place(id=str(i), city_id="c{}".format(i % 2),
+                          price_by_night=10 * i, latitude=48.85 + i / 100,
+                          longitude=2.35)
+            self.storage.new(place)
+            self.places.append(place)
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except IOError:
+            pass
+        ColumnStorage._ColumnStorage__tables = {}
+
+    def test_tables(self):
+        tables = ColumnStorage._ColumnStorage__tables
+        self.assertEqual(["Place"], list(tables))
+        self.assertEqual(Table, type(tables["Place"]))
+        self.assertEqual(4, len(tables["Place"]))
+
+    def test_all(self):
+        user = User(id="u")
+        self.storage.new(user)
+        self.assertEqual(["Place.0", "Place.1", "Place.2", "Place.3",
+                          "User.u"], sorted(self.storage.all()))
+        self.assertEqual({"User.u": user}, self.storage.all(User))
+        self.assertEqual({"User.u": user}, self.storage.all("User"))
+        self.assertEqual({}, self.storage.all("Review"))
+
+    def test_get_returns_referenced_object(self):
+        self.assertIs(self.places[1], self.storage.get("Place", "1"))
+        self.assertIsNone(self.storage.get("Place", "9"))
+        self.assertIsNone(self.storage.get("Review", "1"))
+
+    def test_get_builds_object_on_demand(self):
+        odict = self.places[2].to_dict()
+        self.places = None
+        place = self.storage.get(Place, "2")
+        self.assertEqual(Place, type(place))
+        self.assertEqual(odict, place.to_dict())
+        self.assertIs(place, self.storage.get(Place, "2"))
+
+    def test_count(self):
+        self.assertEqual(4, self.storage.count())
+        self.assertEqual(4, self.storage.count(Place))
+        self.assertEqual(0, self.storage.count("User"))
+
+    def test_delete(self):
+        self.storage.delete(self.places[0])
+        self.assertEqual(3, self.storage.count("Place"))
+        self.assertIsNone(self.storage.get("Place", "0"))
+        self.assertIs(self.places[3], self.storage.get("Place", "3"))
+
+    def test_delete_None(self):
+        self.storage.delete(None)
+        self.assertEqual(4, self.storage.count())
+
+    def test_find(self):
+        found = self.storage.find("Place", city_id="c1")
+        self.assertEqual({"Place.1": self.places[1],
+                          "Place.3": self.places[3]}, found)
+
+    def test_find_range(self):
+        found = self.storage.find_range("Place", price_by_night=[10, 20])
+        self.assertEqual(["Place.1", "Place.2"], list(found))
+
+    def test_filter(self):
+        found = self.storage.filter("Place", city_id="c0",
+                                    price_by_night=(10, None))
+        self.assertEqual(["Place.2"], list(found))
+        self.assertEqual({}, self.storage.filter("Review", place_id="1"))
+
+    def test_aggregate(self):
+        found = self.storage.aggregate("Place", group_by="city_id",
+                                       metrics=["count",
+                                                "max(price_by_night)"])
+        self.assertEqual({"c0": {"count": 2, "max(price_by_night)": 20},
+                          "c1": {"count": 2, "max(price_by_night)": 30}},
+                         found)
+        self.assertEqual({}, self.storage.aggregate("Review"))
+
+    def test_near(self):
+        found = self.storage.near(48.872, 2.35, 2)
+        self.assertEqual(["Place.2", "Place.3", "Place.1"], list(found))
+
+    def test_within_bbox(self):
+        found = self.storage.within_bbox(48.84, 2.3, 48.865, 2.4)
+        self.assertEqual(["Place.0", "Place.1"], sorted(found))
+
+    def test_save(self):
+        self.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual({"Place." + p.id: p.to_dict()
+                          for p in self.places}, saved)
+
+    def test_save_writes_back_changes_in_place(self):
+        self.places[0].name = "Loft"
+        self.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual("Loft", json.load(f)["Place.0"]["name"])
+
+    def test_reload(self):
+        self.storage.save()
+        odicts = [p.to_dict() for p in self.places]
+        self.places = None
+        ColumnStorage._ColumnStorage__tables = {}
+        self.storage.reload()
+        self.assertEqual(odicts, [p.to_dict() for p in
+                                  self.storage.all("Place").values()])
+
+    def test_reload_no_file(self):
+        self.storage.reload()
+        self.assertEqual(4, self.storage.count())
+
+    def test_bulk(self):
+        users = self.storage.bulk_create(User, [{"id": "a"}, {"id": "b"}])
+        self.assertEqual(2, self.storage.count(User))
+        self.storage.bulk_update(User, [{"id": "a", "first_name": "B"}])
+        self.assertEqual("B", self.storage.get(User, "a").first_name)
+        self.assertEqual(1, self.storage.bulk_delete(User, ["b", "c"]))
+        with open("file.json") as f:
+            saved = json.load(f)
+        self.assertEqual("B", saved["User.a"]["first_name"])
+        self.assertNotIn("User.b", saved)
+        self.assertIs(users[0], self.storage.get(User, "a"))
+
+    def test_batch(self):
+        with self.storage.batch():
+            self.storage.new(User(id="u"))
+            self.storage.save()
+            self.assertFalse(os.path.isfile("file.json"))
+        with open("file.json") as f:
+            self.assertIn("User.u", json.load(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,302 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/columns.py.
+
+Unittest classes:
+    TestParseMetric
+    TestColumn
+    TestTable
+    TestTable_aggregate
+    TestAggregate_engines
+"""
+import os
+import unittest
+from datetime import datetime
+from models.engine.column_storage import ColumnStorage
+from models.engine.columns import Column, Table, parse_metric
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.index import MISSING
+from models.place import Place
+
+
+class TestParseMetric(unittest.TestCase):
+    """Unittests to test the parse_metric function."""
+
+    def test_count(self):
+        self.assertEqual(("count", None), parse_metric("count"))
+
+    def test_function(self):
+        self.assertEqual(("avg", "price_by_night"),
+                         parse_metric("avg( price_by_night )"))
+
+    def test_unknown_function(self):
+        with self.assertRaises(ValueError):
+            parse_metric("median(price_by_night)")
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            parse_metric("sum price_by_night")
+
+
+class TestColumn(unittest.TestCase):
+    """Unittests to test the Column class."""
+
+    def test_typed_storage(self):
+        column = Column("q")
+        column.set(0, 5)
+        column.set(1, MISSING)
+        self.assertEqual("q", column.data.typecode)
+        self.assertEqual(5, column.get(0))
+        self.assertIs(MISSING, column.get(1))
+
+    def test_strings_are_dictionary_encoded(self):
+        column = Column("s")
+        for row, value in enumerate(("a", "b", "a")):
+            column.set(row, value)
+        self.assertEqual(["a", "b"], column.strings)
+        self.assertEqual([0, 1, 0], list(column.data))
+        self.assertEqual("a", column.get(2))
+
+    def test_timestamps(self):
+        column = Column("t")
+        dt = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        column.set(0, dt)
+        self.assertEqual(dt, column.get(0))
+
+    def test_generalize_on_other_type(self):
+        column = Column("q")
+        column.set(0, 5)
+        column.set(1, "five")
+        self.assertEqual("o", column.kind)
+        self.assertEqual([5, "five"], column.data)
+
+    def test_generalize_keeps_bool_and_big_int(self):
+        column = Column("q")
+        column.set(0, True)
+        column.set(1, 2 ** 70)
+        self.assertIs(True, column.get(0))
+        self.assertEqual(2 ** 70, column.get(1))
+
+    def test_remove_moves_last_row(self):
+        column = Column("s")
+        for row, value in enumerate(("a", "b", "c")):
+            column.set(row, value)
+        column.remove(0)
+        self.assertEqual(["c", "b"], [column.get(0), column.get(1)])
+
+    def test_select_equal(self):
+        column = Column("s")
+        for row, value in enumerate(("a", "b", "a")):
+            column.set(row, value)
+        column.set(3, MISSING)
+        self.assertEqual([0, 2], column.select("a"))
+        self.assertEqual([2], column.select("a", [1, 2, 3]))
+        self.assertEqual([], column.select("c"))
+        self.assertNotIn("c", column.codes)
+
+    def test_select_unset_rows_never_match(self):
+        column = Column("q")
+        column.set(0, MISSING)
+        column.set(1, 0)
+        self.assertEqual([1], column.select(0))
+        self.assertEqual([1], column.select((None, 10)))
+
+    def test_select_range(self):
+        column = Column("d")
+        for row, value in enumerate((1.5, 2.5, 3.5)):
+            column.set(row, value)
+        self.assertEqual([1, 2], column.select((2, None)))
+        self.assertEqual([0, 1], column.select((None, 3)))
+        self.assertEqual([1], column.select((2, 3), [0, 1]))
+
+    def test_select_range_mixed_values(self):
+        column = Column("o")
+        for row, value in enumerate((1, "x", 3)):
+            column.set(row, value)
+        self.assertEqual([0, 2], column.select((0, 5)))
+
+
+class TestTable(unittest.TestCase):
+    """Unittests to test the Table class."""
+
+    def setUp(self):
+        self.table = Table("Place")
+        self.places = [Place(id=str(i), city_id="c{}".format(i % 2),
+                             price_by_night=10 * i) for i in range(4)]
+        for place in self.places:
+            self.table.put(place.to_dict())
+
+    def test_put(self):
+        self.assertEqual(4, len(self.table))
+        self.assertEqual({"0": 0, "1": 1, "2": 2, "3": 3}, self.table.rows)
+        self.assertEqual("s", self.table.columns["city_id"].kind)
+        self.assertEqual("q", self.table.columns["price_by_night"].kind)
+        self.assertEqual("t", self.table.columns["created_at"].kind)
+
+    def test_record(self):
+        for row, place in enumerate(self.places):
+            self.assertEqual(place.to_dict(), self.table.record(row))
+
+    def test_put_replaces(self):
+        odict = self.places[1].to_dict()
+        del odict["city_id"]
+        odict["name"] = "Loft"
+        self.table.put(odict)
+        self.assertEqual(4, len(self.table))
+        self.assertEqual(odict, self.table.record(1))
+
+    def test_new_column_is_unset_for_other_rows(self):
+        self.places[3].name = "Loft"
+        self.table.put(self.places[3].to_dict())
+        self.assertNotIn("name", self.table.record(0))
+
+    def test_remove(self):
+        self.table.remove("0")
+        self.assertEqual(3, len(self.table))
+        self.assertEqual(0, self.table.rows["3"])
+        self.assertEqual(self.places[3].to_dict(), self.table.record(0))
+
+    def test_remove_missing(self):
+        self.table.remove("9")
+        self.assertEqual(4, len(self.table))
+
+    def test_filter(self):
+        self.assertEqual([0, 2], self.table.filter(city_id="c0"))
+        self.assertEqual([2], self.table.filter(city_id="c0",
+                                                price_by_night=(10, 30)))
+        self.assertEqual([], self.table.filter(name="Loft"))
+        self.assertEqual([0, 1, 2, 3], self.table.filter())
+
+
+class TestTable_aggregate(unittest.TestCase):
+    """Unittests to test the aggregate method of the Table class."""
+
+    def setUp(self):
+        self.table = Table("Place")
+        for i in range(6):
+            odict = Place(id=str(i), city_id="c{}".format(i % 3),
+                          price_by_night=10 * i).to_dict()
+            self.table.put(odict)
+        self.table.put(Place(id="6").to_dict())
+
+    def test_without_group(self):
+        metrics = ["count", "sum(price_by_night)", "avg(price_by_night)",
+                   "min(price_by_night)", "max(price_by_night)",
+                   "count(price_by_night)"]
+        self.assertEqual({None: {"count": 7, "sum(price_by_night)": 150,
+                                 "avg(price_by_night)": 25.0,
+                                 "min(price_by_night)": 0,
+                                 "max(price_by_night)": 50,
+                                 "count(price_by_night)": 6}},
+                         self.table.aggregate(metrics))
+
+    def test_group_by(self):
+        found = self.table.aggregate(["count", "avg(price_by_night)"],
+                                     group_by="city_id")
+        self.assertEqual({"c0": {"count": 2, "avg(price_by_night)": 15.0},
+                          "c1": {"count": 2, "avg(price_by_night)": 25.0},
+                          "c2": {"count": 2, "avg(price_by_night)": 35.0},
+                          None: {"count": 1, "avg(price_by_night)": None}},
+                         found)
+
+    def test_group_by_list(self):
+        self.table.put(Place(id="7", amenity_ids=["a", "b"]).to_dict())
+        with self.assertRaises(ValueError):
+            self.table.aggregate(["count"], group_by="amenity_ids")
+
+    def test_rows(self):
+        rows = self.table.filter(price_by_night=(20, None))
+        found = self.table.aggregate(["sum(price_by_night)"], rows=rows)
+        self.assertEqual({None: {"sum(price_by_night)": 140}}, found)
+
+    def test_missing_attribute(self):
+        found = self.table.aggregate(["sum(rating)", "max(rating)"])
+        self.assertEqual({None: {"sum(rating)": 0, "max(rating)": None}},
+                         found)
+
+    def test_non_numbers_skipped(self):
+        odict = Place(id="7", price_by_night="free").to_dict()
+        self.table.put(odict)
+        found = self.table.aggregate(["sum(price_by_night)"])
+        self.assertEqual({None: {"sum(price_by_night)": 150}}, found)
+
+    def test_empty_table(self):
+        self.assertEqual({}, Table("Place").aggregate(["count"]))
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            self.table.aggregate(["median(price_by_night)"])
+
+
+class TestAggregate_engines(unittest.TestCase):
+    """Unittests to test that every storage engine computes the same
+    aggregates, over the attributes set on the objects only."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except IOError:
+            pass
+        self.objects = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        ColumnStorage._ColumnStorage__tables = {}
+        DBStorage._DBStorage__db_path = "test.db"
+        DBStorage._DBStorage__conn = None
+        db = DBStorage()
+        db.reload()
+        self.storages = [FileStorage(), ColumnStorage(), db]
+        places = [Place(id="1", city_id="c1", price_by_night=100),
+                  Place(id="2", city_id="c1"),
+                  Place(id="3", city_id="c2", price_by_night=40,
+                        number_rooms=2),
+                  Place(id="4")]
+        for storage in self.storages:
+            for place in places:
+                storage.new(place)
+            storage.save()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = self.objects
+        ColumnStorage._ColumnStorage__tables = {}
+        DBStorage._DBStorage__conn.close()
+        DBStorage._DBStorage__conn = None
+        DBStorage._DBStorage__db_path = "file.db"
+        for name in ("test.db", "test.db-wal", "test.db-shm", "file.json"):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except IOError:
+            pass
+
+    def check(self, expected, **kwargs):
+        for storage in self.storages:
+            with self.subTest(storage=type(storage).__name__):
+                self.assertEqual(expected,
+                                 storage.aggregate(Place, **kwargs))
+
+    def test_unset_attributes(self):
+        metrics = ["count", "count(price_by_night)", "sum(price_by_night)",
+                   "avg(price_by_night)", "min(price_by_night)",
+                   "max(number_rooms)"]
+        self.check({None: {"count": 4, "count(price_by_night)": 2,
+                           "sum(price_by_night)": 140,
+                           "avg(price_by_night)": 70.0,
+                           "min(price_by_night)": 40,
+                           "max(number_rooms)": 2}}, metrics=metrics)
+
+    def test_group_by(self):
+        metrics = ["count", "count(price_by_night)", "avg(price_by_night)"]
+        self.check({"c1": {"count": 2, "count(price_by_night)": 1,
+                           "avg(price_by_night)": 100.0},
+                    "c2": {"count": 1, "count(price_by_night)": 1,
+                           "avg(price_by_night)": 40.0},
+                    None: {"count": 1, "count(price_by_night)": 0,
+                           "avg(price_by_night)": None}},
+                   group_by="city_id", metrics=metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/compression.py.
+
+Unittest classes:
+    TestCompression
+"""
+import gzip
+import os
+import unittest
+from models.engine import compression
+from models.engine.compression import (available, check, detect,
+                                       open_store, suffix, writer)
+
+
+class TestCompression(unittest.TestCase):
+    """Unittests to test writing and reading compressed stores."""
+
+    def tearDown(self):
+        try:
+            os.remove("test.store")
+        except FileNotFoundError:
+            pass
+
+    def write(self, name, content, text=True):
+        with open("test.store", "wb") as raw:
+            with writer(raw, name, text) as f:
+                f.write(content)
+            self.assertFalse(raw.closed)
+
+    def read(self, text=True):
+        with open_store("test.store", text) as f:
+            return f.read()
+
+    def test_round_trip(self):
+        content = '{\n"User.1": {"name": "Zoé"}\n}\n' * 100
+        for name in [None] + available():
+            with self.subTest(compression=name):
+                self.write(name, content)
+                self.assertEqual(content, self.read())
+                with open("test.store", "rb") as raw:
+                    self.assertEqual(name, detect(raw))
+                    self.assertEqual(0, raw.tell())
+                if name is not None:
+                    self.assertLess(os.path.getsize("test.store"),
+                                    len(content) // 4)
+
+    def test_binary(self):
+        for name in [None] + available():
+            with self.subTest(compression=name):
+                self.write(name, b"HBNBBIN1\x00", False)
+                self.assertEqual(b"HBNBBIN1\x00", self.read(False))
+
+    def test_detect_from_magic_bytes(self):
+        with open("test.store", "wb") as f:
+            f.write(gzip.compress(b"{}"))
+        self.assertEqual("{}", self.read())
+
+    def test_corrupt(self):
+        for name in available():
+            with self.subTest(compression=name):
+                self.write(name, "{}" * 1000)
+                with open("test.store", "rb") as f:
+                    data = f.read()
+                with open("test.store", "wb") as f:
+                    f.write(data[:len(data) // 2])
+                with self.assertRaises(ValueError):
+                    self.read()
+
+    def test_check(self):
+        self.assertIsNone(check(None))
+        self.assertEqual("gzip", check("gzip"))
+        self.assertEqual("xz", check("xz"))
+        with self.assertRaises(ValueError):
+            check("rar")
+
+    def test_suffix(self):
+        self.assertEqual("", suffix(None))
+        self.assertEqual(".gz", suffix("gzip"))
+        self.assertEqual(".xz", suffix("xz"))
+        self.assertEqual(".zst", suffix("zstd"))
+
+    @unittest.skipIf(compression.zstandard is not None,
+                     "zstandard is installed")
+    def test_zstd_missing(self):
+        self.assertNotIn("zstd", available())
+        with self.assertRaises(ValueError):
+            check("zstd")
+        with self.assertRaises(ValueError):
+            self.write("zstd", "{}")
+
+
+if __name__ == "__main__":
+    unittest.main()
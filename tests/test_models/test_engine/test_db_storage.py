@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/db_storage.py.
+
+Unittest classes:
+    TestDBStorage
+    TestDBStorage_queries
+"""
+import os
+import sqlite3
+import unittest
+from models.engine.db_storage import DBStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+class TestDBStorage(unittest.TestCase):
+    """Unittests to test the DBStorage class."""
+
+    def setUp(self):
+        DBStorage._DBStorage__db_path = "test.db"
+        DBStorage._DBStorage__conn = None
+        self.storage = DBStorage()
+        self.storage.reload()
+
+    def tearDown(self):
+        DBStorage._DBStorage__conn.close()
+        DBStorage._DBStorage__conn = None
+        DBStorage._DBStorage__db_path = "file.db"
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove("test.db" + suffix)
+            except FileNotFoundError:
+                pass
+
+    def connect(self):
+        return sqlite3.connect("test.db")
+
+    def test_wal_mode(self):
+        conn = DBStorage._DBStorage__conn
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual("wal", mode)
+
+    def test_table_per_class(self):
+        user = User(id="u", email="a@b.c")
+        self.storage.new(user)
+        self.storage.new(Place(id="p", city_id="c"))
+        self.storage.save()
+        with self.connect() as conn:
+            info = conn.execute('PRAGMA table_info("User")')
+            cols = [row[1] for row in info]
+            indexes = [row[1] for row in
+                       conn.execute('PRAGMA index_list("Place")')]
+        self.assertEqual(["id", "created_at", "updated_at", "extra", "email",
+                          "password", "first_name", "last_name"], cols)
+        self.assertIn("Place_city_id", indexes)
+        self.assertIn("Place_user_id", indexes)
+
+    def test_save_commits(self):
+        self.storage.new(User(id="u"))
+        with self.connect() as conn:
+            self.assertEqual([], conn.execute('SELECT id FROM "User"')
+                             .fetchall())
+        self.storage.save()
+        with self.connect() as conn:
+            self.assertEqual([("u",)], conn.execute('SELECT id FROM "User"')
+                             .fetchall())
+
+    def test_close_commits(self):
+        self.storage.new(User(id="u"))
+        self.storage.close()
+        self.assertIsNone(DBStorage._DBStorage__conn)
+        with self.connect() as conn:
+            self.assertEqual([("u",)], conn.execute('SELECT id FROM "User"')
+                             .fetchall())
+        self.assertEqual(1, self.storage.count(User))
+
+    def test_bulk(self):
+        self.storage.bulk_create(User, [{"id": "a"}, {"id": "b"}])
+        self.storage.bulk_update(User, [{"id": "a", "first_name": "B"}])
+        self.assertEqual(1, self.storage.bulk_delete(User, ["b", "c"]))
+        with self.connect() as conn:
+            self.assertEqual([("a", "B")], conn.execute(
+                'SELECT id, first_name FROM "User"').fetchall())
+
+    def test_batch_defers_commit(self):
+        with self.storage.batch():
+            self.storage.new(User(id="u"))
+            self.storage.save()
+            with self.connect() as conn:
+                self.assertEqual([], conn.execute(
+                    'SELECT id FROM "User"').fetchall())
+        with self.connect() as conn:
+            self.assertEqual([("u",)], conn.execute(
+                'SELECT id FROM "User"').fetchall())
+
+    def test_get_returns_referenced_object(self):
+        user = User(id="u")
+        self.storage.new(user)
+        self.assertIs(user, self.storage.get("User", "u"))
+        self.assertIs(user, self.storage.get(User, "u"))
+        self.assertIsNone(self.storage.get("User", "v"))
+        self.assertIsNone(self.storage.get("Review", "u"))
+
+    def test_reload_reads_objects_again(self):
+        place = Place(id="p", name="Loft", amenity_ids=["a1"], garden=None)
+        self.storage.new(place)
+        self.storage.save()
+        self.storage.reload()
+        new = self.storage.get("Place", "p")
+        self.assertIsNot(place, new)
+        self.assertEqual(place.to_dict(), new.to_dict())
+
+    def test_all(self):
+        user = User(id="u")
+        place = Place(id="p")
+        self.storage.new(user)
+        self.storage.new(place)
+        self.assertEqual({"User.u": user, "Place.p": place},
+                         self.storage.all())
+        self.assertEqual({"User.u": user}, self.storage.all(User))
+        self.assertEqual({}, self.storage.all("Review"))
+
+    def test_count(self):
+        self.storage.new(User(id="u"))
+        self.storage.new(User(id="v"))
+        self.storage.new(Place(id="p"))
+        self.assertEqual(3, self.storage.count())
+        self.assertEqual(2, self.storage.count(User))
+        self.assertEqual(0, self.storage.count("Review"))
+
+    def test_delete(self):
+        user = User(id="u")
+        self.storage.new(user)
+        self.storage.delete(user)
+        self.storage.delete(None)
+        self.assertEqual(0, self.storage.count("User"))
+        self.assertIsNone(self.storage.get("User", "u"))
+
+    def test_save_writes_back_changes_in_place(self):
+        user = User(id="u")
+        self.storage.new(user)
+        user.first_name = "Betty"
+        user.nickname = "B"
+        self.storage.save()
+        with self.connect() as conn:
+            row = conn.execute('SELECT first_name, extra FROM "User"')
+            self.assertEqual(("Betty", '{"nickname": "B"}'), row.fetchone())
+
+    def test_values_keep_their_type(self):
+        place = Place(id="p", number_rooms="3", max_guest=True,
+                      price_by_night=2 ** 70)
+        self.storage.new(place)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(place.to_dict(),
+                         self.storage.get("Place", "p").to_dict())
+
+
+class TestDBStorage_queries(unittest.TestCase):
+    """Unittests to test the queries of the DBStorage class."""
+
+    def setUp(self):
+        DBStorage._DBStorage__db_path = "test.db"
+        DBStorage._DBStorage__conn = None
+        self.storage = DBStorage()
+        self.storage.reload()
+        self.places = []
+        for i in range(4):
+            place = Place(id=str(i), city_id="c{}".format(i % 2),
+                          price_by_night=10 * i, latitude=48.85 + i / 100,
+                          longitude=2.35)
+            self.storage.new(place)
+            self.places.append(place)
+        self.storage.save()
+
+    def tearDown(self):
+        DBStorage._DBStorage__conn.close()
+        DBStorage._DBStorage__conn = None
+        DBStorage._DBStorage__db_path = "file.db"
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove("test.db" + suffix)
+            except FileNotFoundError:
+                pass
+
+    def test_find(self):
+        found = self.storage.find("Place", city_id="c1")
+        self.assertEqual({"Place.1": self.places[1],
+                          "Place.3": self.places[3]}, found)
+        self.assertEqual({}, self.storage.find(Review, place_id="1"))
+
+    def test_find_class_default(self):
+        self.storage.new(Place(id="4"))
+        self.assertEqual(["Place.4"], list(self.storage.find(Place,
+                                                             city_id="")))
+
+    def test_find_attribute_without_column(self):
+        self.places[2].view = "sea"
+        self.storage.save()
+        found = self.storage.find("Place", view="sea")
+        self.assertEqual(["Place.2"], list(found))
+
+    def test_find_range(self):
+        self.storage.new(Place(id="4", price_by_night="25"))
+        found = self.storage.find_range(Place, price_by_night=(10, 30))
+        self.assertEqual(["Place.1", "Place.2", "Place.3"], sorted(found))
+        found = self.storage.find_range(Place, price_by_night=(15, None),
+                                        city_id=("c0", "c0"))
+        self.assertEqual(["Place.2"], list(found))
+
+    def test_aggregate(self):
+        found = self.storage.aggregate("Place", group_by="city_id",
+                                       metrics=["count",
+                                                "sum(price_by_night)",
+                                                "avg(price_by_night)",
+                                                "max(latitude)"])
+        self.assertEqual({"c0": {"count": 2, "sum(price_by_night)": 20,
+                                 "avg(price_by_night)": 10.0,
+                                 "max(latitude)": 48.85 + 2 / 100},
+                          "c1": {"count": 2, "sum(price_by_night)": 40,
+                                 "avg(price_by_night)": 20.0,
+                                 "max(latitude)": 48.85 + 3 / 100}},
+                         found)
+
+    def test_aggregate_without_group(self):
+        self.storage.new(Place(id="4", price_by_night="free"))
+        found = self.storage.aggregate("Place", metrics=[
+            "count", "min(price_by_night)", "count(price_by_night)"])
+        self.assertEqual({None: {"count": 5, "min(price_by_night)": 0,
+                                 "count(price_by_night)": 5}}, found)
+        self.assertEqual({}, self.storage.aggregate("Review"))
+
+    def test_aggregate_attribute_without_column(self):
+        self.places[0].rating = 4
+        self.places[1].rating = 5
+        self.storage.save()
+        found = self.storage.aggregate("Place", metrics=["avg(rating)"])
+        self.assertEqual({None: {"avg(rating)": 4.5}}, found)
+
+    def test_aggregate_group_by_list(self):
+        self.places[0].amenity_ids = ["a"]
+        self.storage.save()
+        with self.assertRaises(ValueError):
+            self.storage.aggregate("Place", group_by="amenity_ids")
+
+    def test_aggregate_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            self.storage.aggregate("Place", metrics=["median(max_guest)"])
+
+    def test_near(self):
+        found = self.storage.near(48.872, 2.35, 2)
+        self.assertEqual(["Place.2", "Place.3", "Place.1"], list(found))
+        self.assertIs(self.places[2], found["Place.2"])
+
+    def test_within_bbox(self):
+        found = self.storage.within_bbox(48.84, 2.3, 48.865, 2.4)
+        self.assertEqual(["Place.0", "Place.1"], sorted(found))
+        self.assertEqual({}, self.storage.within_bbox(48.84, 170, 48.9,
+                                                      -170))
+
+
+if __name__ == "__main__":
+    unittest.main()
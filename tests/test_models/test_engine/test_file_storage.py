@@ -4,14 +4,32 @@
 Unittest classes:
     TestFileStorage_instantiation
     TestFileStorage_methods
+    TestFileStorage_log_mode
+    TestFileStorage_lazy_mode
+    TestFileStorage_snapshot_mode
+    TestFileStorage_shard_mode
+    TestFileStorage_double_buffer
+    TestFileStorage_write_behind
+    TestFileStorage_binary_mode
+    TestFileStorage_compression
+    TestFileStorage_bulk
 """
+import gzip
 import os
+import shutil
+import time
 import json
 import models
 import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
 from datetime import datetime
 from models.base_model import BaseModel
+from models.engine import file_storage
 from models.engine.file_storage import FileStorage
+from models.engine.index import HashIndex
+from models.engine.codec import codecs
+from models.engine.compression import available
 from models.amenity import Amenity
 from models.user import User
 from models.state import State
@@ -20,6 +38,52 @@ from models.city import City
 from models.review import Review
 
 
+class ReadlineSpy:
+    """Wraps a binary file, recording the size given to each readline()."""
+
+    def __init__(self, f, sizes):
+        self.f = f
+        self.sizes = sizes
+
+    def readline(self, size=-1):
+        self.sizes.append(size)
+        return self.f.readline(size)
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def __iter__(self):
+        return iter(self.f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.f.close()
+
+
+@contextmanager
+def spy_readlines():
+    """Yields the list of the sizes given to readline() on the binary files
+    FileStorage and models/engine/parallel.py read stores with."""
+    sizes = []
+    open_store = file_storage.open_store
+
+    @contextmanager
+    def spy_store(fpath, text=True):
+        with open_store(fpath, text) as f:
+            yield f if text else ReadlineSpy(f, sizes)
+
+    def spy_open(*args, **kwargs):
+        f = open(*args, **kwargs)
+        return f if "b" not in args[1] else ReadlineSpy(f, sizes)
+
+    with patch("models.engine.file_storage.open_store", spy_store), \
+            patch("models.engine.file_storage.open", spy_open, create=True), \
+            patch("models.engine.parallel.open", spy_open, create=True):
+        yield sizes
+
+
 class TestFileStorage_instantiation(unittest.TestCase):
     """Unittests to test instantiation of the FileStorage class."""
 
@@ -65,9 +129,55 @@ class TestFileStorage_methods(unittest.TestCase):
     def test_all(self):
         self.assertEqual(dict, type(models.storage.all()))
 
-    def test_all_with_arg(self):
+    def test_all_with_None(self):
+        self.assertIs(models.storage.all(), models.storage.all(None))
+
+    def test_all_with_two_args(self):
         with self.assertRaises(TypeError):
-            models.storage.all(None)
+            models.storage.all(User, None)
+
+    def test_all_with_class(self):
+        my_user = User()
+        my_state = State()
+        users = models.storage.all(User)
+        self.assertIn("User." + my_user.id, users)
+        self.assertNotIn("State." + my_state.id, users)
+        self.assertEqual(users, models.storage.all("User"))
+
+    def test_all_with_class_without_objects(self):
+        self.assertEqual({}, models.storage.all("MyModel"))
+
+    def test_count(self):
+        User()
+        User()
+        State()
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("State"))
+        self.assertEqual(0, models.storage.count(Review))
+        self.assertEqual(3, models.storage.count())
+
+    def test_count_after_delete(self):
+        my_user = User()
+        models.storage.delete(my_user)
+        self.assertEqual(0, models.storage.count(User))
+        self.assertEqual({}, models.storage.all(User))
+
+    def test_count_after_objects_replaced(self):
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(User))
+        User()
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_count_after_reload(self):
+        my_user = User()
+        State()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count(User))
+        reloaded = models.storage.all(User)["User." + my_user.id]
+        self.assertIsNot(my_user, reloaded)
 
     def test_new(self):
         my_base_model = BaseModel()
@@ -165,10 +275,1332 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn("Amenity." + my_amenity.id, objs)
         self.assertIn("Review." + my_review.id, objs)
 
+    def test_reload_single_line_file(self):
+        my_user = User()
+        with open("file.json", "w") as f:
+            json.dump({"User." + my_user.id: my_user.to_dict()}, f)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + my_user.id, models.storage.all(User))
+
+    def test_reload_empty_store(self):
+        models.storage.save()
+        models.storage.reload()
+        self.assertEqual({}, models.storage.all())
+
+    def test_reload_invalid_file(self):
+        with open("file.json", "w") as f:
+            f.write('{"User.1": {"id": "1", "__class__": "User"')
+        with self.assertRaises(ValueError):
+            models.storage.reload()
+
+    def test_reload_with_workers(self):
+        users = [User() for i in range(50)]
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(FileStorage, "_FileStorage__workers", 4):
+            models.storage.reload()
+        self.assertEqual(50, models.storage.count(User))
+        for user in users:
+            new = models.storage.get(User, user.id)
+            self.assertIsNot(user, new)
+            self.assertEqual(user.to_dict(), new.to_dict())
+
+    def test_reload_with_workers_single_line_file(self):
+        my_user = User()
+        with open("file.json", "w") as f:
+            json.dump({"User." + my_user.id: my_user.to_dict()}, f)
+        FileStorage._FileStorage__objects = {}
+        with patch.object(FileStorage, "_FileStorage__workers", 2):
+            models.storage.reload()
+        self.assertIn("User." + my_user.id, models.storage.all(User))
+
+    def test_reload_single_line_file_bounded(self):
+        my_user = User()
+        with open("file.json", "w") as f:
+            json.dump({"User." + my_user.id: my_user.to_dict()}, f)
+        FileStorage._FileStorage__objects = {}
+        for workers in (1, 2):
+            with self.subTest(workers=workers), spy_readlines() as sizes:
+                with patch.object(FileStorage, "_FileStorage__workers",
+                                  workers):
+                    models.storage.reload()
+                self.assertNotEqual([], sizes)
+                self.assertTrue(all(0 <= size <= 3 for size in sizes))
+                self.assertIn("User." + my_user.id,
+                              models.storage.all(User))
+
+    def test_save_error_keeps_file(self):
+        User()
+        models.storage.save()
+        with open("file.json") as f:
+            before = f.read()
+        Place()
+        with patch.object(Place, "to_dict", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                models.storage.save()
+        with open("file.json") as f:
+            self.assertEqual(before, f.read())
+        self.assertFalse(os.path.exists("file.json.tmp"))
+
+    def test_reload_with_each_codec(self):
+        my_place = Place()
+        my_place.price_by_night = 2 ** 70
+        my_place.name = "Caf\u00e9"
+        for name, codec in codecs.items():
+            with self.subTest(codec=name):
+                with patch.object(FileStorage, "_FileStorage__codec", codec):
+                    models.storage.new(my_place)
+                    models.storage.save()
+                    FileStorage._FileStorage__objects = {}
+                    models.storage.reload()
+                    new = models.storage.get(Place, my_place.id)
+                self.assertEqual(my_place.to_dict(), new.to_dict())
+
+    def test_reload_shares_ids(self):
+        my_place = Place()
+        my_reviews = [Review(), Review()]
+        for my_review in my_reviews:
+            my_review.place_id = my_place.id
+        my_place.amenity_ids = [my_reviews[0].place_id]
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        place = models.storage.get(Place, my_place.id)
+        first, second = (models.storage.get(Review, my_review.id)
+                         for my_review in my_reviews)
+        self.assertEqual(my_place.id, first.place_id)
+        self.assertIs(first.place_id, second.place_id)
+        self.assertIs(first.place_id, place.amenity_ids[0])
+        self.assertIsNot(place.id, first.place_id)
+
+    def test_new_shares_ids(self):
+        my_place = Place()
+        first = Review()
+        first.place_id = my_place.id
+        models.storage.new(first)
+        second = Review()
+        second.place_id = my_place.id[:8] + my_place.id[8:]
+        models.storage.new(second)
+        self.assertIs(first.place_id, second.place_id)
+
+    def test_delete_keeps_shared_ids(self):
+        my_place = Place()
+        my_review = Review()
+        my_review.place_id = my_place.id
+        models.storage.new(my_review)
+        models.storage.delete(my_place)
+        other = Review()
+        other.place_id = my_place.id[:8] + my_place.id[8:]
+        models.storage.new(other)
+        self.assertIs(my_review.place_id, other.place_id)
+
+    def test_save_one_object_per_line(self):
+        my_user = User()
+        my_state = State()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(4, len(lines))
+        self.assertTrue(lines[1].startswith('"User.' + my_user.id))
+        self.assertTrue(lines[2].startswith('"State.' + my_state.id))
+
     def test_reload_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
+    def test_delete(self):
+        my_user = User()
+        models.storage.new(my_user)
+        models.storage.delete(my_user)
+        self.assertNotIn("User." + my_user.id, models.storage.all())
+
+    def test_delete_None(self):
+        models.storage.delete(None)
+
+    def test_save_after_delete(self):
+        my_user = User()
+        models.storage.new(my_user)
+        models.storage.save()
+        models.storage.delete(my_user)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn("User." + my_user.id, f.read())
+
+    def test_find(self):
+        my_place = Place()
+        other_place = Place()
+        my_review = Review()
+        my_review.place_id = my_place.id
+        my_review.save()
+        other_review = Review()
+        other_review.place_id = other_place.id
+        other_review.save()
+        found = models.storage.find(Review, place_id=my_place.id)
+        self.assertEqual({"Review." + my_review.id: my_review}, found)
+
+    def test_find_several_attributes(self):
+        my_review = Review()
+        my_review.place_id = "p1"
+        my_review.user_id = "u1"
+        my_review.save()
+        other_review = Review()
+        other_review.place_id = "p1"
+        other_review.save()
+        found = models.storage.find("Review", place_id="p1", user_id="u1")
+        self.assertEqual(["Review." + my_review.id], list(found))
+
+    def test_find_without_index(self):
+        my_user = User()
+        my_user.first_name = "Betty"
+        User().first_name = "Bob"
+        found = models.storage.find(User, first_name="Betty")
+        self.assertEqual({"User." + my_user.id: my_user}, found)
+
+    def test_find_uses_index(self):
+        my_city = City()
+        my_city.state_id = "s1"
+        my_city.save()
+        City().save()
+        with patch.object(HashIndex, "lookup", autospec=True,
+                          side_effect=HashIndex.lookup) as lookup:
+            found = models.storage.find(City, state_id="s1")
+            lookup.assert_called_once()
+        self.assertEqual(["City." + my_city.id], list(found))
+
+    def test_find_after_delete(self):
+        my_city = City()
+        my_city.state_id = "s1"
+        my_city.save()
+        models.storage.delete(my_city)
+        self.assertEqual({}, models.storage.find(City, state_id="s1"))
+
+    def test_find_after_reload(self):
+        my_city = City()
+        my_city.state_id = "s1"
+        my_city.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        found = models.storage.find(City, state_id="s1")
+        self.assertEqual(["City." + my_city.id], list(found))
+
+    def test_find_range(self):
+        places = []
+        for price, guests in ((40, 4), (60, 2), (90, 6), (120, 4), (150, 8)):
+            place = Place()
+            place.price_by_night = price
+            place.max_guest = guests
+            place.save()
+            places.append("Place." + place.id)
+        found = models.storage.find_range(Place, price_by_night=(50, 120),
+                                          max_guest=(4, None))
+        self.assertEqual(sorted(places[2:4]), sorted(found))
+
+    def test_find_range_without_index(self):
+        my_place = Place()
+        my_place.latitude = 37.77
+        Place().latitude = 48.85
+        found = models.storage.find_range("Place", latitude=(30.0, 40.0))
+        self.assertEqual(["Place." + my_place.id], list(found))
+
+    def test_find_range_after_update(self):
+        my_place = Place()
+        my_place.price_by_night = 300
+        my_place.save()
+        my_place.price_by_night = 80
+        models.storage.new(my_place)
+        found = models.storage.find_range(Place, price_by_night=(50, 100))
+        self.assertEqual(["Place." + my_place.id], list(found))
+        self.assertEqual({}, models.storage.find_range(
+            Place, price_by_night=(200, None)))
+
+    def test_find_range_after_delete(self):
+        my_place = Place()
+        my_place.price_by_night = 80
+        my_place.save()
+        models.storage.delete(my_place)
+        found = models.storage.find_range(Place, price_by_night=(50, 100))
+        self.assertEqual({}, found)
+
+    def test_find_range_many_new(self):
+        places = [Place(price_by_night=i, id=str(i)) for i in range(200)]
+        for place in places:
+            models.storage.new(place)
+        models.storage.delete(places[0])
+        places[1].price_by_night = 500
+        models.storage.new(places[1])
+        found = models.storage.find_range(Place, price_by_night=(None, 3))
+        self.assertEqual(["Place.2", "Place.3"], list(found))
+        found = models.storage.find_range(Place, price_by_night=(199, None))
+        self.assertEqual(["Place.199", "Place.1"], list(found))
+
+    def test_reload_sorts_indexes_once(self):
+        for i in range(200):
+            Place(price_by_night=i % 7, id=str(i)).save()
+        FileStorage._FileStorage__objects = {}
+        with patch("models.engine.index.insort") as insort:
+            models.storage.reload()
+        insort.assert_not_called()
+        found = models.storage.find_range(Place, price_by_night=(6, 6))
+        self.assertEqual(28, len(found))
+
+    def test_aggregate(self):
+        FileStorage._FileStorage__objects = {}
+        for city_id, price in (("c1", 40), ("c1", 60), ("c2", 90)):
+            Place(city_id=city_id, price_by_night=price, id=str(price)).save()
+        found = models.storage.aggregate(
+            Place, group_by="city_id",
+            metrics=["count", "avg(price_by_night)", "max(price_by_night)"])
+        self.assertEqual({"c1": {"count": 2, "avg(price_by_night)": 50.0,
+                                 "max(price_by_night)": 60},
+                          "c2": {"count": 1, "avg(price_by_night)": 90.0,
+                                 "max(price_by_night)": 90}}, found)
+
+    def test_aggregate_without_group(self):
+        FileStorage._FileStorage__objects = {}
+        Place().save()
+        my_place = Place()
+        my_place.number_rooms = 3
+        my_place.save()
+        found = models.storage.aggregate("Place",
+                                         metrics=["sum(number_rooms)"])
+        self.assertEqual({None: {"sum(number_rooms)": 3}}, found)
+        self.assertEqual({None: {"count": 2}},
+                         models.storage.aggregate("Place"))
+
+    def test_aggregate_unset_attributes(self):
+        FileStorage._FileStorage__objects = {}
+        Place(price_by_night=100, id="1").save()
+        Place(id="2").save()
+        found = models.storage.aggregate(
+            Place, metrics=["count(price_by_night)", "min(price_by_night)"])
+        self.assertEqual({None: {"count(price_by_night)": 1,
+                                 "min(price_by_night)": 100}}, found)
+
+    def test_aggregate_follows_changes(self):
+        FileStorage._FileStorage__objects = {}
+        places = [Place(price_by_night=i, id=str(i)) for i in range(4)]
+        for place in places:
+            models.storage.new(place)
+        metrics = ["count", "sum(price_by_night)"]
+        self.assertEqual({None: {"count": 4, "sum(price_by_night)": 6}},
+                         models.storage.aggregate(Place, metrics=metrics))
+        places[3].price_by_night = 10
+        models.storage.new(places[3])
+        models.storage.delete(places[1])
+        models.storage.new(Place(price_by_night=5, id="5"))
+        self.assertEqual({None: {"count": 4, "sum(price_by_night)": 17}},
+                         models.storage.aggregate(Place, metrics=metrics))
+
+    def test_aggregate_reads_table(self):
+        FileStorage._FileStorage__objects = {}
+        Place(price_by_night=100, id="1").save()
+        models.storage.aggregate(Place, metrics=["sum(price_by_night)"])
+        with patch.object(Place, "to_dict") as to_dict:
+            found = models.storage.aggregate(
+                Place, metrics=["sum(price_by_night)"])
+        to_dict.assert_not_called()
+        self.assertEqual({None: {"sum(price_by_night)": 100}}, found)
+
+    def test_aggregate_no_objects(self):
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual({}, models.storage.aggregate(Review))
+
+    def test_aggregate_group_by_list(self):
+        my_place = Place()
+        my_place.amenity_ids = ["a"]
+        with self.assertRaises(ValueError):
+            models.storage.aggregate(Place, group_by="amenity_ids")
+
+    def test_aggregate_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            models.storage.aggregate(Place, metrics=["avg(price-by-night)"])
+
+    def test_near(self):
+        my_place = Place()
+        my_place.latitude = 37.7749
+        my_place.longitude = -122.4194
+        my_place.save()
+        other_place = Place()
+        other_place.latitude = 34.0522
+        other_place.longitude = -118.2437
+        other_place.save()
+        found = models.storage.near(37.78, -122.41, 5)
+        self.assertEqual({"Place." + my_place.id: my_place}, found)
+        self.assertEqual(2, len(models.storage.near(37.78, -122.41, 600)))
+
+    def test_near_after_delete(self):
+        my_place = Place()
+        my_place.latitude = 37.7749
+        my_place.longitude = -122.4194
+        my_place.save()
+        models.storage.delete(my_place)
+        self.assertEqual({}, models.storage.near(37.78, -122.41, 5))
+
+    def test_near_without_index(self):
+        my_user = User()
+        my_user.latitude = 48.8566
+        my_user.longitude = 2.3522
+        found = models.storage.near(48.86, 2.35, 1, User)
+        self.assertEqual({"User." + my_user.id: my_user}, found)
+
+    def test_within_bbox(self):
+        my_place = Place()
+        my_place.latitude = 37.7749
+        my_place.longitude = -122.4194
+        my_place.save()
+        found = models.storage.within_bbox(37, -123, 38, -122)
+        self.assertEqual(["Place." + my_place.id], list(found))
+        self.assertEqual({}, models.storage.within_bbox(30, -123, 31, -122))
+
+    def test_create_ordered_index(self):
+        my_user = User()
+        my_user.age = 30
+        my_user.save()
+        models.storage.create_index(User, "age", ordered=True)
+        index = FileStorage._FileStorage__indexes["User"]["age"]
+        self.assertIn("User." + my_user.id, index.range(18, None))
+        del FileStorage._FileStorage__indexes["User"]
+
+    def test_create_index(self):
+        my_user = User()
+        my_user.email = "betty@hbnb.io"
+        my_user.save()
+        models.storage.create_index(User, "email")
+        index = FileStorage._FileStorage__indexes["User"]["email"]
+        self.assertIn("User." + my_user.id, index.lookup("betty@hbnb.io"))
+        del FileStorage._FileStorage__indexes["User"]
+
+    def test_save_only_encodes_changed_objects(self):
+        my_user = User()
+        my_state = State()
+        models.storage.save()
+        with patch.object(BaseModel, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            models.storage.save()
+            self.assertEqual(0, to_dict.call_count)
+            my_state.save()
+            self.assertEqual(1, to_dict.call_count)
+            self.assertIs(my_state, to_dict.call_args.args[0])
+
+    def test_save_reencodes_updated_object(self):
+        my_user = User()
+        models.storage.save()
+        my_user.first_name = "Betty"
+        my_user.save()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual("Betty", objs["User." + my_user.id]["first_name"])
+
+    def test_save_output_is_json(self):
+        my_user = User()
+        my_state = State()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual(my_user.to_dict(), objs["User." + my_user.id])
+        self.assertEqual(my_state.to_dict(), objs["State." + my_state.id])
+
+
+class TestFileStorage_log_mode(unittest.TestCase):
+    """Unittests to test FileStorage with the append-only log enabled."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__log_mode = True
+
+    @classmethod
+    def tearDown(self):
+        for name in ("file.json", "file.json.log"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__log_mode = False
+        FileStorage._FileStorage__compact_after = 1000
+
+    def test_save_appends_to_log(self):
+        my_user = User()
+        my_user.save()
+        self.assertFalse(os.path.exists("file.json"))
+        with open("file.json.log", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(1, len(records))
+        self.assertEqual("put", records[0]["op"])
+        self.assertEqual("User." + my_user.id, records[0]["key"])
+
+    def test_save_only_logs_changes(self):
+        my_user = User()
+        my_state = State()
+        models.storage.save()
+        my_state.save()
+        with open("file.json.log", "r") as f:
+            keys = [json.loads(line)["key"] for line in f]
+        self.assertEqual(["User." + my_user.id, "State." + my_state.id,
+                          "State." + my_state.id], keys)
+
+    def test_delete_logged(self):
+        my_user = User()
+        models.storage.save()
+        models.storage.delete(my_user)
+        models.storage.save()
+        with open("file.json.log", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual("del", records[-1]["op"])
+
+    def test_reload_replays_log(self):
+        my_user = User()
+        my_state = State()
+        models.storage.save()
+        my_user.first_name = "Betty"
+        my_user.save()
+        models.storage.delete(my_state)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual("Betty", objs["User." + my_user.id].first_name)
+        self.assertNotIn("State." + my_state.id, objs)
+
+    def test_compaction(self):
+        FileStorage._FileStorage__compact_after = 3
+        my_user = User()
+        my_user.save()
+        my_user.save()
+        self.assertFalse(os.path.exists("file.json"))
+        my_user.save()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertIn("User." + my_user.id, f.read())
+        my_state = State()
+        my_state.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + my_user.id, models.storage.all())
+        self.assertIn("State." + my_state.id, models.storage.all())
+
+
+class TestFileStorage_lazy_mode(unittest.TestCase):
+    """Unittests to test FileStorage building objects on first access."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.user = User()
+        self.state = State()
+        self.place = Place()
+        self.place.city_id = "c1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy_mode = True
+        models.storage.reload()
+
+    @classmethod
+    def tearDown(self):
+        for name in ("file.json", "file.json.log"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__lazy_mode = False
+        FileStorage._FileStorage__log_mode = False
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual(0, len(FileStorage._FileStorage__objects))
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_get_builds_one_object(self):
+        user = models.storage.get(User, self.user.id)
+        self.assertEqual(self.user.id, user.id)
+        self.assertEqual(self.user.created_at, user.created_at)
+        self.assertEqual(["User." + self.user.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIs(user, models.storage.get("User", self.user.id))
+        self.assertEqual(3, models.storage.count())
+
+    def test_get_missing(self):
+        self.assertIsNone(models.storage.get(User, "1234"))
+        self.assertIsNone(models.storage.get(State, self.user.id))
+
+    def test_all_with_class_builds_class(self):
+        self.assertIn("State." + self.state.id, models.storage.all(State))
+        self.assertEqual(["State." + self.state.id],
+                         list(FileStorage._FileStorage__objects))
+
+    def test_all_builds_everything(self):
+        self.assertEqual(3, len(models.storage.all()))
+        self.assertEqual({}, FileStorage._FileStorage__raw)
+
+    def test_find_builds_class(self):
+        found = models.storage.find(Place, city_id="c1")
+        self.assertEqual(["Place." + self.place.id], list(found))
+
+    def test_save_keeps_objects_not_built(self):
+        user = models.storage.get(User, self.user.id)
+        user.first_name = "Betty"
+        user.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy_mode = False
+        models.storage.reload()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual("Betty",
+                         models.storage.get(User, self.user.id).first_name)
+
+    def test_delete(self):
+        models.storage.delete(models.storage.get(State, self.state.id))
+        self.assertIsNone(models.storage.get(State, self.state.id))
+        self.assertEqual(2, models.storage.count())
+
+    def test_new_replaces_object_not_built(self):
+        user = User(**self.user.to_dict())
+        models.storage.new(user)
+        self.assertIs(user, models.storage.get(User, self.user.id))
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_reload_replays_log(self):
+        FileStorage._FileStorage__log_mode = True
+        user = models.storage.get(User, self.user.id)
+        user.first_name = "Betty"
+        user.save()
+        models.storage.delete(models.storage.get(State, self.state.id))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(0, len(FileStorage._FileStorage__objects))
+        self.assertEqual(2, models.storage.count())
+        self.assertEqual("Betty",
+                         models.storage.get(User, self.user.id).first_name)
+        self.assertIsNone(models.storage.get(State, self.state.id))
+
+    def test_reload_single_line_file(self):
+        with open("file.json", "w") as f:
+            json.dump({"User." + self.user.id: self.user.to_dict()}, f)
+        FileStorage._FileStorage__objects = {}
+        with spy_readlines() as sizes:
+            models.storage.reload()
+        self.assertEqual([3, 3], sizes)
+        self.assertEqual({}, FileStorage._FileStorage__raw)
+        self.assertIn("User." + self.user.id,
+                      FileStorage._FileStorage__objects)
+
+
+class TestFileStorage_snapshot_mode(unittest.TestCase):
+    """Unittests to test FileStorage reading objects from a snapshot."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__snapshot_mode = True
+        self.user = User()
+        self.state = State()
+        self.place = Place()
+        self.place.city_id = "c1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+    @classmethod
+    def tearDown(self):
+        snapshot = FileStorage._FileStorage__snapshot
+        if snapshot is not None:
+            snapshot.close()
+        for name in ("file.json", "file.json.log", "file.json.snap"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__snapshot = None
+        FileStorage._FileStorage__shadowed = set()
+        FileStorage._FileStorage__snapshot_mode = False
+        FileStorage._FileStorage__log_mode = False
+
+    def test_save_compiles_snapshot(self):
+        self.assertTrue(os.path.isfile("file.json.snap"))
+        snapshot = FileStorage._FileStorage__snapshot
+        self.assertEqual(3, len(snapshot))
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual(0, len(FileStorage._FileStorage__objects))
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_get_builds_one_object(self):
+        user = models.storage.get(User, self.user.id)
+        self.assertEqual(self.user.to_dict(), user.to_dict())
+        self.assertEqual(["User." + self.user.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIs(user, models.storage.get("User", self.user.id))
+        self.assertEqual(3, models.storage.count())
+
+    def test_get_missing(self):
+        self.assertIsNone(models.storage.get(User, "1234"))
+        self.assertIsNone(models.storage.get(State, self.user.id))
+
+    def test_all_with_class_builds_class(self):
+        self.assertIn("State." + self.state.id, models.storage.all(State))
+        self.assertEqual(["State." + self.state.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIsNotNone(FileStorage._FileStorage__snapshot)
+
+    def test_all_builds_everything(self):
+        self.assertEqual(3, len(models.storage.all()))
+        self.assertIsNone(FileStorage._FileStorage__snapshot)
+
+    def test_find_builds_class(self):
+        found = models.storage.find(Place, city_id="c1")
+        self.assertEqual(["Place." + self.place.id], list(found))
+
+    def test_delete(self):
+        models.storage.delete(models.storage.get(State, self.state.id))
+        self.assertIsNone(models.storage.get(State, self.state.id))
+        self.assertEqual(2, models.storage.count())
+        self.assertEqual(0, models.storage.count(State))
+
+    def test_delete_object_not_built(self):
+        models.storage.delete(self.user)
+        self.assertEqual(0, models.storage.count(User))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIsNone(models.storage.get(User, self.user.id))
+        self.assertEqual(2, models.storage.count())
+
+    def test_new_replaces_object_not_built(self):
+        user = User(**self.user.to_dict())
+        models.storage.new(user)
+        self.assertIs(user, models.storage.get(User, self.user.id))
+        self.assertEqual(1, models.storage.count(User))
+        self.assertEqual(3, models.storage.count())
+
+    def test_save_keeps_objects_not_built(self):
+        user = models.storage.get(User, self.user.id)
+        user.first_name = "Betty"
+        user.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__snapshot_mode = False
+        models.storage.reload()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual("Betty",
+                         models.storage.get(User, self.user.id).first_name)
+
+    def test_stale_snapshot_is_ignored(self):
+        os.utime("file.json.snap", (0, 0))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIsNone(FileStorage._FileStorage__snapshot)
+        self.assertEqual(3, len(FileStorage._FileStorage__objects))
+
+    def test_reload_replays_log(self):
+        FileStorage._FileStorage__log_mode = True
+        user = models.storage.get(User, self.user.id)
+        user.first_name = "Betty"
+        user.save()
+        models.storage.delete(models.storage.get(State, self.state.id))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, models.storage.count())
+        self.assertEqual("Betty",
+                         models.storage.get(User, self.user.id).first_name)
+        self.assertIsNone(models.storage.get(State, self.state.id))
+
+
+class TestFileStorage_shard_mode(unittest.TestCase):
+    """Unittests to test FileStorage storing each class in its own shard."""
+
+    @classmethod
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__shard_mode = True
+        FileStorage._FileStorage__dirty = set()
+        self.user = User()
+        self.state = State()
+        self.place = Place()
+        self.place.city_id = "c1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+    @classmethod
+    def tearDown(self):
+        shutil.rmtree("file.json.d", ignore_errors=True)
+        try:
+            os.remove("file.json.log")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__unloaded = set()
+        FileStorage._FileStorage__dirty = set()
+        FileStorage._FileStorage__shard_mode = False
+        FileStorage._FileStorage__log_mode = False
+
+    def shard(self, name):
+        with open(os.path.join("file.json.d", name + ".json")) as f:
+            return json.load(f)
+
+    def test_save_writes_one_shard_per_class(self):
+        self.assertEqual(["Place.json", "State.json", "User.json"],
+                         sorted(os.listdir("file.json.d")))
+        self.assertEqual(self.user.to_dict(),
+                         self.shard("User")["User." + self.user.id])
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_reload_reads_no_shard(self):
+        self.assertEqual(0, len(FileStorage._FileStorage__objects))
+        self.assertEqual({"Place", "State", "User"},
+                         FileStorage._FileStorage__unloaded)
+
+    def test_get_reads_one_shard(self):
+        user = models.storage.get(User, self.user.id)
+        self.assertEqual(self.user.to_dict(), user.to_dict())
+        self.assertEqual(["User." + self.user.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIsNone(models.storage.get("Review", "1234"))
+
+    def test_all_with_class_reads_one_shard(self):
+        self.assertIn("State." + self.state.id, models.storage.all(State))
+        self.assertEqual({"Place", "User"},
+                         FileStorage._FileStorage__unloaded)
+        self.assertEqual(1, models.storage.count(Place))
+        self.assertEqual({"User"}, FileStorage._FileStorage__unloaded)
+
+    def test_all_reads_every_shard(self):
+        self.assertEqual(3, len(models.storage.all()))
+        self.assertEqual(set(), FileStorage._FileStorage__unloaded)
+
+    def test_find_reads_one_shard(self):
+        found = models.storage.find(Place, city_id="c1")
+        self.assertEqual(["Place." + self.place.id], list(found))
+        self.assertEqual({"State", "User"},
+                         FileStorage._FileStorage__unloaded)
+
+    def test_save_rewrites_changed_shards(self):
+        os.utime(os.path.join("file.json.d", "State.json"), (0, 0))
+        user = models.storage.get(User, self.user.id)
+        user.first_name = "Betty"
+        user.save()
+        self.assertEqual(0, os.path.getmtime(
+            os.path.join("file.json.d", "State.json")))
+        self.assertEqual("Betty",
+                         self.shard("User")["User." + self.user.id]
+                         ["first_name"])
+        self.assertEqual({"Place", "State"},
+                         FileStorage._FileStorage__unloaded)
+
+    def test_new_keeps_shard_objects(self):
+        user = User()
+        models.storage.save()
+        self.assertEqual(sorted(["User." + self.user.id, "User." + user.id]),
+                         sorted(self.shard("User")))
+
+    def test_delete_last_object_removes_shard(self):
+        models.storage.delete(models.storage.get(State, self.state.id))
+        models.storage.save()
+        self.assertFalse(os.path.exists(
+            os.path.join("file.json.d", "State.json")))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, models.storage.count())
+
+    def test_reload_replays_log(self):
+        FileStorage._FileStorage__log_mode = True
+        user = models.storage.get(User, self.user.id)
+        user.first_name = "Betty"
+        user.save()
+        Review()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(4, models.storage.count())
+        self.assertEqual("Betty",
+                         models.storage.get(User, self.user.id).first_name)
+        models.storage.compact()
+        self.assertEqual(1, len(self.shard("Review")))
+        self.assertEqual("Betty",
+                         self.shard("User")["User." + self.user.id]
+                         ["first_name"])
+
+
+class TestFileStorage_double_buffer(unittest.TestCase):
+    """Unittests to test FileStorage keeping the previous generation of
+    its files."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__double_buffer = True
+        self.user = User()
+        models.storage.save()
+        self.state = State()
+        models.storage.save()
+
+    @classmethod
+    def tearDown(self):
+        for name in ("file.json", "file.json.prev"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except IOError:
+            pass
+        shutil.rmtree("file.json.d", ignore_errors=True)
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__double_buffer = False
+        FileStorage._FileStorage__shard_mode = False
+        FileStorage._FileStorage__unloaded = set()
+        FileStorage._FileStorage__dirty = set()
+
+    def test_save_keeps_previous_generation(self):
+        with open("file.json.prev") as f:
+            self.assertEqual(["User." + self.user.id], list(json.load(f)))
+        with open("file.json") as f:
+            self.assertEqual(2, len(json.load(f)))
+
+    def test_reload_corrupt_file(self):
+        with open("file.json", "w") as f:
+            f.write('{\n"User.1": {"id": ')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["User." + self.user.id],
+                         list(models.storage.all()))
+
+    def test_reload_missing_file(self):
+        os.remove("file.json")
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["User." + self.user.id],
+                         list(models.storage.all()))
+
+    def test_lazy_mode_missing_file(self):
+        os.remove("file.json")
+        FileStorage._FileStorage__objects = {}
+        with patch.object(FileStorage, "_FileStorage__lazy_mode", True):
+            models.storage.reload()
+            self.assertEqual(["User." + self.user.id],
+                             list(models.storage.all()))
+        self.assertEqual({}, FileStorage._FileStorage__raw)
+
+    def test_reload_corrupt_generations(self):
+        for name in ("file.json", "file.json.prev"):
+            with open(name, "w") as f:
+                f.write("{")
+        with self.assertRaises(ValueError):
+            models.storage.reload()
+
+    def test_shards(self):
+        FileStorage._FileStorage__shard_mode = True
+        models.storage.new(self.user)
+        models.storage.save()
+        self.user.first_name = "Betty"
+        self.user.save()
+        with open(os.path.join("file.json.d", "User.json"), "w") as f:
+            f.write("{")
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        user = models.storage.get(User, self.user.id)
+        self.assertEqual("", user.first_name)
+
+
+class TestFileStorage_write_behind(unittest.TestCase):
+    """Unittests to test FileStorage deferring saves to a background
+    thread."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__write_behind = True
+        FileStorage._FileStorage__flush_interval = 60
+        FileStorage._FileStorage__flush_after = 3
+
+    @classmethod
+    def tearDown(self):
+        models.storage.close()
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp.json", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__write_behind = False
+        FileStorage._FileStorage__flush_interval = 1
+        FileStorage._FileStorage__flush_after = 100
+
+    def stored(self):
+        try:
+            with open("file.json") as f:
+                return sorted(json.load(f))
+        except FileNotFoundError:
+            return []
+
+    def test_close_registered_once(self):
+        FileStorage._FileStorage__closing = False
+        with patch("atexit.register") as register:
+            for i in range(3):
+                User().save()
+                models.storage.close()
+        self.assertEqual(1, register.call_count)
+
+    def test_save_is_deferred(self):
+        user = User()
+        user.save()
+        self.assertEqual([], self.stored())
+        self.assertIsNotNone(FileStorage._FileStorage__flusher)
+
+    def test_flush(self):
+        user = User()
+        user.save()
+        models.storage.flush()
+        self.assertEqual(["User." + user.id], self.stored())
+        with patch.object(FileStorage, "compact") as compact:
+            models.storage.flush()
+        compact.assert_not_called()
+
+    def test_flush_after_count(self):
+        users = [User() for i in range(3)]
+        for user in users[:2]:
+            user.save()
+        self.assertEqual([], self.stored())
+        users[2].save()
+        self.assertEqual(sorted("User." + user.id for user in users),
+                         self.stored())
+
+    def test_flush_on_interval(self):
+        FileStorage._FileStorage__flush_interval = 0.01
+        user = User()
+        user.save()
+        for i in range(100):
+            if os.path.exists("file.json"):
+                break
+            time.sleep(0.01)
+        self.assertEqual(["User." + user.id], self.stored())
+
+    def test_close(self):
+        user = User()
+        user.save()
+        models.storage.close()
+        self.assertIsNone(FileStorage._FileStorage__flusher)
+        self.assertEqual(["User." + user.id], self.stored())
+        user.save()
+        self.assertIsNotNone(FileStorage._FileStorage__flusher)
+
+    def test_close_without_flusher(self):
+        models.storage.close()
+        self.assertEqual([], self.stored())
+
+
+class TestFileStorage_binary_mode(unittest.TestCase):
+    """Unittests to test FileStorage saving to the binary format."""
+
+    @classmethod
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__binary_mode = True
+
+    @classmethod
+    def tearDown(self):
+        for name in ("file.hbnb", "file.hbnb.prev", "file.json.log"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__binary_mode = False
+        FileStorage._FileStorage__double_buffer = False
+        FileStorage._FileStorage__log_mode = False
+
+    def test_save_and_reload(self):
+        my_user = User()
+        my_user.first_name = "Betty"
+        my_place = Place()
+        my_place.number_rooms = 3
+        models.storage.save()
+        self.assertTrue(os.path.isfile("file.hbnb"))
+        self.assertFalse(os.path.isfile("file.json"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, models.storage.count())
+        for obj in (my_user, my_place):
+            new = models.storage.get(type(obj), obj.id)
+            self.assertIsNot(obj, new)
+            self.assertEqual(obj.to_dict(), new.to_dict())
+
+    def test_delete(self):
+        my_user = User()
+        models.storage.save()
+        models.storage.delete(my_user)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual({}, models.storage.all())
+
+    def test_reload_replays_log(self):
+        FileStorage._FileStorage__log_mode = True
+        my_user = User()
+        models.storage.compact()
+        my_user.first_name = "Betty"
+        my_user.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Betty",
+                         models.storage.get(User, my_user.id).first_name)
+
+    def test_reload_invalid_file(self):
+        with open("file.hbnb", "wb") as f:
+            f.write(b"HBNBBIN1\x04User")
+        with self.assertRaises(ValueError):
+            models.storage.reload()
+
+    def test_reload_previous_generation(self):
+        FileStorage._FileStorage__double_buffer = True
+        my_user = User()
+        models.storage.save()
+        State()
+        models.storage.save()
+        with open("file.hbnb", "wb") as f:
+            f.write(b"HBNBBIN1")
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["User." + my_user.id], list(models.storage.all()))
+
+
+class TestFileStorage_compression(unittest.TestCase):
+    """Unittests to test FileStorage saving compressed stores."""
+
+    @classmethod
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.user = User()
+        self.user.first_name = "Betty"
+        self.place = Place()
+
+    @classmethod
+    def tearDown(self):
+        for name in ("file.json", "file.hbnb"):
+            for ext in ("", ".gz", ".xz", ".zst", ".gz.prev"):
+                try:
+                    os.remove(name + ext)
+                except IOError:
+                    pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__compression = None
+        FileStorage._FileStorage__binary_mode = False
+        FileStorage._FileStorage__double_buffer = False
+        FileStorage._FileStorage__lazy_mode = False
+
+    def check_reload(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(2, models.storage.count())
+        for obj in (self.user, self.place):
+            new = models.storage.get(type(obj), obj.id)
+            self.assertEqual(obj.to_dict(), new.to_dict())
+
+    def test_save_and_reload(self):
+        for name in available():
+            with self.subTest(compression=name):
+                FileStorage._FileStorage__compression = name
+                models.storage.save()
+                fpath = "file.json" + {"gzip": ".gz", "xz": ".xz",
+                                       "zstd": ".zst"}[name]
+                self.assertTrue(os.path.isfile(fpath))
+                self.assertFalse(os.path.isfile("file.json"))
+                self.check_reload()
+
+    def test_binary_mode(self):
+        FileStorage._FileStorage__binary_mode = True
+        FileStorage._FileStorage__compression = "gzip"
+        models.storage.save()
+        self.assertTrue(os.path.isfile("file.hbnb.gz"))
+        self.check_reload()
+
+    def test_found_by_extension(self):
+        for name in available():
+            with self.subTest(compression=name):
+                FileStorage._FileStorage__compression = name
+                models.storage.save()
+                FileStorage._FileStorage__compression = None
+                self.check_reload()
+                os.remove("file.json" + {"gzip": ".gz", "xz": ".xz",
+                                         "zstd": ".zst"}[name])
+
+    def test_binary_found_by_extension(self):
+        FileStorage._FileStorage__binary_mode = True
+        FileStorage._FileStorage__compression = "xz"
+        models.storage.save()
+        FileStorage._FileStorage__compression = None
+        self.check_reload()
+
+    def test_lazy_mode_reads_in_full(self):
+        FileStorage._FileStorage__compression = "xz"
+        FileStorage._FileStorage__lazy_mode = True
+        models.storage.save()
+        self.check_reload()
+        self.assertEqual({}, FileStorage._FileStorage__raw)
+
+    def test_previous_generation(self):
+        FileStorage._FileStorage__compression = "gzip"
+        FileStorage._FileStorage__double_buffer = True
+        models.storage.save()
+        State()
+        models.storage.save()
+        with open("file.json.gz", "r+b") as f:
+            f.truncate(30)
+        self.check_reload()
+
+    def test_shard_mode(self):
+        FileStorage._FileStorage__compression = "gzip"
+        try:
+            with patch.multiple(FileStorage, _FileStorage__shard_mode=True,
+                                _FileStorage__dirty={"User", "Place"}):
+                models.storage.save()
+                self.assertEqual(["Place.json.gz", "User.json.gz"],
+                                 sorted(os.listdir("file.json.d")))
+                with gzip.open(os.path.join("file.json.d", "User.json.gz"),
+                               "rt") as f:
+                    self.assertIn("User." + self.user.id, json.load(f))
+                self.check_reload()
+        finally:
+            shutil.rmtree("file.json.d", ignore_errors=True)
+            FileStorage._FileStorage__unloaded = set()
+
+    def test_detected_without_compression(self):
+        FileStorage._FileStorage__compression = "gzip"
+        models.storage.save()
+        os.rename("file.json.gz", "file.json")
+        FileStorage._FileStorage__compression = None
+        self.check_reload()
+
+
+class TestFileStorage_bulk(unittest.TestCase):
+    """Unittests to test the bulk operations and batches of FileStorage."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def saved(self):
+        with open("file.json") as f:
+            return json.load(f)
+
+    def test_batch_defers_saves(self):
+        with patch.object(FileStorage, "_FileStorage__persist") as persist:
+            with models.storage.batch():
+                for i in range(10):
+                    User().save()
+                persist.assert_not_called()
+            persist.assert_called_once_with()
+
+    def test_batch_saves_on_exit(self):
+        with models.storage.batch():
+            user = User()
+            user.save()
+            self.assertFalse(os.path.isfile("file.json"))
+        self.assertIn("User." + user.id, self.saved())
+
+    def test_batch_without_save(self):
+        with models.storage.batch():
+            User()
+        self.assertFalse(os.path.isfile("file.json"))
+
+    def test_bulk_create(self):
+        with patch.object(FileStorage, "_FileStorage__persist") as persist:
+            users = models.storage.bulk_create(
+                User, [{"email": "{}@hbnb.io".format(i)} for i in range(50)])
+        persist.assert_called_once_with()
+        self.assertEqual(50, models.storage.count(User))
+        self.assertEqual("7@hbnb.io", users[7].email)
+        self.assertIs(users[7], models.storage.get(User, users[7].id))
+
+    def test_bulk_create_saves(self):
+        users = models.storage.bulk_create("User", [{}, {}])
+        self.assertEqual({"User." + user.id for user in users},
+                         set(self.saved()))
+
+    def test_bulk_update(self):
+        users = models.storage.bulk_create(User, [{}, {}])
+        models.storage.bulk_update(User, [{"id": user.id, "first_name": "B"}
+                                          for user in users])
+        for user in users:
+            self.assertEqual("B", self.saved()["User." + user.id]
+                             ["first_name"])
+
+    def test_bulk_update_missing(self):
+        user = User()
+        with self.assertRaises(KeyError):
+            models.storage.bulk_update(User, [{"id": user.id, "a": 1},
+                                              {"id": "missing"}])
+        self.assertFalse(hasattr(user, "a"))
+
+    def test_bulk_delete(self):
+        users = models.storage.bulk_create(User, [{}, {}, {}])
+        deleted = models.storage.bulk_delete(
+            "User", [users[0].id, users[1].id, "missing"])
+        self.assertEqual(2, deleted)
+        self.assertEqual(["User." + users[2].id], list(self.saved()))
+
+    def test_bulk_create_indexed(self):
+        place = Place()
+        models.storage.bulk_create(Review, [{"place_id": place.id}] * 3)
+        self.assertEqual(3, len(models.storage.find(Review,
+                                                    place_id=place.id)))
+
+    def test_bulk_create_sorts_indexes_once(self):
+        rows = [{"price_by_night": i % 10} for i in range(200)]
+        with patch("models.engine.index.insort") as insort:
+            models.storage.bulk_create(Place, rows)
+            found = models.storage.find_range(Place, price_by_night=(3, 4))
+        insort.assert_not_called()
+        self.assertEqual(40, len(found))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/ids.py.
+
+Unittest classes:
+    TestIdTable
+"""
+import unittest
+from models.base_model import classes
+from models.compact import compact
+from models.engine.ids import IdTable, is_ref_attr, ref_attrs
+from models.place import Place
+from models.review import Review
+
+
+def copy(s):
+    """Returns an equal string that is not s itself."""
+    return s[:1] + s[1:]
+
+
+class TestIdTable(unittest.TestCase):
+    """Unittests to test sharing id strings between objects."""
+
+    def test_is_ref_attr(self):
+        for name in ("place_id", "amenity_ids"):
+            self.assertTrue(is_ref_attr(name))
+        for name in ("id", "name", "idle", "__class__", "ids_count"):
+            self.assertFalse(is_ref_attr(name))
+
+    def test_ref_attrs(self):
+        self.assertEqual(("place_id", "user_id"), ref_attrs(Review))
+        self.assertEqual({"city_id", "user_id", "amenity_ids"},
+                         set(ref_attrs(Place)))
+
+    def test_share(self):
+        table = IdTable()
+        first = "0123-abcd"
+        self.assertIs(first, table.share(first))
+        self.assertIs(first, table.share(copy(first)))
+        self.assertIs(first, table.share([copy(first), 1])[0])
+        self.assertEqual(5, table.share(5))
+        self.assertEqual(1, len(table))
+
+    def test_share_dict(self):
+        table = IdTable()
+        place_id = "0123-abcd"
+        table.share(place_id)
+        odict = {"__class__": "Review", "id": "1",
+                 "place_id": copy(place_id), "text": copy(place_id)}
+        self.assertIs(odict, table.share_dict(odict))
+        self.assertIs(place_id, odict["place_id"])
+        self.assertIsNot(place_id, odict["text"])
+        self.assertEqual(1, len(table))
+
+    def test_share_dict_unknown_class(self):
+        table = IdTable()
+        owner_id = table.share("0123-abcd")
+        odict = {"__class__": "Nope", "owner_id": copy(owner_id)}
+        table.share_dict(odict)
+        self.assertIs(owner_id, odict["owner_id"])
+
+    def test_share_object(self):
+        table = IdTable()
+        place_id = table.share("0123-abcd")
+        saved = classes["Review"]
+        compact_review = compact(Review)
+        classes["Review"] = saved
+        for cls in (Review, compact_review):
+            with self.subTest(cls=cls.__name__):
+                obj = cls.__new__(cls)
+                obj.place_id = copy(place_id)
+                obj.other_id = copy(place_id)
+                self.assertIs(obj, table.share_object(obj))
+                self.assertIs(place_id, obj.place_id)
+                self.assertIs(place_id, obj.other_id)
+
+    def test_clear(self):
+        table = IdTable()
+        table.share("1")
+        table.share("2")
+        self.assertEqual(2, len(table))
+        table.clear()
+        self.assertEqual(0, len(table))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/index.py.
+
+Unittest classes:
+    TestHashIndex
+    TestSortedIndex
+    TestHaversine
+    TestGridIndex
+"""
+import unittest
+from models.engine.index import (BULK_SIZE, HashIndex, SortedIndex,
+                                 GridIndex, haversine)
+from models.place import Place
+from models.review import Review
+
+
+class TestHashIndex(unittest.TestCase):
+    """Unittests to test the HashIndex class."""
+
+    def setUp(self):
+        self.index = HashIndex("place_id")
+        self.review1 = Review(id="1", place_id="p1")
+        self.review2 = Review(id="2", place_id="p1")
+        self.review3 = Review(id="3", place_id="p2")
+        for review in (self.review1, self.review2, self.review3):
+            self.index.add("Review." + review.id, review)
+
+    def test_lookup(self):
+        self.assertEqual({"Review.1": self.review1, "Review.2": self.review2},
+                         self.index.lookup("p1"))
+        self.assertEqual({"Review.3": self.review3}, self.index.lookup("p2"))
+
+    def test_lookup_missing_value(self):
+        self.assertEqual({}, self.index.lookup("p3"))
+
+    def test_lookup_unhashable_value(self):
+        self.assertIsNone(self.index.lookup(["p1"]))
+
+    def test_add_moves_changed_value(self):
+        self.review1.place_id = "p2"
+        self.index.add("Review.1", self.review1)
+        self.assertNotIn("Review.1", self.index.lookup("p1"))
+        self.assertIn("Review.1", self.index.lookup("p2"))
+
+    def test_add_class_default(self):
+        review = Review(id="4")
+        self.index.add("Review.4", review)
+        self.assertEqual({"Review.4": review}, self.index.lookup(""))
+
+    def test_add_missing_attribute(self):
+        index = HashIndex("price")
+        index.add("Review.1", self.review1)
+        self.assertEqual({}, index.entries)
+
+    def test_add_unhashable_value(self):
+        self.review1.place_id = ["p1"]
+        self.index.add("Review.1", self.review1)
+        self.assertNotIn("Review.1", self.index.lookup("p1"))
+        self.assertNotIn("Review.1", self.index.values)
+
+    def test_remove(self):
+        self.index.remove("Review.3")
+        self.assertEqual({}, self.index.lookup("p2"))
+        self.assertNotIn("p2", self.index.entries)
+        self.index.remove("Review.3")
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual({}, self.index.lookup("p1"))
+        self.assertEqual({}, self.index.values)
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Unittests to test the SortedIndex class."""
+
+    def setUp(self):
+        self.index = SortedIndex("price_by_night")
+        self.places = {}
+        for i, price in enumerate((120, 50, 80, 80, 200)):
+            place = Place(id=str(i), price_by_night=price)
+            self.places["Place." + place.id] = place
+            self.index.add("Place." + place.id, place)
+
+    def test_entries_sorted(self):
+        values = [value for value, key in self.index.entries]
+        self.assertEqual([50, 80, 80, 120, 200], values)
+
+    def test_range(self):
+        found = self.index.range(50, 120)
+        self.assertEqual(["Place.1", "Place.2", "Place.3", "Place.0"],
+                         list(found))
+        self.assertIs(self.places["Place.0"], found["Place.0"])
+
+    def test_range_open_bounds(self):
+        self.assertEqual(["Place.0", "Place.4"],
+                         list(self.index.range(100, None)))
+        self.assertEqual(["Place.1"], list(self.index.range(None, 79.5)))
+        self.assertEqual(5, len(self.index.range()))
+
+    def test_range_empty(self):
+        self.assertEqual({}, self.index.range(81, 119))
+        self.assertEqual({}, self.index.range(120, 50))
+
+    def test_span(self):
+        self.assertEqual((1, 3), self.index.span(80, 80))
+
+    def test_lookup(self):
+        self.assertEqual(["Place.2", "Place.3"],
+                         list(self.index.lookup(80)))
+        self.assertIsNone(self.index.lookup("80"))
+
+    def test_add_moves_changed_value(self):
+        place = self.places["Place.1"]
+        place.price_by_night = 300
+        self.index.add("Place.1", place)
+        self.assertEqual({}, self.index.range(None, 79))
+        self.assertEqual(["Place.4", "Place.1"],
+                         list(self.index.range(200, None)))
+
+    def test_add_not_a_number(self):
+        place = self.places["Place.1"]
+        place.price_by_night = "cheap"
+        self.index.add("Place.1", place)
+        self.assertNotIn("Place.1", self.index.values)
+        place.price_by_night = float("nan")
+        self.index.add("Place.1", place)
+        self.assertNotIn("Place.1", self.index.values)
+        self.assertEqual(4, len(self.index.entries))
+
+    def test_add_all(self):
+        for size in (3, BULK_SIZE * 2):
+            with self.subTest(size=size):
+                index = SortedIndex("price_by_night")
+                objs = {}
+                for i in range(size):
+                    place = Place(id=str(i), price_by_night=(i * 7) % 10)
+                    objs["Place." + place.id] = place
+                index.add_all(objs)
+                expected = SortedIndex("price_by_night")
+                for key, place in objs.items():
+                    expected.add(key, place)
+                self.assertEqual(expected.entries, index.entries)
+                self.assertEqual(expected.values, index.values)
+                self.assertEqual(size, len(index.objects))
+
+    def test_add_all_moves_changed_values(self):
+        objs = dict(self.places)
+        for i in range(5, BULK_SIZE + 5):
+            place = Place(id=str(i), price_by_night=1000 + i)
+            objs["Place." + place.id] = place
+        self.places["Place.1"].price_by_night = 300
+        self.places["Place.2"].price_by_night = "cheap"
+        self.index.add_all(objs)
+        self.assertEqual(BULK_SIZE + 4, len(self.index.entries))
+        self.assertNotIn("Place.2", self.index.values)
+        self.assertEqual(["Place.4", "Place.1"],
+                         list(self.index.range(200, 300)))
+        self.assertEqual(["Place.3"], list(self.index.lookup(80)))
+
+    def test_remove(self):
+        self.index.remove("Place.3")
+        self.assertEqual(["Place.2"], list(self.index.lookup(80)))
+        self.index.remove("Place.3")
+        self.assertEqual(4, len(self.index.entries))
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual({}, self.index.range())
+
+
+class TestHaversine(unittest.TestCase):
+    """Unittests to test the haversine function."""
+
+    def test_same_point(self):
+        self.assertEqual(0, haversine(37.77, -122.42, 37.77, -122.42))
+
+    def test_known_distance(self):
+        dist = haversine(37.7749, -122.4194, 34.0522, -118.2437)
+        self.assertAlmostEqual(559.1, dist, delta=1)
+
+    def test_across_antimeridian(self):
+        dist = haversine(0, 179.9, 0, -179.9)
+        self.assertAlmostEqual(22.2, dist, delta=0.1)
+
+
+class TestGridIndex(unittest.TestCase):
+    """Unittests to test the GridIndex class."""
+
+    def setUp(self):
+        self.index = GridIndex("latitude", "longitude")
+        self.places = {}
+        for i, (lat, lon) in enumerate(((37.7749, -122.4194),
+                                        (37.8044, -122.2712),
+                                        (34.0522, -118.2437),
+                                        (-17.7, 179.95),
+                                        (-17.8, -179.95))):
+            place = Place(id=str(i), latitude=lat, longitude=lon)
+            self.places["Place." + place.id] = place
+            self.index.add("Place." + place.id, place)
+
+    def test_near(self):
+        found = self.index.near(37.78, -122.41, 5)
+        self.assertEqual(["Place.0"], list(found))
+        self.assertIs(self.places["Place.0"], found["Place.0"])
+
+    def test_near_sorted_by_distance(self):
+        found = self.index.near(37.80, -122.28, 20)
+        self.assertEqual(["Place.1", "Place.0"], list(found))
+
+    def test_near_across_antimeridian(self):
+        found = self.index.near(-17.75, 180.0, 20)
+        self.assertEqual(["Place.3", "Place.4"], sorted(found))
+
+    def test_near_pole(self):
+        place = Place(id="5", latitude=89.9, longitude=10.0)
+        self.index.add("Place.5", place)
+        self.assertEqual(["Place.5"], list(self.index.near(89.9, -170, 50)))
+
+    def test_near_large_radius(self):
+        self.assertEqual(5, len(self.index.near(0, 0, 20000)))
+
+    def test_within_bbox(self):
+        found = self.index.within_bbox(37, -123, 38, -122)
+        self.assertEqual(["Place.0", "Place.1"], sorted(found))
+
+    def test_within_bbox_across_antimeridian(self):
+        found = self.index.within_bbox(-18, 179, -17, -179)
+        self.assertEqual(["Place.3", "Place.4"], sorted(found))
+
+    def test_within_bbox_whole_world(self):
+        self.assertEqual(5, len(self.index.within_bbox(-90, -180, 90, 180)))
+
+    def test_add_moves_changed_position(self):
+        place = self.places["Place.2"]
+        place.latitude, place.longitude = 37.7750, -122.4190
+        self.index.add("Place.2", place)
+        self.assertEqual(["Place.0", "Place.2"],
+                         sorted(self.index.near(37.78, -122.41, 5)))
+        self.assertEqual({}, self.index.near(34.0522, -118.2437, 5))
+
+    def test_add_invalid_coordinates(self):
+        place = Place(id="5", latitude="north", longitude=0.0)
+        self.index.add("Place.5", place)
+        place = Place(id="6", latitude=91.0, longitude=0.0)
+        self.index.add("Place.6", place)
+        self.assertNotIn("Place.5", self.index.positions)
+        self.assertNotIn("Place.6", self.index.positions)
+
+    def test_remove(self):
+        self.index.remove("Place.0")
+        self.assertEqual({}, self.index.near(37.78, -122.41, 5))
+        self.index.remove("Place.0")
+
+    def test_clear(self):
+        self.index.clear()
+        self.assertEqual({}, self.index.within_bbox(-90, -180, 90, 180))
+
+
+if __name__ == "__main__":
+    unittest.main()
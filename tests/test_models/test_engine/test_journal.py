@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/journal.py.
+
+Unittest classes:
+    TestJournal
+"""
+import os
+import unittest
+from models.engine.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Unittests to test the Journal class."""
+
+    def setUp(self):
+        self.journal = Journal("test_journal.log")
+
+    def tearDown(self):
+        try:
+            os.remove("test_journal.log")
+        except IOError:
+            pass
+
+    def test_replay_missing_file(self):
+        self.assertEqual([], list(self.journal.replay()))
+        self.assertEqual(0, self.journal.records)
+
+    def test_append_and_replay(self):
+        self.journal.append({"User.1": '{"id": "1"}', "User.2": None})
+        self.assertEqual(2, self.journal.records)
+        records = list(Journal("test_journal.log").replay())
+        self.assertEqual([("put", "User.1", {"id": "1"}),
+                          ("del", "User.2", None)], records)
+
+    def test_append_nothing(self):
+        self.journal.append({})
+        self.assertFalse(os.path.exists("test_journal.log"))
+
+    def test_replay_counts_records(self):
+        self.journal.append({"User.1": '{"id": "1"}'})
+        self.journal.append({"User.1": None})
+        journal = Journal("test_journal.log")
+        list(journal.replay())
+        self.assertEqual(2, journal.records)
+
+    def test_replay_drops_torn_record(self):
+        self.journal.append({"User.1": '{"id": "1"}'})
+        with open("test_journal.log", "a") as f:
+            f.write('{"op": "put", "key": "Us')
+        self.assertEqual(1, len(list(self.journal.replay())))
+        self.journal.append({"User.2": '{"id": "2"}'})
+        keys = [key for op, key, o in self.journal.replay()]
+        self.assertEqual(["User.1", "User.2"], keys)
+
+    def test_truncate(self):
+        self.journal.append({"User.1": '{"id": "1"}'})
+        self.journal.truncate()
+        self.assertFalse(os.path.exists("test_journal.log"))
+        self.assertEqual(0, self.journal.records)
+        self.journal.truncate()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/json_stream.py.
+
+Unittest classes:
+    TestIterItems
+"""
+import json
+import unittest
+from io import StringIO
+from models.engine.json_stream import iter_items
+
+
+class TestIterItems(unittest.TestCase):
+    """Unittests to test the iter_items function."""
+
+    objdict = {
+        "User.1": {"id": "1", "__class__": "User", "first_name": "Betty"},
+        "Place.2": {"id": "2", "__class__": "Place", "max_guest": 4,
+                    "latitude": -12.5, "amenity_ids": ["a", "b"]},
+        "State.3": {"id": "3", "__class__": "State", "name": "été"}
+    }
+
+    def check(self, text):
+        for chunk_size in (1, 2, 7, 65536):
+            items = list(iter_items(StringIO(text), chunk_size))
+            self.assertEqual(list(self.objdict.items()), items)
+
+    def test_single_line(self):
+        self.check(json.dumps(self.objdict))
+
+    def test_one_entry_per_line(self):
+        lines = ["{}: {}".format(json.dumps(k), json.dumps(v))
+                 for k, v in self.objdict.items()]
+        self.check("{\n" + ",\n".join(lines) + "\n}\n")
+
+    def test_indented(self):
+        self.check(json.dumps(self.objdict, indent=4))
+
+    def test_is_lazy(self):
+        items = iter_items(StringIO(json.dumps(self.objdict) + "garbage"))
+        self.assertEqual("User.1", next(items)[0])
+
+    def test_empty_object(self):
+        self.assertEqual([], list(iter_items(StringIO(" {\n} "), 1)))
+
+    def test_number_split_across_chunks(self):
+        items = list(iter_items(StringIO('{"a": 12345}'), 2))
+        self.assertEqual([("a", 12345)], items)
+
+    def test_invalid(self):
+        for text in ("", "[]", '{"a": 1', '{"a" 1}', '{"a": 1,}',
+                     '{1: 2}', '{"a": 1} x'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_items(StringIO(text), 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/parallel.py.
+
+Unittest classes:
+    TestChunks
+    TestLoadParallel
+"""
+import os
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from models.base_model import classes
+from models.compact import compact
+from unittest.mock import patch
+from models.engine.parallel import (WORKER_ENV, can_load_parallel, chunks,
+                                    is_worker, load_chunk, load_parallel,
+                                    picklable)
+from models.place import Place
+from models.user import User
+
+
+def write_store(fpath, objs):
+    """Writes objs to fpath one object per line, as FileStorage does."""
+    with open(fpath, "w") as f:
+        f.write("{\n")
+        f.write(",\n".join("{}: {}".format(
+            json.dumps("{}.{}".format(type(obj).__name__, obj.id)),
+            json.dumps(obj.to_dict())) for obj in objs))
+        f.write("\n}\n")
+
+
+class TestChunks(unittest.TestCase):
+    """Unittests to test splitting a store into chunks."""
+
+    def setUp(self):
+        self.objs = [User(id=str(i), first_name="u" * i) for i in range(10)]
+        write_store("test.json", self.objs)
+
+    def tearDown(self):
+        os.remove("test.json")
+
+    def test_ranges_cover_every_line(self):
+        for count in range(1, 14):
+            ranges = chunks("test.json", count)
+            self.assertLessEqual(len(ranges), count)
+            self.assertEqual(2, ranges[0][0])
+            self.assertEqual(os.path.getsize("test.json"), ranges[-1][1])
+            for (a, b), (c, d) in zip(ranges, ranges[1:]):
+                self.assertEqual(b, c)
+            keys = [key for start, stop in ranges
+                    for key, obj in load_chunk("test.json", start, stop)]
+            self.assertEqual(["User." + str(i) for i in range(10)], keys)
+
+    def test_load_chunk_builds_objects(self):
+        (start, stop), = chunks("test.json", 1)
+        objs = load_chunk("test.json", start, stop)
+        self.assertEqual([obj.to_dict() for obj in self.objs],
+                         [obj.to_dict() for key, obj in objs])
+
+    def test_not_one_object_per_line(self):
+        with open("test.json", "w") as f:
+            json.dump({"User.1": self.objs[1].to_dict()}, f)
+        self.assertIsNone(chunks("test.json", 2))
+
+    def test_empty_store(self):
+        write_store("test.json", [])
+        self.assertEqual([(2, 5)], chunks("test.json", 4))
+        self.assertEqual([], load_chunk("test.json", 2, 5))
+
+
+class TestLoadParallel(unittest.TestCase):
+    """Unittests to test loading stores with worker processes."""
+
+    def setUp(self):
+        self.users = [User(id=str(i)) for i in range(20)]
+        self.places = [Place(id=str(i), name="p") for i in range(5)]
+        write_store("test.json", self.users)
+        write_store("test2.json", self.places)
+
+    def tearDown(self):
+        os.remove("test.json")
+        os.remove("test2.json")
+
+    def test_load_parallel(self):
+        objs = dict(load_parallel(["test.json", "test2.json"], 3))
+        self.assertEqual(25, len(objs))
+        self.assertEqual(self.places[4].to_dict(), objs["Place.4"].to_dict())
+        self.assertIs(User, type(objs["User.0"]))
+
+    def test_not_one_object_per_line(self):
+        with open("test2.json", "w") as f:
+            json.dump({}, f)
+        with self.assertRaises(ValueError):
+            list(load_parallel(["test.json", "test2.json"], 2))
+
+    def test_picklable(self):
+        self.assertTrue(picklable())
+        saved = dict(classes)
+        try:
+            compact(User)
+            self.assertFalse(picklable())
+        finally:
+            classes.clear()
+            classes.update(saved)
+
+    def test_can_load_parallel(self):
+        self.assertFalse(is_worker())
+        self.assertTrue(can_load_parallel(2))
+        self.assertFalse(can_load_parallel(1))
+        with patch.dict(os.environ, {WORKER_ENV: "1"}):
+            self.assertTrue(is_worker())
+            self.assertFalse(can_load_parallel(2))
+
+    def test_invalid_line(self):
+        with open("test2.json", "w") as f:
+            f.write('{\n"Place.1": {"id": \n}\n')
+        with self.assertRaises(ValueError):
+            list(load_parallel(["test.json", "test2.json"], 2))
+
+    def test_worker_env_restored(self):
+        self.assertEqual(20, len(list(load_parallel(["test.json"], 2))))
+        self.assertNotIn(WORKER_ENV, os.environ)
+
+    def test_import_models_with_workers(self):
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        env = dict(os.environ, HBNB_STORAGE_WORKERS="2", PYTHONPATH=root)
+        for name in ("HBNB_TYPE_STORAGE", "HBNB_STORAGE_LAZY",
+                     "HBNB_STORAGE_SHARDS", "HBNB_STORAGE_FORMAT"):
+            env.pop(name, None)
+        # Counts the workers started by the reload made by import models
+        code = ("from multiprocessing import context; calls = []; "
+                "start = context.SpawnProcess.start; "
+                "context.SpawnProcess.start = lambda self: "
+                "calls.append(1) or start(self); "
+                "import models; print(len(calls), models.storage.count()); "
+                "models.storage.reload(); print(models.storage.count())")
+        with tempfile.TemporaryDirectory() as tmp:
+            write_store(os.path.join(tmp, "file.json"), self.users)
+            out = subprocess.run([sys.executable, "-c", code], cwd=tmp,
+                                 env=env, capture_output=True, text=True,
+                                 timeout=60)
+        self.assertEqual(0, out.returncode, out.stderr)
+        self.assertEqual(["2", "20", "20"], out.stdout.split())
+
+
+if __name__ == "__main__":
+    unittest.main()
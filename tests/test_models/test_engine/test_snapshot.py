@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""The script defines unittests for models/engine/snapshot.py.
+
+Unittest classes:
+    TestSnapshot
+    TestCompileSnapshot
+"""
+import os
+import json
+import unittest
+from models.engine.snapshot import Snapshot, compile_snapshot, write_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """Unittests to test writing and reading snapshots."""
+
+    def setUp(self):
+        self.items = [("User.2", '{"id": "2"}'),
+                      ("Place.1", '{"id": "1", "name": "Caf\\u00e9"}'),
+                      ("User.1", '{"id": "1", "first_name": "Zoé"}'),
+                      ("City.1", '{"id": "1"}')]
+        write_snapshot("test.snap", self.items)
+        self.snapshot = Snapshot("test.snap")
+
+    def tearDown(self):
+        self.snapshot.close()
+        os.remove("test.snap")
+
+    def test_len(self):
+        self.assertEqual(4, len(self.snapshot))
+
+    def test_get(self):
+        for key, text in self.items:
+            self.assertEqual(text, self.snapshot.get(key))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.snapshot.get("User.3"))
+        self.assertIsNone(self.snapshot.get("Amenity.1"))
+        self.assertIsNone(self.snapshot.get("Zzz.1"))
+        self.assertNotIn("User.0", self.snapshot)
+        self.assertIn("User.1", self.snapshot)
+
+    def test_keys_sorted(self):
+        self.assertEqual(["City.1", "Place.1", "User.1", "User.2"],
+                         list(self.snapshot.keys()))
+        self.assertEqual(["User.1", "User.2"],
+                         list(self.snapshot.keys("User")))
+
+    def test_count(self):
+        self.assertEqual(2, self.snapshot.count("User"))
+        self.assertEqual(0, self.snapshot.count("Review"))
+        self.assertEqual(4, self.snapshot.count())
+
+    def test_class_prefix(self):
+        write_snapshot("test2.snap", [("Use.1", "{}"), ("User.1", "{}"),
+                                      ("UserX.1", "{}")])
+        snapshot = Snapshot("test2.snap")
+        try:
+            self.assertEqual(["User.1"], list(snapshot.keys("User")))
+        finally:
+            snapshot.close()
+            os.remove("test2.snap")
+
+    def test_items(self):
+        self.assertEqual(sorted(self.items), list(self.snapshot.items()))
+        self.assertEqual([("City.1", '{"id": "1"}')],
+                         list(self.snapshot.items("City")))
+
+    def test_empty(self):
+        write_snapshot("test2.snap", [])
+        snapshot = Snapshot("test2.snap")
+        try:
+            self.assertEqual(0, len(snapshot))
+            self.assertIsNone(snapshot.get("User.1"))
+        finally:
+            snapshot.close()
+            os.remove("test2.snap")
+
+    def test_not_a_snapshot(self):
+        for content in (b"", b"{}\n", b"HBNBSNP1" + bytes(32)):
+            with open("test2.snap", "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                Snapshot("test2.snap")
+        os.remove("test2.snap")
+
+
+class TestCompileSnapshot(unittest.TestCase):
+    """Unittests to test compiling a snapshot of a JSON store."""
+
+    def tearDown(self):
+        for name in ("test.json", "test.json.snap"):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+
+    def test_compile(self):
+        store = {"User.1": {"id": "1", "__class__": "User"},
+                 "City.1": {"id": "1", "name": "Paris", "__class__": "City"}}
+        with open("test.json", "w") as f:
+            json.dump(store, f)
+        compile_snapshot("test.json", "test.json.snap")
+        snapshot = Snapshot("test.json.snap")
+        try:
+            self.assertEqual(store, {key: json.loads(text)
+                                     for key, text in snapshot.items()})
+        finally:
+            snapshot.close()
+
+
+if __name__ == "__main__":
+    unittest.main()